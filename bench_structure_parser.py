@@ -0,0 +1,35 @@
+import sys
+import time
+from core.structure_parser import CodeStructureParser
+
+CHUNK = (
+    "* Block comment.\n"
+    "GET DATA /TYPE=TXT /FILE='in.csv'.\n"
+    "COMPUTE total = a + b *\n"
+    "   1.5.\n"
+    "IF (total > 10) flag = 1.\n"
+    "FREQUENCIES VARIABLES=total flag.\n"
+    "BEGIN DATA\n"
+    "1 2\n"
+    "END DATA.\n"
+    "SAVE OUTFILE='out.sav'.\n"
+)
+
+def run_benchmark(lines: int = 100_000, repeats: int = 3):
+    # 1. Build a synthetic script ('lines' long, 10 lines per chunk)
+    code = CHUNK * (lines // 10)
+
+    # 2. Time the lexer; the best of 'repeats' runs hides warm-up noise
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        commands = CodeStructureParser.commands(code)
+        timings.append(time.perf_counter() - started)
+
+    # 3. Report
+    best = min(timings)
+    print(f"⏱️ {lines:,} lines -> {len(commands):,} commands in {best:.3f}s "
+          f"({lines / best:,.0f} lines/s, best of {repeats})")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -11,18 +11,38 @@ class Builder:
     def __init__(self, llm_client: LLMClient = None):
         self.llm = llm_client or LLMClient()
 
-    def build(self, spec_content: str, prompt_template: str = BUILDER_V1) -> str:
+    def build(self, spec_content: str, prompt_template: str = BUILDER_V1, validator=None,
+              temperature: float = None, variant: int = 0) -> str:
         """
         Generates Python code from the provided specification.
         
         Args:
             spec_content: The full markdown spec generated by the SpecWriter.
             prompt_template: The system instructions (defaults to V1).
+            validator: (Optional) Streaming check that aborts bad generations early,
+                       e.g. utils.stream_validators.PythonSyntaxValidator().
+            temperature: (Optional) Override the client's temperature, e.g. for speculative builds.
+            variant: Index of an alternative implementation of the same spec. Variants above 0
+                     get their own prompt (and cache entry), so each one is a fresh sample.
             
         Returns:
             Clean, executable Python code string.
         """
-        user_prompt = f"### TECHNICAL SPECIFICATION:\n{spec_content}"
+        user_prompt = self._user_prompt(spec_content, variant)
         
         # CLEAN: No hardcoded temperature here anymore
-        return self.llm.complete(prompt_template, user_prompt)
\ No newline at end of file
+        return self.llm.complete(prompt_template, user_prompt, temperature=temperature, validator=validator)
+
+    def build_many(self, specs: list, prompt_template: str = BUILDER_V1, backend: str = "thread") -> list:
+        """
+        Generates code for several specs concurrently (one LLM request each).
+        Results are returned in the same order as 'specs'.
+        """
+        batch = [(prompt_template, self._user_prompt(spec)) for spec in specs]
+        return self.llm.complete_many(batch, backend=backend)
+
+    def _user_prompt(self, spec_content: str, variant: int = 0) -> str:
+        prompt = f"### TECHNICAL SPECIFICATION:\n{spec_content}"
+        if variant:
+            prompt += f"\n\n### VARIANT {variant}:\nWrite an independent implementation of this spec."
+        return prompt
\ No newline at end of file
@@ -0,0 +1,233 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from utils.file_hash import FileHashCache
+
+class ColumnarCache:
+    """
+    Binary, column-per-file copies of CSV artifacts, keyed by content hash.
+
+    The first read of a CSV parses it once (in chunks) and writes every column
+    as a flat binary array; later reads memory-map those arrays instead of
+    parsing text. Numeric and boolean columns come back as zero-copy views of
+    the mapped files. Text (and mixed) columns are dictionary encoded: int32
+    codes are mapped, and only the distinct values are decoded into Python
+    objects.
+
+    Layout: <cache_dir>/<sha256>-<mode>/{meta.json, 0.bin, 1.bin, ...}
+    """
+
+    MODES = ("typed", "text")
+    CHUNKSIZE = 200_000
+
+    def __init__(self, cache_dir: str = ".columnar_cache", chunksize: int = CHUNKSIZE):
+        """
+        Args:
+            cache_dir: Where converted datasets are stored.
+            chunksize: Rows parsed per chunk while converting a CSV (bounds memory).
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.chunksize = chunksize
+        self.hits = 0
+        self.misses = 0
+        self._hasher = FileHashCache()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def read(self, csv_path: str, text: bool = False, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Returns the CSV as a DataFrame backed by the cache.
+
+        Args:
+            csv_path: The CSV artifact.
+            text: Read every cell as a string with no NA detection
+                  (like pd.read_csv(dtype=str, keep_default_na=False)).
+            columns: (Optional) Only load these columns.
+        """
+        dataset = self._open(csv_path, text)
+        return dataset.frame(0, dataset.rows, columns)
+
+    def iter_chunks(self, csv_path: str, chunksize: Optional[int] = None, text: bool = False,
+                    nrows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Yields consecutive row slices, so huge datasets can be scanned in bounded memory."""
+        dataset = self._open(csv_path, text)
+        chunksize = chunksize or self.chunksize
+        end = dataset.rows if nrows is None else min(nrows, dataset.rows)
+        # Like pd.read_csv, an empty dataset still yields one (empty) chunk with its columns
+        for start in range(0, max(end, 1), chunksize):
+            yield dataset.frame(start, min(start + chunksize, end))
+
+    def file_hash(self, csv_path: str) -> str:
+        """SHA-256 of the file, remembered per (path, size, mtime) so it is computed once."""
+        return self._hasher.hash(csv_path)
+
+    def path_for(self, csv_path: str, text: bool = False) -> str:
+        """Directory holding the converted copy of 'csv_path' (whether or not it exists yet)."""
+        return os.path.join(self.cache_dir, f"{self.file_hash(csv_path)}-{self.MODES[text]}")
+
+    def _open(self, csv_path: str, text: bool) -> "_Dataset":
+        target = self.path_for(csv_path, text)
+        if os.path.exists(os.path.join(target, "meta.json")):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._convert(csv_path, text, target)
+        return _Dataset(target)
+
+    def _convert(self, csv_path: str, text: bool, target: str):
+        """Parses the CSV once, chunk by chunk, into a temporary directory and moves it into place."""
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            text_columns = set()
+            while True:
+                try:
+                    meta = self._write_columns(csv_path, text, text_columns, staging)
+                    break
+                except _MixedColumn as e:
+                    text_columns.add(e.index)  # Start over with that column read as str
+            with open(os.path.join(staging, "meta.json"), 'w') as f:
+                json.dump(meta, f)
+            try:
+                os.replace(staging, target)
+            except OSError:
+                pass  # Another process converted the same content first
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _write_columns(self, csv_path: str, text: bool, text_columns: set, staging: str) -> dict:
+        options = {"dtype": str, "keep_default_na": False} if text else {"dtype": {i: str for i in text_columns}}
+        names = list(pd.read_csv(csv_path, nrows=0).columns)
+        writers = [_ColumnWriter(i, os.path.join(staging, f"{i}.bin")) for i in range(len(names))]
+        rows = 0
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=self.chunksize, **options):
+                rows += len(chunk)
+                for i, writer in enumerate(writers):
+                    writer.add(chunk.iloc[:, i])
+        finally:
+            columns = [dict(name=name, **writer.close()) for name, writer in zip(names, writers)]
+        return {"rows": rows, "columns": columns}
+
+class _Dataset:
+    """A converted dataset on disk; columns are mapped on first use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), 'r') as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.columns = meta["columns"]
+        self._arrays = {}
+
+    def frame(self, start: int, stop: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        data = {}
+        for i, column in enumerate(self.columns):
+            if columns is None or column["name"] in columns:
+                data[column["name"]] = self._values(i, column, start, stop)
+        # copy=False keeps numeric columns as views of the mapped files
+        return pd.DataFrame(data, columns=list(data), copy=False)
+
+    def _values(self, i: int, column: dict, start: int, stop: int):
+        array = self._arrays.get(i)
+        if array is None:
+            dtype = np.dtype(column["dtype"])
+            if self.rows == 0:
+                array = np.empty(0, dtype=dtype)  # Empty files cannot be mapped
+            else:
+                array = np.memmap(os.path.join(self.path, f"{i}.bin"), dtype=dtype, mode='r', shape=(self.rows,))
+            self._arrays[i] = array
+        window = array[start:stop]
+        if "values" not in column:
+            return window
+        # Code -1 (missing) picks the trailing NaN
+        lookup = np.empty(len(column["values"]) + 1, dtype=object)
+        lookup[:-1] = column["values"]
+        lookup[-1] = np.nan
+        return pd.Series(lookup.take(window))
+
+class _MixedColumn(Exception):
+    """A column switched between numbers and text across chunks; it must be re-read as text."""
+
+    def __init__(self, index: int):
+        super().__init__(index)
+        self.index = index
+
+class _ColumnWriter:
+    """
+    Appends one column, chunk by chunk, to a flat binary file.
+    A column whose chunks disagree on type is widened like a whole-file read
+    would: int -> float, bool -> object. Numbers mixed with text cannot be
+    widened faithfully, so they raise _MixedColumn and the column is re-read as str.
+    """
+
+    DTYPES = {"int": np.int64, "float": np.float64, "bool": np.bool_, "object": np.int32}
+
+    def __init__(self, index: int, path: str):
+        self.index = index
+        self.path = path
+        self.kind = None        # 'int' | 'float' | 'bool' | 'object'
+        self.codes = {}         # Object columns: (type, value) -> code
+        self.values = []
+        self.file = open(path, 'wb')
+
+    def add(self, series: pd.Series):
+        kind = self._kind(series)
+        if self.kind is None:
+            self.kind = kind
+        elif kind != self.kind:
+            kinds = {kind, self.kind}
+            if kinds == {"int", "float"}:
+                widened = "float"
+            elif kinds == {"bool", "object"}:
+                widened = "object"
+            else:
+                raise _MixedColumn(self.index)
+            if widened != self.kind:
+                self._widen(widened)
+        self._write(series)
+
+    def close(self) -> dict:
+        self.file.close()
+        column = {"dtype": np.dtype(self.DTYPES[self.kind or "object"]).str}
+        if self.kind in (None, "object"):
+            column["values"] = self.values
+        return column
+
+    @staticmethod
+    def _kind(series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series):
+            return "bool"
+        if pd.api.types.is_integer_dtype(series):
+            return "int"
+        if pd.api.types.is_float_dtype(series):
+            return "float"
+        return "object"
+
+    def _write(self, series: pd.Series):
+        if self.kind != "object":
+            self.file.write(series.to_numpy(dtype=self.DTYPES[self.kind]).tobytes())
+            return
+        # Dictionary encoding: factorize the chunk, then map its distinct values to global codes
+        local_codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        mapping[-1] = -1  # Local NA sentinel (-1) indexes this slot
+        for i, value in enumerate(uniques):
+            value = value.item() if hasattr(value, "item") else value
+            key = (type(value), value)
+            code = self.codes.get(key)
+            if code is None:
+                code = self.codes[key] = len(self.values)
+                self.values.append(value)
+            mapping[i] = code
+        self.file.write(mapping[local_codes].tobytes())
+
+    def _widen(self, kind: str):
+        """Rewrites what was written so far in the wider type."""
+        self.file.close()
+        existing = np.fromfile(self.path, dtype=self.DTYPES[self.kind])
+        self.kind = kind
+        self.file = open(self.path, 'wb')
+        self._write(pd.Series(existing.astype(np.float64 if kind == "float" else object)))
@@ -0,0 +1,169 @@
+import os
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from core.columnar_cache import ColumnarCache
+
+class OutputComparator:
+    """
+    The Referee.
+    Compares full source and candidate outputs column by column, vectorized,
+    so large outputs are checked in their entirety rather than by first row.
+    """
+
+    def __init__(self, float_tolerance: float = 1e-9, normalize_dtypes: bool = True, max_samples: int = 10,
+                 columnar_cache: Optional[ColumnarCache] = None):
+        """
+        Args:
+            float_tolerance: Relative and absolute tolerance for numeric cells.
+            normalize_dtypes: Compare '4', '4.0' and 4 as the same number, and ignore
+                              surrounding whitespace in text. Off means exact equality.
+            max_samples: Upper bound on the individual diffs included in a report.
+            columnar_cache: (Optional) ColumnarCache for the expected side, so the gold
+                            output compared on every iteration is memory-mapped, not re-parsed.
+                            Candidate outputs are new every time and are read directly.
+        """
+        self.float_tolerance = float_tolerance
+        self.normalize_dtypes = normalize_dtypes
+        self.max_samples = max_samples
+        self.columnar_cache = columnar_cache
+
+    def compare_files(self, expected_path: str, actual_path: str, key_columns: Optional[List[str]] = None) -> dict:
+        """Loads two CSV outputs and compares them. See compare_frames."""
+        if not os.path.exists(actual_path):
+            return self._missing_report(f"Output file not created: {os.path.basename(actual_path)}")
+        expected = self._read_csv(expected_path, cached=True)
+        try:
+            actual = self._read_csv(actual_path)
+        except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            # A candidate writing an empty or malformed file has failed, not crashed the comparison
+            return self._missing_report(f"Output file unreadable: {os.path.basename(actual_path)}: {e}")
+        return self.compare_frames(expected, actual, key_columns=key_columns)
+
+    def compare_frames(self, expected: pd.DataFrame, actual: pd.DataFrame, key_columns: Optional[List[str]] = None) -> dict:
+        """
+        Returns a report with per-column mismatch counts, a bounded diff sample and a
+        'score' (share of expected cells reproduced; 1.0 on a match).
+        Rows are aligned by position, or by 'key_columns' when given.
+        """
+        if key_columns:
+            expected = expected.sort_values(key_columns, kind="stable").reset_index(drop=True)
+            actual = actual.sort_values([c for c in key_columns if c in actual.columns], kind="stable").reset_index(drop=True)
+
+        shared = [c for c in expected.columns if c in actual.columns]
+        missing = [c for c in expected.columns if c not in actual.columns]
+        extra = [c for c in actual.columns if c not in expected.columns]
+
+        rows = min(len(expected), len(actual))
+        column_mismatches = {}
+        samples = []
+
+        for column in shared:
+            equal = self._column_equal(expected[column].iloc[:rows], actual[column].iloc[:rows])
+            bad_rows = np.flatnonzero(~equal)
+            if len(bad_rows) == 0:
+                continue
+            column_mismatches[column] = int(len(bad_rows))
+            for row in bad_rows[:self.max_samples - len(samples)]:
+                samples.append({
+                    "row": int(row),
+                    "column": column,
+                    "expected": self._plain(expected[column].iloc[row]),
+                    "actual": self._plain(actual[column].iloc[row])
+                })
+
+        # Share of cells reproduced, over the larger of the two shapes
+        cells = max(len(expected), len(actual)) * (len(expected.columns) + len(extra))
+        reproduced = rows * len(shared) - sum(column_mismatches.values())
+        match = not (column_mismatches or missing or extra or len(expected) != len(actual))
+
+        return {
+            "match": match,
+            "score": 1.0 if match else (reproduced / cells if cells else 0.0),
+            "expected_rows": int(len(expected)),
+            "actual_rows": int(len(actual)),
+            "missing_columns": missing,
+            "extra_columns": extra,
+            "column_mismatches": column_mismatches,
+            "samples": samples
+        }
+
+    def row_matches(self, expected: pd.DataFrame, actual: pd.DataFrame) -> np.ndarray:
+        """
+        Returns one boolean per row: True when every column agrees.
+        Both frames must have the same number of rows; a column present on only
+        one side counts as a mismatch wherever that side has a value.
+        """
+        matches = np.ones(len(expected), dtype=bool)
+        for column in expected.columns.union(actual.columns, sort=False):
+            left = expected[column] if column in expected.columns else pd.Series([np.nan] * len(expected))
+            right = actual[column] if column in actual.columns else pd.Series([np.nan] * len(actual))
+            matches &= self._column_equal(left.reset_index(drop=True), right.reset_index(drop=True))
+        return matches
+
+    def _column_equal(self, expected: pd.Series, actual: pd.Series) -> np.ndarray:
+        """Vectorized cell equality for two aligned columns."""
+        expected = expected.reset_index(drop=True)
+        actual = actual.reset_index(drop=True)
+        both_null = (expected.isna() & actual.isna()).to_numpy()
+
+        if not self.normalize_dtypes:
+            return both_null | (expected == actual).to_numpy()
+
+        if pd.api.types.is_numeric_dtype(expected) and pd.api.types.is_numeric_dtype(actual):
+            return both_null | np.isclose(
+                expected.to_numpy(dtype=float), actual.to_numpy(dtype=float),
+                rtol=self.float_tolerance, atol=self.float_tolerance
+            )
+
+        # Cheap pass first: identical cells need no normalization
+        equal = both_null | (expected.to_numpy() == actual.to_numpy())
+        rest = ~equal
+        if not rest.any():
+            return equal
+
+        exp_rest, act_rest = expected[rest], actual[rest]
+        exp_num = pd.to_numeric(exp_rest, errors="coerce").to_numpy(dtype=float)
+        act_num = pd.to_numeric(act_rest, errors="coerce").to_numpy(dtype=float)
+        both_num = ~np.isnan(exp_num) & ~np.isnan(act_num)
+
+        verdict = np.isclose(exp_num, act_num, rtol=self.float_tolerance, atol=self.float_tolerance) & both_num
+
+        # Text comparison for cells that are not numeric on both sides
+        text = ~both_num
+        if text.any():
+            exp_text = exp_rest[text].astype(str).str.strip().to_numpy()
+            act_text = act_rest[text].astype(str).str.strip().to_numpy()
+            # A null on one side never equals text on the other
+            one_null = (exp_rest[text].isna() | act_rest[text].isna()).to_numpy()
+            verdict[text] = (exp_text == act_text) & ~one_null
+
+        equal[rest] = verdict
+        return equal
+
+    def _read_csv(self, path: str, cached: bool = False) -> pd.DataFrame:
+        if cached and self.columnar_cache is not None:
+            return self.columnar_cache.read(path, text=not self.normalize_dtypes)
+        if self.normalize_dtypes:
+            return pd.read_csv(path)
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    def _missing_report(self, reason: str) -> dict:
+        return {
+            "match": False,
+            "score": 0.0,
+            "error": reason,
+            "expected_rows": None,
+            "actual_rows": None,
+            "missing_columns": [],
+            "extra_columns": [],
+            "column_mismatches": {},
+            "samples": []
+        }
+
+    @staticmethod
+    def _plain(value):
+        """Makes numpy scalars JSON/prompt friendly."""
+        if pd.isna(value):
+            return None
+        return value.item() if hasattr(value, "item") else value
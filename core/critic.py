@@ -1,31 +1,184 @@
+import functools
 import importlib.util
+import math
+import multiprocessing
 import os
 import json
+import signal
+import statistics
+import threading
+import pandas as pd
 from sandbox.interface_adapter import SandboxAdapter
+from core.columnar_cache import ColumnarCache
+from core.comparator import OutputComparator
+from core.oracle import GroundTruthOracle
+
+class TrialTimeout(BaseException):
+    """
+    Raised inside a trial that overruns its time budget.
+    Derives from BaseException so candidate code's 'except Exception' cannot swallow it.
+    """
+
+def _load_module(name, path):
+    """Dynamically loads a python module from a file path."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _can_alarm(timeout):
+    """Whether a per-trial 'timeout' can be enforced in this thread (SIGALRM)."""
+    return (
+        timeout is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+def _run_timed_batch(adapter, logic_func, test_inputs, timeout):
+    """
+    Runs a batch of trials (one call when there are several inputs), interrupting
+    it after 'timeout' seconds per input. The alarm only works in a main thread on
+    POSIX; elsewhere the trials run unbounded.
+    """
+    if not test_inputs:
+        return []
+
+    def run():
+        if len(test_inputs) == 1:
+            return [adapter.run_trial(logic_func, test_inputs[0])]
+        return adapter.run_batch(logic_func, test_inputs)
+
+    if not _can_alarm(timeout):
+        return run()
+
+    def on_alarm(signum, frame):
+        raise TrialTimeout()
+
+    budget = timeout * len(test_inputs)
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        return run()
+    except TrialTimeout:
+        return [{"error": f"Timeout: trial exceeded {timeout}s"}] * len(test_inputs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _run_jobs(adapter, source_func, candidate_func, jobs, timeout, batch_size):
+    """
+    Runs (test_input, needs_ground_truth) jobs in batches of 'batch_size'.
+    Returns (ground_truth, candidate_output) per job; ground truth is None when not requested.
+    """
+    outcomes = []
+    for start in range(0, len(jobs), batch_size):
+        batch = jobs[start:start + batch_size]
+        ground_truths = iter(_run_timed_batch(adapter, source_func, [i for i, needed in batch if needed], timeout))
+        candidate_outputs = _run_timed_batch(adapter, candidate_func, [i for i, _ in batch], timeout)
+        for (_, needed), candidate_output in zip(batch, candidate_outputs):
+            outcomes.append((next(ground_truths) if needed else None, candidate_output))
+    return outcomes
+
+# --- Process-pool worker state (one copy per worker process) ---
+_worker = {}
+
+def _init_trial_worker(source_path, candidate_path, trial_timeout, batch_size):
+    _worker["source"] = _load_module("source_logic", source_path).process_data
+    _worker["candidate"] = _load_module("candidate_logic", candidate_path).process_data
+    _worker["adapter"] = SandboxAdapter()
+    _worker["timeout"] = trial_timeout
+    _worker["batch_size"] = batch_size
+
+def _run_trial_chunk(jobs):
+    return _run_jobs(_worker["adapter"], _worker["source"], _worker["candidate"],
+                     jobs, _worker["timeout"], _worker["batch_size"])
+
+class _ShrinkWorker:
+    """
+    A one-process pool for shrink trials, so a hanging candidate stays isolated
+    while its failures are minimized. A wedged worker is replaced.
+    """
+
+    def __init__(self, initargs, backstop):
+        self.initargs = initargs
+        self.backstop = backstop
+        self.pool = None
+
+    def run(self, test_input):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(1, initializer=_init_trial_worker, initargs=self.initargs)
+        try:
+            return self.pool.apply_async(_run_trial_chunk, ([(test_input, True)],)).get(timeout=self.backstop)[0]
+        except multiprocessing.TimeoutError:
+            self.close()
+            return {"error": "Not evaluated"}, {"error": f"Timeout: worker unresponsive after {self.backstop}s"}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
 
 class Critic:
-    def __init__(self, source_path):
-        self.source_module = self._load_module("source_logic", source_path)
-        self.adapter = SandboxAdapter()
+    def __init__(self, source_path=None, workers=None, trial_timeout=None, cache_dir=None, batch_size=1,
+                 comparator=None, generator=None, max_shrinks=3):
+        """
+        Args:
+            source_path: Path to the ground-truth module (must expose process_data).
+                         Without one, only compare_outputs is available (e.g. when the
+                         ground truth is the PSPP output of an SPSS script).
+            workers: Process count for parallel evaluation (defaults to CPU count).
+            trial_timeout: (Optional) Seconds a single trial may run before it is failed.
+            cache_dir: (Optional) Where to persist ground-truth outputs across runs, and
+                       (with the default comparator) columnar copies of compared CSVs.
+                       Without it, outputs are only remembered for this Critic's lifetime.
+            batch_size: Trials per process_data call. Values above 1 run many inputs
+                        through one multi-row CSV, which assumes row-wise logic.
+            comparator: (Optional) OutputComparator deciding equality (float tolerance etc).
+            generator: (Optional) InputGenerator, e.g. InputGenerator.from_profile(...).
+            max_shrinks: How many failures per evaluation get shrunk to a minimal input.
+        """
+        self.source_path = os.path.abspath(source_path) if source_path else None
+        self.source_module = self._load_module("source_logic", source_path) if source_path else None
+        self.adapter = SandboxAdapter(generator=generator)
+        self.workers = workers or os.cpu_count() or 1
+        self.trial_timeout = trial_timeout
+        self.oracle = GroundTruthOracle(self.source_path, cache_dir=cache_dir) if source_path else None
+        self.batch_size = max(1, batch_size)
+        if comparator is None:
+            columnar = ColumnarCache(os.path.join(cache_dir, "columnar")) if cache_dir else None
+            comparator = OutputComparator(columnar_cache=columnar)
+        self.comparator = comparator
+        self.max_shrinks = max_shrinks
 
     def _load_module(self, name, path):
         """Dynamically loads a python module from a file path."""
-        spec = importlib.util.spec_from_file_location(name, path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
+        return _load_module(name, path)
 
-    def evaluate(self, candidate_path, num_trials=5):
+    def evaluate(self, candidate_path, num_trials=5, parallel=False,
+                 fail_fast=False, max_failures=None, confidence=None, tolerance=0.01):
         """
-        Runs the Source vs Candidate on 'num_trials' random inputs.
+        Runs the Source vs Candidate on up to 'num_trials' random inputs.
         Returns a structured Report.
+
+        With 'parallel=True' the trials are spread across a process pool, so a
+        hanging candidate costs at most 'trial_timeout' per worker.
+
+        Early exit (checked after every round of trials):
+            fail_fast: Stop at the first failing round.
+            max_failures: Stop once this many failures are collected.
+            confidence: Sequential test. Stop as soon as the candidate is, at this
+                        confidence level, either below 'tolerance' failure rate
+                        (no failures in enough trials) or above it (Wilson bound).
         """
+        if self.source_module is None:
+            raise ValueError("evaluate() needs a ground-truth source module; use compare_outputs() instead.")
+
         results = {
             "pass": True,
             "score": 0.0,
             "failures": []
         }
-        
+
         try:
             candidate_module = self._load_module("candidate_logic", candidate_path)
         except Exception as e:
@@ -33,29 +186,235 @@ class Critic:
             results["failures"].append({"type": "Syntax/Import Error", "details": str(e)})
             return results
 
+        if confidence is not None and not (0 < confidence < 1 and 0 < tolerance < 1):
+            raise ValueError("confidence and tolerance must both be between 0 and 1.")
+        if fail_fast:
+            max_failures = 1
+        early_exit = max_failures is not None or confidence is not None
+
+        # 1. Generate Inputs up front so both modes see the same trial indices
+        test_inputs = [self.adapter.generate_input() for _ in range(num_trials)]
+
+        # 2. Recall known Ground Truth; only unseen inputs run the legacy code
+        known, jobs = self._plan_ground_truth(test_inputs)
+
+        # 3. Run Ground Truth (where needed) and Candidate, one round at a time
+        if parallel:
+            rounds = self._iter_parallel(candidate_path, jobs)
+        else:
+            round_size = max(self.batch_size, 10) if early_exit else max(1, len(jobs))
+            rounds = self._iter_serial(candidate_module, jobs, round_size)
+
+        trials_run = 0
         passed_count = 0
+        column_mismatches = {}
+        stopped_early = None
+        try:
+            for raw_round in rounds:
+                round_inputs = test_inputs[trials_run:trials_run + len(raw_round)]
+                outcomes = self._resolve_ground_truth(round_inputs, known, raw_round)
+
+                # Coverage feedback: inputs that reached new source behaviour get favoured
+                for test_input, (ground_truth, _) in zip(round_inputs, outcomes):
+                    self.adapter.generator.observe(test_input, ground_truth)
+
+                # 4. Compare (vectorized across the whole round)
+                matches, round_mismatches = self._compare(outcomes)
+                for column, count in round_mismatches.items():
+                    column_mismatches[column] = column_mismatches.get(column, 0) + count
 
-        for i in range(num_trials):
-            # 1. Generate Input
-            test_input = self.adapter.generate_input()
-            
-            # 2. Run Ground Truth
-            ground_truth = self.adapter.run_trial(self.source_module.process_data, test_input)
-            
-            # 3. Run Candidate
-            candidate_output = self.adapter.run_trial(candidate_module.process_data, test_input)
-            
-            # 4. Compare
-            if ground_truth == candidate_output:
-                passed_count += 1
+                for offset, (test_input, (ground_truth, candidate_output)) in enumerate(zip(round_inputs, outcomes)):
+                    if matches[offset]:
+                        passed_count += 1
+                    elif max_failures is None or len(results["failures"]) < max_failures:
+                        results["failures"].append({
+                            "trial_index": trials_run + offset,
+                            "input_value": test_input,
+                            "expected": ground_truth,
+                            "actual": candidate_output
+                        })
+                trials_run += len(raw_round)
+
+                stopped_early = self._stopping_reason(
+                    trials_run, trials_run - passed_count, max_failures, confidence, tolerance
+                )
+                if stopped_early and trials_run < num_trials:
+                    break
+                stopped_early = None
+        finally:
+            # Stops the process pool (if any) when we leave before the last round
+            rounds.close()
+
+        # 5. Shrink the first few failures to minimal counterexamples, isolated like the trials were
+        to_shrink = results["failures"][:self.max_shrinks]
+        shrink_worker = None
+        if parallel and to_shrink:
+            initargs = (self.source_path, os.path.abspath(candidate_path), self.trial_timeout, 1)
+            backstop = self.trial_timeout * 3 + 5 if self.trial_timeout is not None else None
+            shrink_worker = _ShrinkWorker(initargs, backstop)
+            run_trial = shrink_worker.run
+        elif to_shrink and self.trial_timeout is not None and not _can_alarm(self.trial_timeout):
+            print("⚠️ Warning: Not shrinking failures: trial_timeout cannot be enforced off the main thread.")
+            to_shrink = []
+        else:
+            run_trial = functools.partial(self._run_in_process, candidate_module)
+        try:
+            for failure in to_shrink:
+                minimal = self._shrink(run_trial, failure["input_value"])
+                if minimal != failure["input_value"]:
+                    failure["minimal_input"] = minimal
+        finally:
+            if shrink_worker is not None:
+                shrink_worker.close()
+
+        results["pass"] = passed_count == trials_run
+        results["score"] = passed_count / trials_run if trials_run else 0.0
+        results["column_mismatches"] = column_mismatches
+        results["trials_run"] = trials_run
+        results["stopped_early"] = stopped_early
+        return results
+
+    @staticmethod
+    def _stopping_reason(trials, failures, max_failures, confidence, tolerance):
+        """Returns why evaluation can stop after 'trials', or None to keep going."""
+        if max_failures is not None and failures >= max_failures:
+            return "max_failures"
+        if confidence is None or trials == 0:
+            return None
+
+        if failures == 0:
+            # Zero failures in n trials bounds the failure rate below 'tolerance'
+            # once (1 - tolerance)^n <= 1 - confidence (the 'rule of three' at 95%).
+            needed = math.ceil(math.log(1 - confidence) / math.log(1 - tolerance))
+            return "confident_pass" if trials >= needed else None
+
+        # Wilson lower bound on the failure rate: confidently worse than tolerated
+        z = statistics.NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+        rate = failures / trials
+        centre = rate + z * z / (2 * trials)
+        spread = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials))
+        lower = (centre - spread) / (1 + z * z / trials)
+        return "confident_fail" if lower > tolerance else None
+
+    def _compare(self, outcomes):
+        """Returns (per-trial match flags, per-column mismatch counts)."""
+        expected = pd.DataFrame([self._comparable(ground_truth, "source") for ground_truth, _ in outcomes])
+        actual = pd.DataFrame([self._comparable(candidate_output, "candidate") for _, candidate_output in outcomes])
+        matches = self.comparator.row_matches(expected, actual)
+        return matches, self.comparator.compare_frames(expected, actual)["column_mismatches"]
+
+    @staticmethod
+    def _comparable(output, side):
+        """
+        Rejecting an input is the behaviour; the exception text is not. Two
+        exceptions match when they have the same type, other errors (e.g. an empty
+        output file) when they are the same. Harness failures (a timeout) are
+        tagged with 'side', so they never match anything.
+        """
+        if isinstance(output, dict) and "error" in output:
+            error = str(output["error"])
+            if error.startswith(GroundTruthOracle.VOLATILE_ERRORS):
+                return {"error": f"{side}: {error}"}
+            exception, separator, _ = error.partition(":")
+            if separator and exception.isidentifier():
+                return {"error": exception}
+            return {"error": error}
+        return output
+
+    def _shrink(self, run_trial, test_input):
+        """
+        Minimizes a failing input by re-running source and candidate on simpler ones.
+        'run_trial' maps an input to its (ground_truth, candidate_output).
+        """
+        def still_fails(smaller):
+            matches, _ = self._compare([run_trial(smaller)])
+            return not matches[0]
+        return self.adapter.generator.shrink(test_input, still_fails)
+
+    def _run_in_process(self, candidate_module, test_input):
+        ground_truth = _run_timed_batch(self.adapter, self.source_module.process_data, [test_input], self.trial_timeout)
+        candidate_output = _run_timed_batch(self.adapter, candidate_module.process_data, [test_input], self.trial_timeout)
+        return ground_truth[0], candidate_output[0]
+
+    def compare_outputs(self, expected_path, candidate_path, key_columns=None):
+        """
+        Compares two complete output files (e.g. the PSPP gold standard against a
+        candidate's CSV). Returns the comparator report: per-column mismatch
+        counts plus a bounded sample of diffs.
+        """
+        return self.comparator.compare_files(expected_path, candidate_path, key_columns=key_columns)
+
+    def _plan_ground_truth(self, test_inputs):
+        """
+        Looks every distinct input up in the oracle. Returns the known outputs
+        (by input hash) and one job per trial flagging whether the source must run.
+        Repeated unseen inputs only run the source once.
+        """
+        known = {}
+        scheduled = set()
+        jobs = []
+        for test_input in test_inputs:
+            key = GroundTruthOracle.hash_input(test_input)
+            if key not in known and key not in scheduled:
+                cached = self.oracle.lookup(test_input)
+                if cached is not None:
+                    known[key] = cached
+            needs_ground_truth = key not in known and key not in scheduled
+            if needs_ground_truth:
+                scheduled.add(key)
+            jobs.append((test_input, needs_ground_truth))
+        return known, jobs
+
+    def _resolve_ground_truth(self, test_inputs, known, raw_outcomes):
+        """Fills in recalled ground truth and records freshly computed outputs."""
+        fresh = []
+        for test_input, (ground_truth, _) in zip(test_inputs, raw_outcomes):
+            if ground_truth is not None:
+                known[GroundTruthOracle.hash_input(test_input)] = ground_truth
+                fresh.append((test_input, ground_truth))
+        self.oracle.store_many(fresh)
+
+        outcomes = []
+        for test_input, (ground_truth, candidate_output) in zip(test_inputs, raw_outcomes):
+            if ground_truth is None:
+                ground_truth = known.get(GroundTruthOracle.hash_input(test_input), {"error": "Not evaluated"})
+            outcomes.append((ground_truth, candidate_output))
+        return outcomes
+
+    def _iter_serial(self, candidate_module, jobs, round_size):
+        """Yields raw outcomes for consecutive rounds of jobs, run in-process."""
+        for start in range(0, len(jobs), round_size):
+            yield _run_jobs(self.adapter, self.source_module.process_data, candidate_module.process_data,
+                            jobs[start:start + round_size], self.trial_timeout, self.batch_size)
+
+    def _iter_parallel(self, candidate_path, jobs):
+        """
+        Fans trials out over a process pool and yields each chunk's raw outcomes
+        in job order. Each worker enforces the per-trial alarm itself; the parent
+        keeps a backstop for code that ignores signals (e.g. stuck in C) and tears
+        the pool down if it trips. Closing the generator early also stops the pool.
+        """
+        if not jobs:
+            return
+        workers = min(self.workers, len(jobs)) or 1
+        chunksize = max(self.batch_size, len(jobs) // (workers * 4))
+        chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+        backstop = None
+        if self.trial_timeout is not None:
+            backstop = self.trial_timeout * 3 * chunksize + 5
+
+        initargs = (self.source_path, os.path.abspath(candidate_path), self.trial_timeout, self.batch_size)
+        with multiprocessing.Pool(workers, initializer=_init_trial_worker, initargs=initargs) as pool:
+            pending = pool.imap(_run_trial_chunk, chunks)
+            for index, chunk in enumerate(chunks):
+                try:
+                    yield pending.next(timeout=backstop)
+                except multiprocessing.TimeoutError:
+                    break
             else:
-                results["pass"] = False
-                results["failures"].append({
-                    "trial_index": i,
-                    "input_value": test_input,
-                    "expected": ground_truth,
-                    "actual": candidate_output
-                })
-
-        results["score"] = passed_count / num_trials
-        return results
\ No newline at end of file
+                return
+            # Leaving the block terminates the pool, killing any wedged workers
+
+        # Anything the backstop cut off is a timeout for the candidate
+        unresponsive = ({"error": "Not evaluated"}, {"error": f"Timeout: worker unresponsive after {backstop}s"})
+        yield [unresponsive] * sum(len(chunk) for chunk in chunks[index:])
@@ -1,26 +1,195 @@
-import pandas as pd
+import json
 import os
+import threading
+from typing import Optional
+import numpy as np
+import pandas as pd
+from core.columnar_cache import ColumnarCache
+from core.sketches import HyperLogLog, ReservoirSample
+from utils.file_hash import FileHashCache
 
 class DataProfiler:
     """
     The Forensic Analyst.
     Reads input/output artifacts to give the SpecWriter 'Ground Truth' on what actually changed.
+
+    Profiles stream the whole file in chunks with bounded memory (a HyperLogLog
+    and a reservoir per column), and are cached by file content hash.
     """
-    
+
+    QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+    MAX_SAMPLE_VALUES = 20
+
+    def __init__(self, cache_dir: Optional[str] = None, chunksize: int = 200_000,
+                 columnar_cache: Optional[ColumnarCache] = None):
+        """
+        Args:
+            cache_dir: (Optional) Directory for profiles on disk; without it they are cached per process.
+            chunksize: Rows parsed per chunk (bounds memory on huge files).
+            columnar_cache: (Optional) ColumnarCache to scan instead of parsing the CSV text.
+        """
+        self.cache_dir = cache_dir
+        self.chunksize = chunksize
+        self.columnar_cache = columnar_cache
+        self._profiles = {}
+        self._hasher = FileHashCache()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
     def sniff(self, file_path: str) -> str:
-        """Returns a markdown summary of the CSV: Columns, Types, and Head."""
+        """Returns a markdown summary of the CSV: full-file column profile and the head."""
         if not os.path.exists(file_path):
             return f"(File not found: {os.path.basename(file_path)})"
 
         try:
-            # Read only first 5 rows to save tokens and time
-            df = pd.read_csv(file_path, nrows=5)
-            
+            profile = self.profile(file_path)
+            head = pd.read_csv(file_path, nrows=5)
+
+            rows = []
+            for name, stats in profile["columns"].items():
+                rows.append({
+                    "column": name,
+                    "kind": stats["kind"],
+                    "null %": round(100 * stats["null_rate"], 2),
+                    "min": stats["min"],
+                    "max": stats["max"],
+                    "distinct (est.)": stats["distinct"],
+                    "median": stats["quantiles"].get("p50"),
+                })
+
             summary = f"### File: {os.path.basename(file_path)}\n"
-            summary += f"- **Shape:** {df.shape[0]} rows (sample) x {df.shape[1]} columns\n"
-            summary += f"- **Columns:** {', '.join(list(df.columns))}\n"
+            summary += f"- **Shape:** {profile['rows']} rows x {len(profile['columns'])} columns\n"
+            summary += f"- **Columns:** {', '.join(profile['columns'])}\n"
+            summary += "- **Column Profile:**\n"
+            summary += pd.DataFrame(rows).to_markdown(index=False) + "\n"
             summary += "- **Data Sample:**\n"
-            summary += df.to_markdown(index=False)
+            summary += head.to_markdown(index=False)
             return summary
         except Exception as e:
-            return f"(Error reading {os.path.basename(file_path)}: {e})"
\ No newline at end of file
+            return f"(Error reading {os.path.basename(file_path)}: {e})"
+
+    def profile(self, file_path: str, nrows: Optional[int] = None) -> dict:
+        """
+        Returns a structured per-column profile, suitable for InputGenerator.from_profile:
+        {file, rows, rows_sampled, columns: {name: {kind, null_rate, min, max, distinct,
+        quantiles, sample_values}}}. 'nrows' limits profiling to the first rows.
+        """
+        key = f"{self.file_hash(file_path)}:{nrows or 'all'}"
+        with self._lock:
+            cached = self._profiles.get(key)
+        if cached is None and self.cache_dir:
+            cached = self._load(key)
+        if cached is None:
+            cached = self._profile_stream(file_path, nrows)
+            if self.cache_dir:
+                self._store(key, cached)
+        with self._lock:
+            self._profiles[key] = cached
+        return {**cached, "file": os.path.basename(file_path)}
+
+    def file_hash(self, file_path: str) -> str:
+        """SHA-256 of the file, remembered per (path, size, mtime) so it is computed once."""
+        return self._hasher.hash(file_path)
+
+    def _profile_stream(self, file_path: str, nrows: Optional[int]) -> dict:
+        columns = {}
+        rows = 0
+        if self.columnar_cache is not None:
+            chunks = self.columnar_cache.iter_chunks(file_path, self.chunksize, nrows=nrows)
+        else:
+            chunks = pd.read_csv(file_path, chunksize=self.chunksize, nrows=nrows)
+        for chunk in chunks:
+            rows += len(chunk)
+            for name in chunk.columns:
+                state = columns.get(name)
+                if state is None:
+                    state = columns[name] = _ColumnState()
+                state.add(chunk[name])
+
+        return {
+            "file": os.path.basename(file_path),
+            "rows": rows,
+            "rows_sampled": rows,
+            "columns": {name: state.summary(rows, self.QUANTILES) for name, state in columns.items()}
+        }
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key.replace(":", "_") + ".json")
+
+    def _load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._cache_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, profile: dict):
+        tmp_path = self._cache_path(key) + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, self._cache_path(key))
+
+class _ColumnState:
+    """Running statistics for one column across chunks."""
+
+    def __init__(self):
+        self.nulls = 0
+        self.text = False        # Saw a value that is not a number
+        self.fractional = False  # Saw a number with a fractional part
+        self.boolean = False
+        self.min = None
+        self.max = None
+        self.distinct = HyperLogLog()
+        self.reservoir = ReservoirSample()
+        self.samples = []
+
+    def add(self, series: pd.Series):
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        if present.empty:
+            return
+        if len(self.samples) < DataProfiler.MAX_SAMPLE_VALUES:
+            for value in present.unique()[:DataProfiler.MAX_SAMPLE_VALUES]:
+                value = value.item() if hasattr(value, "item") else value
+                if value not in self.samples and len(self.samples) < DataProfiler.MAX_SAMPLE_VALUES:
+                    self.samples.append(value)
+
+        if pd.api.types.is_bool_dtype(present):
+            self.boolean = True
+            self.distinct.add_many(present.astype(str).to_numpy())
+            return
+
+        numbers = present if pd.api.types.is_numeric_dtype(present) else pd.to_numeric(present, errors="coerce")
+        is_text = numbers.isna().to_numpy()
+        if is_text.any():
+            self.text = True
+            self.distinct.add_many(present[is_text].astype(str).to_numpy())
+        numbers = numbers.dropna().to_numpy(dtype=np.float64)
+        if numbers.size == 0:
+            return
+        # Numbers are hashed as float64 whatever the chunk's dtype, so '5' and 5.0 count once
+        self.distinct.add_many(numbers)
+        if not self.fractional and not (numbers % 1 == 0).all():
+            self.fractional = True
+        low, high = float(numbers.min()), float(numbers.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.reservoir.add_many(numbers)
+
+    def summary(self, rows: int, quantiles) -> dict:
+        if self.boolean or self.text or self.min is None:
+            kind = "str"
+        else:
+            kind = "float" if self.fractional else "int"
+        numeric = kind != "str"
+        cast = int if kind == "int" else float
+        return {
+            "kind": kind,
+            "null_rate": self.nulls / rows if rows else 0.0,
+            "min": cast(self.min) if numeric else None,
+            "max": cast(self.max) if numeric else None,
+            "distinct": self.distinct.estimate(),
+            "quantiles": self.reservoir.quantiles(quantiles) if numeric else {},
+            "sample_values": self.samples,
+        }
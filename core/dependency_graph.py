@@ -0,0 +1,153 @@
+import heapq
+import os
+from typing import Dict, Iterable, List, Optional, Set
+from core.structure_parser import CodeStructureParser
+
+class DependencyGraph:
+    """
+    The Map of the Repository.
+    A file-level DAG of SPSS scripts: script B depends on script A when B reads
+    a file A writes, or when B INCLUDEs/INSERTs A.
+
+    File references are normalized relative to the repository root (SPSS
+    resolves relative paths against the working directory, which for a
+    migration is the repository). Scripts are re-parsed only when their
+    content hash changes.
+    """
+
+    def __init__(self):
+        self._parsed: Dict[str, str] = {}           # script -> content hash it was parsed from
+        self._reads: Dict[str, Set[str]] = {}       # script -> files it reads (incl. includes)
+        self._writes: Dict[str, Set[str]] = {}      # script -> files it writes
+        self._writers: Dict[str, Set[str]] = {}     # file -> scripts writing it
+        self._readers: Dict[str, Set[str]] = {}     # file -> scripts reading it
+
+    @staticmethod
+    def normalize(reference: str) -> str:
+        """Canonical form for a path written in a script ('.\\\\data\\\\x.sav' -> 'data/x.sav')."""
+        path = reference.strip().replace("\\", "/")
+        return os.path.normpath(path).replace(os.sep, "/") if path else path
+
+    # --- Incremental updates -----------------------------------------------
+
+    def update_file(self, path: str, code: str, content_hash: Optional[str] = None) -> bool:
+        """
+        (Re)indexes one script. Returns False when 'content_hash' matches the
+        version already indexed and nothing had to be parsed.
+        """
+        path = self.normalize(path)
+        if content_hash is not None and self._parsed.get(path) == content_hash:
+            return False
+
+        refs = CodeStructureParser.extract_file_references(code)
+        self._unlink(path)
+        self._reads[path] = {self.normalize(r) for r in refs["reads"] + refs["includes"]}
+        self._writes[path] = {self.normalize(w) for w in refs["writes"]}
+        for ref in self._reads[path]:
+            self._readers.setdefault(ref, set()).add(path)
+        for ref in self._writes[path]:
+            self._writers.setdefault(ref, set()).add(path)
+        self._parsed[path] = content_hash
+        return True
+
+    def remove_file(self, path: str):
+        path = self.normalize(path)
+        self._unlink(path)
+        self._parsed.pop(path, None)
+
+    def _unlink(self, path):
+        for ref in self._reads.pop(path, ()):
+            self._discard(self._readers, ref, path)
+        for ref in self._writes.pop(path, ()):
+            self._discard(self._writers, ref, path)
+
+    @staticmethod
+    def _discard(index, ref, path):
+        scripts = index.get(ref)
+        if scripts is not None:
+            scripts.discard(path)
+            if not scripts:
+                del index[ref]
+
+    # --- Queries -----------------------------------------------------------
+
+    @property
+    def scripts(self) -> List[str]:
+        return sorted(self._parsed)
+
+    def reads(self, script: str) -> List[str]:
+        return sorted(self._reads.get(self.normalize(script), ()))
+
+    def writes(self, script: str) -> List[str]:
+        return sorted(self._writes.get(self.normalize(script), ()))
+
+    def dependencies(self, script: str) -> List[str]:
+        """Scripts that must run before 'script' (direct only)."""
+        script = self.normalize(script)
+        upstream = set()
+        for ref in self._reads.get(script, ()):
+            upstream |= self._writers.get(ref, set())
+            if ref in self._parsed:
+                upstream.add(ref)  # INCLUDE of another script
+        upstream.discard(script)
+        return sorted(upstream)
+
+    def dependents(self, script: str) -> List[str]:
+        """Scripts that consume what 'script' produces, or include it (direct only)."""
+        script = self.normalize(script)
+        downstream = set(self._readers.get(script, ()))
+        for ref in self._writes.get(script, ()):
+            downstream |= self._readers.get(ref, set())
+        downstream.discard(script)
+        return sorted(downstream)
+
+    def topological_order(self, scripts: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Scripts ordered so producers come before consumers (Kahn's algorithm,
+        ties broken by path so the order is deterministic). Restrict to a subset
+        with 'scripts'. Raises ValueError if the scripts form a cycle.
+        """
+        nodes = {self.normalize(s) for s in scripts} if scripts is not None else set(self._parsed)
+        upstream = {node: [d for d in self.dependencies(node) if d in nodes] for node in nodes}
+        indegree = {node: len(deps) for node, deps in upstream.items()}
+        downstream = {node: [] for node in nodes}
+        for node, deps in upstream.items():
+            for dep in deps:
+                downstream[dep].append(node)
+
+        ready = [node for node, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(node)
+            for child in downstream[node]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, child)
+
+        if len(order) != len(nodes):
+            stuck = sorted(node for node, degree in indegree.items() if degree > 0)
+            raise ValueError(f"Dependency cycle between scripts: {', '.join(stuck)}")
+        return order
+
+    def affected(self, paths: Iterable[str]) -> List[str]:
+        """
+        Every script whose result can change when 'paths' (scripts or data files)
+        change: changed scripts themselves plus everything downstream, in topological order.
+        """
+        frontier = []
+        for path in paths:
+            path = self.normalize(path)
+            if path in self._parsed:
+                frontier.append(path)
+            frontier.extend(self._readers.get(path, ()))
+
+        seen = set()
+        while frontier:
+            script = frontier.pop()
+            if script in seen:
+                continue
+            seen.add(script)
+            frontier.extend(self.dependents(script))
+        return self.topological_order(seen)
@@ -1,10 +1,21 @@
 import os
+import sys
+import json
 import glob
+import time
+import threading
 import subprocess
 import datetime
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from core.structure_parser import CodeStructureParser
 from core.spec_writer import SpecWriter
+from core.columnar_cache import ColumnarCache
+from core.comparator import OutputComparator
 from utils.llm_client import LLMClient
+from utils.response_cache import ResponseCache
 
 # --- ENSURE THESE ARE PRESENT ---
 from core.builder import Builder
@@ -12,57 +23,413 @@ from core.critic import Critic
 from core.optimizer import Optimizer
 # --------------------------------
 
+# Runs a candidate's process_data in its own interpreter. argv: candidate, input, output
+_CANDIDATE_RUNNER = (
+    "import importlib.util, sys\n"
+    "spec = importlib.util.spec_from_file_location('candidate_logic', sys.argv[1])\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+    "module.process_data(sys.argv[2], sys.argv[3])\n"
+)
+
+@dataclass
+class SearchBudget:
+    """
+    Compute limits for EvolutionEngine.search; None means unlimited.
+    'llm_calls' counts SpecWriter, Optimizer and Builder requests, 'trials' counts candidate runs.
+    """
+    llm_calls: Optional[int] = None
+    trials: Optional[int] = None
+    seconds: Optional[float] = None
+
+    def exhausted(self, llm_calls: int, trials: int, seconds: float, cost=(0, 0)) -> Optional[str]:
+        """Returns the limit that rules out a step costing 'cost' (llm calls, trials), or None."""
+        if self.seconds is not None and seconds >= self.seconds:
+            return "seconds"
+        if self.llm_calls is not None and llm_calls + cost[0] > self.llm_calls:
+            return "llm_calls"
+        if self.trials is not None and trials + cost[1] > self.trials:
+            return "trials"
+        return None
+
 class EvolutionEngine:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, cache_dir: str = ".llm_cache", history_dir: str = "history",
+                 candidate_timeout: float = 300, entry_point: Optional[str] = None):
+        """
+        Args:
+            repo_path: Directory holding the SPSS script and its input data.
+            cache_dir: Where LLM responses and columnar copies of the gold output are cached.
+            history_dir: Where each run's specs, candidates and reports are written.
+            candidate_timeout: Seconds a candidate may run before it is failed.
+            entry_point: (Optional) The script to migrate, relative to repo_path. It runs with
+                         repo_path as the working directory, wherever it lives. Defaults to the
+                         first top-level .sps (see MigrationScheduler for all of them).
+        """
         self.repo_path = os.path.abspath(repo_path)
         if not os.path.exists(self.repo_path):
             raise FileNotFoundError(f"Repo not found: {self.repo_path}")
+        self.history_dir = history_dir
+        self.candidate_timeout = candidate_timeout
+        self.last_run = None
 
         # 1. Discover Entry Point
-        sps_files = glob.glob(os.path.join(self.repo_path, "*.sps"))
-        if not sps_files:
-            raise ValueError("No .sps file found. Cannot establish Gold Standard.")
-        self.entry_point = sps_files[0]
-        
+        if entry_point is not None:
+            self.entry_point = os.path.join(self.repo_path, entry_point)
+            if not os.path.isfile(self.entry_point):
+                raise FileNotFoundError(f"Entry point not found: {self.entry_point}")
+        else:
+            sps_files = sorted(glob.glob(os.path.join(self.repo_path, "*.sps")))
+            if not sps_files:
+                raise ValueError("No .sps file found. Cannot establish Gold Standard.")
+            self.entry_point = sps_files[0]
+
         # 2. Parse Output Target
         with open(self.entry_point, 'r') as f:
             self.code_content = f.read()
-        self.target_output_file = CodeStructureParser.extract_output_filename(self.code_content)
-        if not self.target_output_file:
-             self.target_output_file = "output.txt"
-        
+        # Every SAVE / EXPORT target is verified; the first one is the primary target
+        self.target_output_files = CodeStructureParser.extract_output_filenames(self.code_content)
+        if not self.target_output_files:
+            self.target_output_files = ["output.txt"]
+        self.target_output_file = self.target_output_files[0]
+        # Candidates get the first existing file the script reads (if any) as their input
+        inputs = [os.path.join(self.repo_path, p) for p in CodeStructureParser.parse_ast(self.code_content).input_files]
+        self.input_file = next((p for p in inputs if os.path.exists(p)), "")
+
         # 3. Run Gold Standard
         self._run_gold_standard()
 
         # 4. Initialize Agents
-        self.llm_client = LLMClient(temperature=0.0)
+        # Temperature is pinned to 0.0, so identical prompts can be replayed from disk
+        self.llm_client = LLMClient(temperature=0.0, cache=ResponseCache(cache_dir))
         self.writer = SpecWriter(self.llm_client)
         self.builder = Builder(self.llm_client)
-        self.critic = Critic(self.repo_path)
+        # The gold output is the ground truth; its columnar copy is reused by every comparison
+        self.critic = Critic(comparator=OutputComparator(columnar_cache=ColumnarCache(os.path.join(cache_dir, "columnar"))))
         self.optimizer = Optimizer(self.llm_client)
 
     def _run_gold_standard(self):
-        expected_path = os.path.join(self.repo_path, self.target_output_file)
-        if os.path.exists(expected_path):
-            os.remove(expected_path)
+        expected_paths = [os.path.join(self.repo_path, name) for name in self.target_output_files]
+        for expected_path in expected_paths:
+            if os.path.exists(expected_path):
+                os.remove(expected_path)
         try:
             subprocess.run(["pspp", self.entry_point], cwd=self.repo_path, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Gold Standard PSPP failed:\n{e.stderr.decode()}")
-        if not os.path.exists(expected_path):
-            raise RuntimeError(f"Output file '{self.target_output_file}' not found after execution.")
+        for name, expected_path in zip(self.target_output_files, expected_paths):
+            if not os.path.exists(expected_path):
+                raise RuntimeError(f"Output file '{name}' not found after execution.")
 
-    def start(self, max_iterations=5):
-        # Basic implementation to satisfy the integration test
+    def start(self, max_iterations=5, max_in_flight=3, speculative_temperature=0.7):
+        """
+        Runs the spec -> build -> critique -> optimize loop as a pipeline.
+        Returns True once a candidate reproduces the gold output (details in self.last_run).
+
+        Each spec gets up to 'max_in_flight' candidates, built and critiqued
+        concurrently: variant 0 at the client's temperature, the others sampled
+        at 'speculative_temperature'. The first failing report starts the
+        Optimizer on the next spec while the remaining candidates are still
+        running, and a new spec takes the place of older candidates that have
+        not started. As soon as one candidate passes, queued work is cancelled
+        and running candidates are stopped.
+        """
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        run_dir = os.path.join("history", f"run_{timestamp}") 
-        iter_dir = os.path.join(run_dir, "iteration_01")
-        os.makedirs(iter_dir, exist_ok=True)
-        
-        # Generate Spec
-        spec_content = self.writer.initial_draft(self.code_content)
-        
-        # Save Spec
-        with open(os.path.join(iter_dir, "spec.md"), "w") as f:
+        self.run_dir = os.path.abspath(os.path.join(self.history_dir, f"run_{timestamp}"))
+        started = time.perf_counter()
+        stop = threading.Event()
+        self.last_run = {"pass": False, "iterations": 1, "candidates": 0}
+
+        # 1. Initial spec: the one stage nothing can overlap with
+        specs = {1: self.writer.initial_draft(self.code_content)}
+        self._record_spec(1, specs[1])
+
+        pool = ThreadPoolExecutor(max_workers=max_in_flight + 1)  # Candidates + one Optimizer call
+        pending = {}     # future -> (stage, iteration, variant)
+        queued = deque((1, variant) for variant in range(max_in_flight))
+        optimized = set()  # Iterations whose failure already went to the Optimizer
+        try:
+            while queued or pending:
+                # 2. Fill free candidate slots
+                while queued and sum(stage == "candidate" for stage, _, _ in pending.values()) < max_in_flight:
+                    iteration, variant = queued.popleft()
+                    temperature = speculative_temperature if variant else None
+                    future = pool.submit(self._candidate, self._iteration_dir(iteration), f"candidate_{variant + 1:02d}",
+                                         specs[iteration], stop, temperature, variant)
+                    pending[future] = ("candidate", iteration, variant)
+                    self.last_run["candidates"] += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, iteration, variant = pending.pop(future)
+
+                    # 3. A new spec supersedes candidates of older specs that have not started
+                    if stage == "spec":
+                        specs[iteration] = future.result()
+                        self._record_spec(iteration, specs[iteration])
+                        self.last_run["iterations"] = iteration
+                        queued = deque((iteration, v) for v in range(max_in_flight))
+                        continue
+
+                    report = future.result()
+                    if report["pass"]:
+                        self.last_run.update({
+                            "pass": True,
+                            "iteration": iteration,
+                            "variant": variant,
+                            "candidate_path": report["candidate_path"],
+                            "spec": specs[iteration],
+                        })
+                        return True
+
+                    # 4. Optimize on the first failure of the newest spec
+                    latest = max(specs)
+                    if iteration == latest < max_iterations and iteration not in optimized:
+                        optimized.add(iteration)
+                        future = pool.submit(self.optimizer.evolve, specs[iteration], report)
+                        pending[future] = ("spec", iteration + 1, None)
+            return False
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.last_run["seconds"] = time.perf_counter() - started
+            verdict = "✅ Passed" if self.last_run["pass"] else "❌ No passing candidate"
+            print(f"{verdict} after {self.last_run['iterations']} iteration(s), "
+                  f"{self.last_run['candidates']} candidate(s) in {self.last_run['seconds']:.1f}s")
+
+    def search(self, population=4, budget: Optional[SearchBudget] = None, max_generations=10,
+               speculative_temperature=0.7):
+        """
+        Population (beam) search over specs. Returns True once a candidate reproduces
+        the gold output; the best member found is in self.last_run["best"] either way.
+
+        Generation 0 builds 'population' candidates from the initial spec. Every
+        later generation evolves 'population' children from the beam (the best
+        members so far by Critic score), spread over the parents in rank order;
+        each child is rewritten by the Optimizer, built and critiqued in one
+        concurrent job. Parents stay in the selection, so the beam never gets
+        worse. Each rewrite of a spec asks the Optimizer for a new variant, and
+        children repeating a spec already tried are not built.
+
+        The search stops at the first pass, after 'max_generations', or when the
+        budget cannot pay for another member (running members are stopped when
+        the wall time runs out). The reason is in self.last_run["stopped"].
+        """
+        budget = budget or SearchBudget()
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.run_dir = os.path.abspath(os.path.join(self.history_dir, f"run_{timestamp}"))
+        started = time.perf_counter()
+        stop = threading.Event()
+        usage = {"llm_calls": 1, "trials": 0}
+        self.last_run = {"pass": False, "generations": 0, "candidates": 0, "stopped": None, "best": None}
+
+        def elapsed():
+            return time.perf_counter() - started
+
+        def remaining():
+            return None if budget.seconds is None else max(0.0, budget.seconds - elapsed())
+
+        # 1. Seed: the initial draft
+        seed = self.writer.initial_draft(self.code_content)
+        self._record_spec(0, seed, "seed_spec.md", stage="generation")
+        seen = {seed}
+        seen_lock = threading.Lock()
+        rewrites = {}  # spec -> Optimizer variants asked for so far
+        beam = []
+
+        pool = ThreadPoolExecutor(max_workers=population)
+        try:
+            for generation in range(max_generations):
+                # 2. Plan the generation: (parent, variant) per member
+                if generation == 0:
+                    plan = [(None, variant) for variant in range(population)]
+                else:
+                    plan = []
+                    for j in range(population):
+                        parent = beam[j % len(beam)]
+                        # Every rewrite of a given spec is a new variant, so no prompt is asked twice
+                        variant = rewrites.get(parent["spec"], 0)
+                        rewrites[parent["spec"]] = variant + 1
+                        plan.append((parent, variant))
+
+                futures = {}
+                for index, (parent, variant) in enumerate(plan):
+                    cost = (1 if parent is None else 2, 1)
+                    reason = budget.exhausted(usage["llm_calls"], usage["trials"], elapsed(), cost)
+                    if reason:
+                        self.last_run["stopped"] = reason
+                        break
+                    usage["llm_calls"] += cost[0]
+                    usage["trials"] += cost[1]
+                    temperature = speculative_temperature if variant else None
+                    future = pool.submit(self._member, generation, index, parent, seed, variant,
+                                         temperature, seen, seen_lock, stop)
+                    futures[future] = index
+                if not futures:
+                    break
+                self.last_run["generations"] = generation + 1
+
+                # 3. Collect members as they finish; a pass ends the search at once
+                children = []
+                while futures:
+                    done, _ = wait(futures, timeout=remaining(), return_when=FIRST_COMPLETED)
+                    if not done:
+                        self.last_run["stopped"] = "seconds"
+                        break
+                    for future in done:
+                        del futures[future]
+                        member = future.result()
+                        if member["duplicate"]:
+                            usage["llm_calls"] -= 1  # The build was skipped
+                            usage["trials"] -= 1
+                            continue
+                        self.last_run["candidates"] += 1
+                        children.append(member)
+                        if member["report"]["pass"]:
+                            beam = [member]
+                            self.last_run["pass"] = True
+                            self.last_run["stopped"] = "passed"
+                            return True
+
+                # 4. Select the next beam from parents and children
+                beam = sorted(beam + children, key=lambda m: (-m["score"], m["generation"], m["index"]))[:population]
+                if self.last_run["stopped"] or not beam:
+                    break
+            else:
+                self.last_run["stopped"] = "max_generations"
+            return False
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            if beam:
+                best = beam[0]
+                self.last_run["best"] = {key: best[key] for key in ("score", "generation", "index", "spec")}
+                self.last_run["best"]["candidate_path"] = best["report"]["candidate_path"]
+            self.last_run.update(usage, seconds=elapsed())
+            best_score = self.last_run["best"]["score"] if beam else 0.0
+            print(f"🧬 Search stopped ({self.last_run['stopped']}) after {self.last_run['generations']} generation(s): "
+                  f"best score {best_score:.3f}, {usage['llm_calls']} LLM calls, {usage['trials']} trials, "
+                  f"{self.last_run['seconds']:.1f}s")
+
+    def _member(self, generation, index, parent, seed, variant, temperature, seen, seen_lock, stop):
+        """
+        One population member: the Optimizer rewrites the parent's spec (generation 0
+        uses the seed, with builder variants instead), then the spec is built and critiqued.
+        """
+        name = f"member_{index + 1:02d}"
+        gen_dir = self._iteration_dir(generation, "generation")
+        if parent is None:
+            spec = seed
+            build_temperature, build_variant = temperature, variant
+        else:
+            spec = self.optimizer.evolve(parent["spec"], parent["report"], temperature=temperature, variant=variant)
+            with seen_lock:
+                duplicate = spec in seen
+                seen.add(spec)
+            if duplicate:
+                return {"duplicate": True}
+            self._record_spec(generation, spec, f"{name}_spec.md", stage="generation")
+            build_temperature, build_variant = None, 0
+
+        report = self._candidate(gen_dir, name, spec, stop, build_temperature, build_variant)
+        return {
+            "duplicate": False,
+            "generation": generation,
+            "index": index,
+            "spec": spec,
+            "report": report,
+            "score": report.get("score", 1.0 if report["pass"] else 0.0),
+        }
+
+    def _record_spec(self, iteration, spec_content, name="spec.md", stage="iteration"):
+        iter_dir = self._iteration_dir(iteration, stage)
+        with open(os.path.join(iter_dir, name), "w") as f:
             f.write(spec_content)
 
+    def _iteration_dir(self, iteration, stage="iteration"):
+        iter_dir = os.path.join(self.run_dir, f"{stage}_{iteration:02d}")
+        os.makedirs(iter_dir, exist_ok=True)
+        return iter_dir
+
+    def _candidate(self, iter_dir, name, spec_content, stop, temperature=None, variant=0):
+        """Builds one candidate from the spec and critiques it. Returns the report (also saved as JSON)."""
+        candidate_path = os.path.join(iter_dir, f"{name}.py")
+
+        if stop.is_set():
+            report = self._failure_report("Cancelled", "Another candidate passed first.")
+        else:
+            try:
+                code = self.builder.build(spec_content, temperature=temperature, variant=variant)
+                with open(candidate_path, "w") as f:
+                    f.write(code)
+            except Exception as e:
+                report = self._failure_report("Build Error", str(e))
+            else:
+                output_path = os.path.join(iter_dir, f"{name}_{os.path.basename(self.target_output_file)}")
+                report = self._critique(candidate_path, output_path, stop)
+
+        report["candidate_path"] = candidate_path
+        with open(os.path.join(iter_dir, f"{name}_report.json"), "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        return report
+
+    def _critique(self, candidate_path, output_path, stop):
+        """
+        Runs the candidate on the script's input and compares its output to the
+        gold standard. Only the primary target is checked: process_data writes one file.
+        """
+        error = self._run_candidate(candidate_path, output_path, stop)
+        if error:
+            return self._failure_report("Runtime Error", error)
+
+        gold_path = os.path.join(self.repo_path, self.target_output_file)
+        try:
+            report = self.critic.compare_outputs(gold_path, output_path)
+        except Exception as e:
+            return self._failure_report("Output Error", f"{type(e).__name__}: {e}")
+        report["pass"] = bool(report["match"])
+        report["failures"] = self._describe(report)
+        return report
+
+    def _run_candidate(self, candidate_path, output_path, stop):
+        """Returns None on success, otherwise the error (tail of the traceback, timeout or cancellation)."""
+        process = subprocess.Popen(
+            [sys.executable, "-c", _CANDIDATE_RUNNER, candidate_path, self.input_file, output_path],
+            cwd=self.repo_path, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        deadline = time.monotonic() + self.candidate_timeout
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                if stop.is_set() or time.monotonic() > deadline:
+                    process.kill()
+                    process.communicate()
+                    if stop.is_set():
+                        return "Cancelled: another candidate passed first."
+                    return f"Timeout: candidate exceeded {self.candidate_timeout}s"
+        if process.returncode != 0:
+            lines = stderr.decode(errors="replace").strip().splitlines()
+            return "\n".join(lines[-20:]) or f"Exited with code {process.returncode}"
+        return None
+
+    @staticmethod
+    def _failure_report(kind, details):
+        return {"pass": False, "failures": [{"type": kind, "details": details}]}
+
+    @staticmethod
+    def _describe(report):
+        """Turns a comparator report into the failure list the Optimizer reads."""
+        failures = []
+        if report.get("error"):
+            failures.append({"type": "Output Error", "details": report["error"]})
+        if report.get("missing_columns"):
+            failures.append({"type": "Missing Columns", "details": report["missing_columns"]})
+        if report.get("extra_columns"):
+            failures.append({"type": "Extra Columns", "details": report["extra_columns"]})
+        if report.get("expected_rows") != report.get("actual_rows") and not report.get("error"):
+            failures.append({"type": "Row Count",
+                             "details": f"expected {report['expected_rows']} rows, got {report['actual_rows']}"})
+        for sample in report.get("samples", []):
+            failures.append({"type": "Value Mismatch", **sample})
+        return failures
@@ -1,59 +1,483 @@
 import os
-from dataclasses import dataclass
-from typing import List, Optional
+import json
+import codecs
+import mmap
+import time
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
 @dataclass
 class SourceFile:
-    """Represents a single file in the repository."""
+    """
+    Represents a single file in the repository.
+    Only metadata is held in memory; the text is read from disk (memory-mapped)
+    each time 'content' is accessed, so large data files cost nothing until used.
+    """
     path: str          # Relative path (e.g., 'utils/helper.py')
     name: str          # Filename (e.g., 'helper.py')
-    content: str       # Full text content
     extension: str     # e.g., '.py'
+    abs_path: Optional[str] = None  # Backing file on disk
+    size: int = 0                   # Bytes on disk
+    mtime_ns: int = 0
+    encoding: str = "utf-8"         # Detected from the first bytes at scan time
+    _text: Optional[str] = field(default=None, repr=False)          # Pinned text (no backing file)
+    _content_hash: Optional[str] = field(default=None, repr=False)  # SHA-256 of the raw bytes
+
+    @classmethod
+    def from_text(cls, path: str, text: str) -> "SourceFile":
+        """Builds an in-memory file (e.g. for generated artifacts or tests)."""
+        name = os.path.basename(path)
+        return cls(path=path, name=name, extension=os.path.splitext(name)[1].lower(),
+                   size=len(text.encode('utf-8')), _text=text)
+
+    @property
+    def content(self) -> str:
+        """Full text content, decoded on demand (not cached)."""
+        if self._text is not None:
+            return self._text
+        with self.mapped() as buffer:
+            return decode_text(buffer[:], self.encoding)
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the raw bytes, streamed from disk on first use."""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            if self._text is not None:
+                digest.update(self._text.encode('utf-8'))
+            else:
+                with self.mapped() as buffer:
+                    view = memoryview(buffer)
+                    for start in range(0, len(view), 1024 * 1024):
+                        digest.update(view[start:start + 1024 * 1024])
+                    view.release()
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @contextmanager
+    def mapped(self):
+        """Read-only mmap of the backing file (an empty bytes object for empty files)."""
+        with open(self.abs_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    def head(self, num_bytes: int = 4096) -> str:
+        """Cheap preview: the first 'num_bytes' decoded, without reading the rest."""
+        if self._text is not None:
+            return self._text[:num_bytes]
+        with self.mapped() as buffer:
+            return decode_text(buffer[:num_bytes], self.encoding)
+
+    def preview(self, lines: int = 20) -> str:
+        """The first 'lines' lines, read incrementally from the mapping."""
+        if self._text is not None:
+            return "\n".join(self._text.splitlines()[:lines])
+        with self.mapped() as buffer:
+            end = 0
+            for _ in range(lines):
+                newline = buffer.find(b"\n", end)
+                if newline == -1:
+                    end = len(buffer)
+                    break
+                end = newline + 1
+            return decode_text(buffer[:end], self.encoding).rstrip("\n")
+
+def decode_text(raw: bytes, encoding: str = "utf-8") -> str:
+    """Same result as a text-mode read: lossy decode with universal newlines."""
+    return raw.decode(encoding, errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+SNIFF_BYTES = 8192
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),   # Before UTF-16 LE: it shares the first two bytes
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Control bytes that never appear in text files (tab, newlines, form feed and ESC are allowed)
+_BINARY_BYTES = bytes(set(range(32)) - {7, 8, 9, 10, 12, 13, 27}) + b"\x7f"
+
+def sniff_encoding(prefix: bytes) -> Optional[str]:
+    """
+    Guesses the encoding from the first bytes of a file.
+    Returns None when the prefix looks binary (NUL or mostly control bytes).
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    if b"\x00" in prefix:
+        return None
+    if prefix and len(prefix.translate(None, _BINARY_BYTES)) < len(prefix) * 0.7:
+        return None
+
+    # The prefix may end mid-character, so decode incrementally without flushing
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+@dataclass
+class SkippedFile:
+    """A matched file the Ingestor refused to index, and why."""
+    path: str
+    reason: str   # 'binary', 'too_large' or 'unreadable'
+    size: int = 0
+    detail: str = ""
+
+@dataclass
+class ScanDelta:
+    """What changed on disk since the last scan recorded in the manifest."""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    files: Dict[str, SourceFile] = field(default_factory=dict)  # Added/modified files
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+@dataclass
+class ScanStats:
+    """Throughput of the last crawl."""
+    files: int = 0
+    directories: int = 0
+    bytes_indexed: int = 0   # Total size of the files found
+    bytes_read: int = 0      # Bytes actually read (hashing)
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return (self.bytes_indexed / (1024 * 1024)) / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.files} files in {self.directories} dirs, {self.seconds:.3f}s "
+                f"({self.files_per_second:,.0f} files/s, {self.mb_per_second:,.1f} MB/s)")
 
 class Ingestor:
     """
-    The 'Eyes' of the system. 
-    Responsibility: Crawl directory, filter junk, load content into memory.
+    The 'Eyes' of the system.
+    Responsibility: Crawl directory, filter junk, index files (content is loaded lazily).
     """
-    
-    def __init__(self, root_path: str, allowed_extensions: Optional[List[str]] = None):
+
+    # Files stat'ed per pool task, and in-flight tasks per worker (bounds the queue)
+    STAT_BATCH = 64
+    PENDING_PER_WORKER = 4
+
+    # Per-extension size caps in bytes ('*' for anything not listed, None for no cap)
+    DEFAULT_MAX_BYTES = {
+        '.py': 2 * 1024 * 1024,
+        '.md': 2 * 1024 * 1024,
+        '.sps': 5 * 1024 * 1024,
+        '.csv': 100 * 1024 * 1024,
+        '*': 10 * 1024 * 1024,
+    }
+
+    def __init__(self, root_path: str, allowed_extensions: Optional[List[str]] = None,
+                 manifest_path: Optional[str] = None, workers: int = 8,
+                 max_bytes: Optional[Dict[str, Optional[int]]] = None):
+        """
+        Args:
+            root_path: Directory to crawl.
+            allowed_extensions: File types to load (defaults to .py, .md, .csv, .sps).
+            manifest_path: (Optional) JSON file persisting (size, mtime, hash) per file,
+                           so scan_changes() survives process restarts.
+            workers: Threads for directory listing, stat and hashing. Crawls are
+                     latency-bound on network filesystems, so this may exceed the core count.
+            max_bytes: Overrides for DEFAULT_MAX_BYTES, e.g. {'.csv': None} to lift the CSV cap.
+        """
         self.root_path = os.path.abspath(root_path)
-        self.allowed_extensions = allowed_extensions or ['.py', '.md', '.csv']
+        self.allowed_extensions = allowed_extensions or ['.py', '.md', '.csv', '.sps']
         self.ignore_dirs = {'.git', '__pycache__', 'venv', 'env', '.idea', '.vscode'}
+        self.manifest_path = manifest_path
+        self.manifest: Dict[str, dict] = self._load_manifest()
+        self.workers = max(1, workers)
+        self.max_bytes = {**self.DEFAULT_MAX_BYTES, **(max_bytes or {})}
+        self.last_stats = ScanStats()
+        self.skipped: List[SkippedFile] = []   # Skip report of the last scan
 
     def scan(self) -> List[SourceFile]:
         """
-        Walks the root path and returns a list of SourceFile objects.
+        Walks the root path and returns a list of SourceFile objects, sorted by path.
+        Files are only stat'ed; content and hashes are read on demand.
+        Also records every file in the manifest for later scan_changes() calls;
+        hashes already in the manifest are kept for files whose stat is unchanged.
+        """
+        return sorted(self.iter_scan(), key=lambda x: x.path)
+
+    def iter_scan(self, ordered: bool = False) -> Iterator[SourceFile]:
+        """
+        Streaming scan: yields each SourceFile as soon as it has been stat'ed,
+        so consumers can start before the crawl finishes.
+
+        Args:
+            ordered: Yield in the same path order as scan(). Directories are then
+                     walked depth-first in name order (listings and stats are still
+                     prefetched on the pool); unordered mode is faster on wide trees.
+
+        The manifest and last_stats are only updated once the generator is exhausted.
+        """
+        started = time.perf_counter()
+        self.last_stats = ScanStats()
+        self.skipped = []
+        manifest = {}
+
+        previous_manifest = self.manifest
+        for source_file in (self._crawl_ordered() if ordered else self._crawl()):
+            # Carry a known hash forward while the stat still matches, so it is never recomputed
+            known_hash = self._known_hash(previous_manifest.get(source_file.path), source_file)
+            source_file._content_hash = known_hash
+            manifest[source_file.path] = self._entry(source_file, known_hash)
+            self.last_stats.files += 1
+            self.last_stats.bytes_indexed += source_file.size
+            yield source_file
+
+        self.manifest = manifest
+        self._save_manifest()
+        self.last_stats.seconds = time.perf_counter() - started
+
+    def scan_changes(self) -> ScanDelta:
+        """
+        Incremental scan against the manifest. Files whose size and mtime are
+        unchanged are not opened; the rest are hashed, and only reported as
+        modified when their content hash actually differs (or was never known).
+        """
+        started = time.perf_counter()
+        self.last_stats = ScanStats()
+        self.skipped = []
+        delta = ScanDelta()
+        manifest = {}
+        current = list(self._crawl())
+
+        suspects = []
+        for source_file in current:
+            previous = self.manifest.get(source_file.path)
+            if previous and previous["size"] == source_file.size and previous["mtime_ns"] == source_file.mtime_ns:
+                source_file._content_hash = previous["sha256"]
+                manifest[source_file.path] = previous
+                delta.unchanged.append(source_file.path)
+            else:
+                suspects.append(source_file)
+
+        # Hash the stat-changed files in parallel
+        with ThreadPoolExecutor(self.workers) as pool:
+            hashes = list(pool.map(self._safe_hash, suspects))
+
+        for source_file, (content_hash, skip) in zip(suspects, hashes):
+            rel_path = source_file.path
+            previous = self.manifest.get(rel_path)
+            if skip is not None:
+                # Still on disk, just unreadable right now: keep what we knew, never report it deleted
+                self._skip(skip)
+                if previous is not None:
+                    manifest[rel_path] = previous
+                continue
+            manifest[rel_path] = self._entry(source_file, content_hash)
+            self.last_stats.bytes_read += source_file.size
+
+            if previous is None:
+                delta.added.append(rel_path)
+                delta.files[rel_path] = source_file
+            elif previous["sha256"] != content_hash:
+                delta.modified.append(rel_path)
+                delta.files[rel_path] = source_file
+            else:
+                # Touched but identical (e.g. checkout): just refresh the stat
+                delta.unchanged.append(rel_path)
+
+        delta.deleted = sorted(set(self.manifest) - set(manifest))
+        for paths in (delta.added, delta.modified, delta.unchanged):
+            paths.sort()
+
+        self.manifest = manifest
+        self._save_manifest()
+        self._finish_stats(started, current)
+        return delta
+
+    def _crawl(self):
+        """
+        Parallel scandir walk. Directory listings and batches of stat calls run
+        on a thread pool; at most workers * PENDING_PER_WORKER tasks are in
+        flight, the rest wait in a backlog. Yields SourceFiles in no particular order.
         """
-        source_files = []
+        self._check_root()
+        max_pending = self.workers * self.PENDING_PER_WORKER
+        backlog = deque([(self._list_dir, self.root_path)])
+        pending = set()
 
+        with ThreadPoolExecutor(self.workers) as pool:
+            while backlog or pending:
+                while backlog and len(pending) < max_pending:
+                    task, arg = backlog.popleft()
+                    pending.add(pool.submit(task, arg))
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, result = future.result()
+                    if kind == "listing":
+                        subdirs, files = result
+                        self.last_stats.directories += 1
+                        backlog.extend((self._list_dir, d) for d in subdirs)
+                        for start in range(0, len(files), self.STAT_BATCH):
+                            backlog.append((self._stat_batch, files[start:start + self.STAT_BATCH]))
+                    else:
+                        yield from self._collect(result)
+
+    def _crawl_ordered(self):
+        """
+        Depth-first walk in path order. Each file is stat'ed on the pool and
+        results are yielded in submission order from a window of at most
+        workers * PENDING_PER_WORKER futures.
+        """
+        self._check_root()
+        max_pending = self.workers * self.PENDING_PER_WORKER
+        window = deque()
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            for entry in self._ordered_entries(pool, self.root_path, pool.submit(self._list_dir, self.root_path)):
+                window.append(pool.submit(self._stat_batch, [entry]))
+                if len(window) >= max_pending:
+                    yield from self._collect(window.popleft().result()[1])
+            while window:
+                yield from self._collect(window.popleft().result()[1])
+
+    def _ordered_entries(self, pool, directory, listing):
+        """Yields (full_path, name, ext) below 'directory' in relative-path order."""
+        subdirs, files = listing.result()[1]
+        self.last_stats.directories += 1
+
+        # Sorting directories as 'name/' makes the walk match a sort of full relative paths
+        children = [(os.path.basename(d) + "/", d) for d in subdirs]
+        children += [(name, (full_path, name, ext)) for full_path, name, ext in files]
+        children.sort(key=lambda child: child[0])
+
+        # Prefetch the listings of this directory's children while we work through it
+        prefetched = {d: pool.submit(self._list_dir, d) for d in subdirs}
+        for _, child in children:
+            if isinstance(child, str):
+                yield from self._ordered_entries(pool, child, prefetched.pop(child))
+            else:
+                yield child
+
+    def _check_root(self):
         if not os.path.exists(self.root_path):
             raise FileNotFoundError(f"Repository not found at: {self.root_path}")
 
-        for root, dirs, files in os.walk(self.root_path):
-            # 1. Filter directories in-place to prevent recursion into ignored ones
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
+    def _list_dir(self, directory):
+        """Returns ('listing', (subdirectories, [(full_path, name, ext)])) for one directory."""
+        subdirs, files = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # 1. Skip ignored directories so we never recurse into them
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.ignore_dirs:
+                            subdirs.append(entry.path)
+                        continue
+                    # 2. Filter by extension
+                    _, ext = os.path.splitext(entry.name)
+                    if ext.lower() in self.allowed_extensions and entry.is_file():
+                        files.append((entry.path, entry.name, ext.lower()))
+        except OSError as e:
+            print(f"⚠️ Warning: Could not list {directory}: {e}")
+        return "listing", (subdirs, files)
 
-            for file in files:
-                # 2. Filter by extension
-                _, ext = os.path.splitext(file)
-                if ext.lower() not in self.allowed_extensions:
+    def _stat_batch(self, files):
+        """Returns ('files', ([SourceFile], [SkippedFile])) for a batch of (full_path, name, ext)."""
+        source_files, skipped = [], []
+        for full_path, name, ext in files:
+            rel_path = os.path.relpath(full_path, self.root_path)
+            try:
+                stat = os.stat(full_path)
+                # 1. Size policy: checked before a single byte is read
+                limit = self.max_bytes.get(ext, self.max_bytes.get('*'))
+                if limit is not None and stat.st_size > limit:
+                    skipped.append(SkippedFile(rel_path, "too_large", stat.st_size, f"limit {limit} bytes"))
                     continue
+                # 2. Binary / encoding sniffing on the prefix only
+                with open(full_path, 'rb') as f:
+                    encoding = sniff_encoding(f.read(SNIFF_BYTES))
+            except OSError as e:
+                skipped.append(SkippedFile(rel_path, "unreadable", 0, str(e)))
+                continue
+            if encoding is None:
+                skipped.append(SkippedFile(rel_path, "binary", stat.st_size))
+                continue
+            source_files.append(SourceFile(
+                path=rel_path,
+                name=name,
+                extension=ext,
+                abs_path=full_path,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                encoding=encoding
+            ))
+        return "files", (source_files, skipped)
+
+    def _collect(self, result):
+        """Records a stat batch's skips (on the consuming thread) and returns its files."""
+        source_files, skipped = result
+        for skip in skipped:
+            self._skip(skip)
+        return source_files
+
+    def _skip(self, skip: SkippedFile):
+        print(f"⚠️ Warning: Skipping {skip.path} ({skip.reason}{': ' + skip.detail if skip.detail else ''})")
+        self.skipped.append(skip)
+
+    @staticmethod
+    def _safe_hash(source_file: SourceFile) -> Tuple[Optional[str], Optional[SkippedFile]]:
+        """(content hash, None), or (None, SkippedFile) when the file cannot be read."""
+        try:
+            return source_file.content_hash, None
+        except Exception as e:
+            return None, SkippedFile(source_file.path, "unreadable", source_file.size, str(e))
+
+    def _finish_stats(self, started, source_files):
+        self.last_stats.files = len(source_files)
+        self.last_stats.bytes_indexed = sum(f.size for f in source_files)
+        self.last_stats.seconds = time.perf_counter() - started
+
+    @staticmethod
+    def _known_hash(previous: Optional[dict], source_file: SourceFile) -> Optional[str]:
+        if previous and previous["size"] == source_file.size and previous["mtime_ns"] == source_file.mtime_ns:
+            return previous.get("sha256")
+        return None
+
+    @staticmethod
+    def _entry(source_file: SourceFile, content_hash) -> dict:
+        return {"size": source_file.size, "mtime_ns": source_file.mtime_ns, "sha256": content_hash}
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
 
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, self.root_path)
-
-                try:
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                    
-                    source_files.append(SourceFile(
-                        path=rel_path,
-                        name=file,
-                        content=content,
-                        extension=ext.lower()
-                    ))
-                except Exception as e:
-                    print(f"⚠️ Warning: Could not read {rel_path}: {e}")
-
-        return sorted(source_files, key=lambda x: x.path)
\ No newline at end of file
+    def _save_manifest(self):
+        if not self.manifest_path:
+            return
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
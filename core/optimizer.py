@@ -10,13 +10,17 @@ class Optimizer:
     def __init__(self, llm_client: LLMClient = None):
         self.llm = llm_client or LLMClient()
 
-    def evolve(self, current_spec: str, critique_report: dict, prompt_template: str = OPTIMIZER_V1) -> str:
+    def evolve(self, current_spec: str, critique_report: dict, prompt_template: str = OPTIMIZER_V1,
+               temperature: float = None, variant: int = 0) -> str:
         """
         Rewrites the spec to address failures.
         
         Args:
             current_spec: The Markdown string of the failed spec.
             critique_report: The dictionary returned by Critic.evaluate().
+            temperature: (Optional) Override the client's temperature.
+            variant: Index of an alternative rewrite of the same spec and report. Variants
+                     above 0 get their own prompt (and cache entry), so each is a fresh sample.
         """
         # Format the failures into a readable string
         failures_text = "\n".join([f"- {f}" for f in critique_report.get("failures", [])])
@@ -34,4 +38,6 @@ The previous spec failed to produce correct code.
 ### TASK:
 Rewrite the spec to prevent these failures.
 """
-        return self.llm.complete(prompt_template, user_prompt)
\ No newline at end of file
+        if variant:
+            user_prompt += f"\n### VARIANT {variant}:\nPropose a different rewrite from other attempts.\n"
+        return self.llm.complete(prompt_template, user_prompt, temperature=temperature)
\ No newline at end of file
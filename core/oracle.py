@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Optional
+from utils.file_hash import file_sha256
+
+class GroundTruthOracle:
+    """
+    The Memory of the Critic.
+    Remembers what the legacy code produced for a given input, so repeat inputs
+    only need the candidate executed.
+
+    Entries are keyed by (source content hash, input hash). When the source file
+    changes, entries recorded against the old hash are dropped on startup.
+    Pass cache_dir=None for a per-process, in-memory store.
+    """
+
+    # Outputs describing the harness rather than the source are never memoized
+    VOLATILE_ERRORS = ("Timeout", "Not evaluated")
+    # Bumped when the recorded output format changes (2: errors lead with the exception type)
+    FORMAT = 2
+
+    def __init__(self, source_path: str, cache_dir: Optional[str] = None):
+        self.source_path = os.path.abspath(source_path)
+        # Entries in an older format are invalidated like those of a changed source
+        self.source_hash = f"{file_sha256(source_path)}:{self.FORMAT}"
+        self.hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            db_path = os.path.join(cache_dir, "ground_truth.sqlite")
+        else:
+            db_path = ":memory:"
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ground_truth ("
+            " source_path TEXT NOT NULL,"
+            " source_hash TEXT NOT NULL,"
+            " input_hash TEXT NOT NULL,"
+            " output TEXT NOT NULL,"
+            " PRIMARY KEY (source_path, source_hash, input_hash))"
+        )
+        # Invalidate: the legacy code changed, so its old answers are worthless
+        self._conn.execute(
+            "DELETE FROM ground_truth WHERE source_path = ? AND source_hash != ?",
+            (self.source_path, self.source_hash)
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def hash_input(test_input) -> str:
+        canonical = json.dumps(test_input, sort_keys=True, default=repr)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def lookup(self, test_input) -> Optional[dict]:
+        """Returns the remembered ground truth for this input, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM ground_truth WHERE source_path = ? AND source_hash = ? AND input_hash = ?",
+                (self.source_path, self.source_hash, self.hash_input(test_input))
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def store(self, test_input, output: dict):
+        """Records the ground truth for an input (harness failures are skipped)."""
+        self.store_many([(test_input, output)])
+
+    def store_many(self, pairs):
+        """Records several (input, output) pairs in a single transaction."""
+        rows = []
+        for test_input, output in pairs:
+            error = output.get("error", "") if isinstance(output, dict) else ""
+            if error.startswith(self.VOLATILE_ERRORS):
+                continue
+            rows.append((self.source_path, self.source_hash, self.hash_input(test_input), json.dumps(output)))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ground_truth (source_path, source_hash, input_hash, output) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
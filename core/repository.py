@@ -1,37 +1,96 @@
 from typing import Dict, List, Optional
-from core.ingestor import Ingestor, SourceFile
+from core.dependency_graph import DependencyGraph
+from core.ingestor import Ingestor, ScanDelta, SourceFile
+from core.repository_store import RepositoryStore
+from core.search_index import SearchIndex
 
 class Repository:
     """
     The Knowledge Base.
-    Holds the state of the repository: files, specs, and (eventually) the dependency graph.
+    Holds the state of the repository: files, specs, and the dependency graph of its scripts.
     """
     
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, manifest_path: Optional[str] = None, store_path: Optional[str] = None):
+        """
+        Args:
+            root_path: Directory to load.
+            manifest_path: (Optional) Ingestor manifest, see Ingestor.
+            store_path: (Optional) SQLite knowledge base. File hashes and specs survive
+                        restarts, so specs of unchanged files are not regenerated.
+        """
         self.root_path = root_path
-        self.ingestor = Ingestor(root_path)
-        self._files: Dict[str, SourceFile] = {} # Key: Relative Path
-        self._specs: Dict[str, str] = {}        # Key: Relative Path -> Spec Content
+        self.ingestor = Ingestor(root_path, manifest_path=manifest_path)
+        self.store = RepositoryStore(store_path)
+        self._files: Dict[str, SourceFile] = {} # Key: Relative Path (metadata only, content is lazy)
+        self.graph = DependencyGraph()           # Which scripts read/write which files
+        self.index = SearchIndex()               # Term -> files, see search()
 
     def load(self):
-        """Triggers the Ingestor to scan and load files into memory."""
+        """
+        Triggers the Ingestor to scan and load files into memory.
+        Once loaded, further calls only re-read what changed on disk (see refresh).
+        """
+        if self._files:
+            return self.refresh()
+        # Resume: hashes the store already knows are reused for files whose stat is unchanged
+        self.ingestor.manifest = {**self.ingestor.manifest, **self.store.manifest()}
         scanned_files = self.ingestor.scan()
         for f in scanned_files:
             self._files[f.path] = f
+            self._index(f)
+        self.store.sync_files(self.ingestor.manifest)
+
+    def refresh(self) -> ScanDelta:
+        """Applies an incremental scan: re-reads changed files, drops deleted ones."""
+        delta = self.ingestor.scan_changes()
+        for path, source_file in delta.files.items():
+            self._files[path] = source_file
+            self._index(source_file)
+        for path in delta.deleted:
+            self._files.pop(path, None)
+            self.graph.remove_file(path)
+            self.index.remove_file(path)
+        self.store.sync_files(self.ingestor.manifest)  # Also drops specs of deleted files
+        return delta
+
+    def _index(self, source_file: SourceFile):
+        """Keeps the derived indexes in step with a new or changed file."""
+        # Data files can be huge: only their header is indexed
+        text = source_file.preview(1) if source_file.extension == '.csv' else source_file.content
+        self.index.update_file(source_file.path, text, source_file.extension)
+        if source_file.extension == '.sps':
+            self.graph.update_file(source_file.path, text, source_file.content_hash)
+
+    def search(self, term: str, kind: Optional[str] = None) -> List[str]:
+        """
+        Files mentioning 'term'. Restrict with kind='variable', 'compute', 'file'
+        or 'word' (see SearchIndex).
+        """
+        return self.index.search(term, kind)
 
     def get_file(self, relative_path: str) -> Optional[SourceFile]:
         """Retrieves a specific file by its relative path."""
         return self._files.get(relative_path)
 
-    def list_files(self) -> List[str]:
-        """Returns a list of all loaded file paths."""
-        return sorted(list(self._files.keys()))
+    def list_files(self, prefix: str = "") -> List[str]:
+        """Returns all loaded file paths (optionally only those under 'prefix'), sorted."""
+        return self.store.list_files(prefix)
 
     def save_spec(self, relative_path: str, spec_content: str):
-        """Stores a generated specification for a file."""
-        if relative_path not in self._files:
+        """Stores a generated specification for the current version of a file."""
+        source_file = self._files.get(relative_path)
+        if source_file is None:
             raise ValueError(f"File {relative_path} does not exist in repository.")
-        self._specs[relative_path] = spec_content
+        source_hash = source_file.content_hash
+        self.store.record_hash(relative_path, source_hash)
+        self.store.save_spec(relative_path, source_hash, spec_content)
 
     def get_spec(self, relative_path: str) -> Optional[str]:
-        return self._specs.get(relative_path)
+        """Returns the spec, as long as it was generated from the file's current content."""
+        source_file = self._files.get(relative_path)
+        if source_file is None:
+            return None
+        return self.store.get_spec(relative_path, source_file.content_hash)
+
+    def close(self):
+        self.store.close()
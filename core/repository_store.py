@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+class RepositoryStore:
+    """
+    The Long-Term Memory of the Repository.
+    Persists file metadata (size, mtime, content hash) and generated specs in
+    SQLite, so a restarted migration knows which specs are still valid.
+
+    Specs are keyed by (path, source_hash): a spec only counts for the exact
+    source content it was generated from.
+
+    With a db_path the database runs in WAL mode with one connection per thread,
+    so readers never block each other or the writer. db_path=None gives a
+    per-process, in-memory store.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._shared = None
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        else:
+            # A private :memory: database only exists on one connection, so share it
+            self._shared = sqlite3.connect(":memory:", check_same_thread=False)
+
+        conn = self._connection()
+        with self._write_lock:
+            if self.db_path:
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " sha256 TEXT);"
+                "CREATE TABLE IF NOT EXISTS specs ("
+                " path TEXT NOT NULL,"
+                " source_hash TEXT NOT NULL,"
+                " spec TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (path, source_hash));"
+            )
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, far fewer fsyncs
+            self._local.conn = conn
+        return conn
+
+    def _read(self, sql: str, params=()) -> list:
+        if self._shared is not None:
+            with self._write_lock:
+                return self._shared.execute(sql, params).fetchall()
+        return self._connection().execute(sql, params).fetchall()
+
+    # --- Files -------------------------------------------------------------
+
+    def manifest(self) -> Dict[str, dict]:
+        """All known files in the Ingestor manifest format: path -> {size, mtime_ns, sha256}."""
+        rows = self._read("SELECT path, size, mtime_ns, sha256 FROM files")
+        return {path: {"size": size, "mtime_ns": mtime_ns, "sha256": sha256} for path, size, mtime_ns, sha256 in rows}
+
+    def sync_files(self, manifest: Dict[str, dict]):
+        """Makes the files table mirror 'manifest'. Specs of files that disappeared are dropped."""
+        rows = [(path, e["size"], e["mtime_ns"], e["sha256"]) for path, e in manifest.items()]
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_paths (path TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM current_paths")
+            conn.executemany("INSERT INTO current_paths (path) VALUES (?)", [(r[0],) for r in rows])
+            conn.execute("DELETE FROM files WHERE path NOT IN (SELECT path FROM current_paths)")
+            conn.execute("DELETE FROM specs WHERE path NOT IN (SELECT path FROM current_paths)")
+            conn.executemany(
+                "INSERT INTO files (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns,"
+                " sha256 = COALESCE(excluded.sha256, CASE WHEN files.size = excluded.size"
+                " AND files.mtime_ns = excluded.mtime_ns THEN files.sha256 END)",
+                rows
+            )
+            conn.commit()
+
+    def record_hash(self, path: str, sha256: str):
+        """Remembers a content hash computed after the scan (e.g. when a spec was saved)."""
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("UPDATE files SET sha256 = ? WHERE path = ?", (sha256, path))
+            conn.commit()
+
+    def get_file(self, path: str) -> Optional[dict]:
+        rows = self._read("SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,))
+        if not rows:
+            return None
+        size, mtime_ns, sha256 = rows[0]
+        return {"size": size, "mtime_ns": mtime_ns, "sha256": sha256}
+
+    def list_files(self, prefix: str = "") -> List[str]:
+        """Sorted paths starting with 'prefix' (a range scan on the primary key)."""
+        if not prefix:
+            return [row[0] for row in self._read("SELECT path FROM files ORDER BY path")]
+        return [row[0] for row in self._read(
+            "SELECT path FROM files WHERE path >= ? AND path < ? ORDER BY path",
+            (prefix, prefix + "\U0010ffff")
+        )]
+
+    # --- Specs -------------------------------------------------------------
+
+    def save_spec(self, path: str, source_hash: str, spec: str):
+        """Stores a spec for one version of a file, replacing specs for older versions."""
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("DELETE FROM specs WHERE path = ? AND source_hash != ?", (path, source_hash))
+            conn.execute(
+                "INSERT OR REPLACE INTO specs (path, source_hash, spec, created_at) VALUES (?, ?, ?, ?)",
+                (path, source_hash, spec, time.time())
+            )
+            conn.commit()
+
+    def get_spec(self, path: str, source_hash: str) -> Optional[str]:
+        """Returns the spec generated from exactly this source version, or None."""
+        rows = self._read("SELECT spec FROM specs WHERE path = ? AND source_hash = ?", (path, source_hash))
+        return rows[0][0] if rows else None
+
+    def list_specs(self, prefix: str = "") -> List[str]:
+        """Sorted paths whose stored spec still matches the file's recorded hash."""
+        return [row[0] for row in self._read(
+            "SELECT s.path FROM specs s JOIN files f ON f.path = s.path AND f.sha256 = s.source_hash"
+            " WHERE s.path >= ? AND s.path < ? ORDER BY s.path",
+            (prefix, prefix + "\U0010ffff")
+        )]
+
+    def close(self):
+        conn = self._shared or getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local = threading.local()
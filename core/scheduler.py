@@ -0,0 +1,257 @@
+import heapq
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from core.engine import EvolutionEngine
+from core.repository import Repository
+from utils.file_hash import file_sha256
+
+@dataclass
+class BatchSummary:
+    """Outcome and throughput of the last batch run."""
+    scripts: int = 0
+    passed: int = 0
+    failed: int = 0      # Ran to completion without a passing candidate
+    errors: int = 0      # Raised on every attempt
+    blocked: int = 0     # Upstream script errored, or part of a dependency cycle
+    resumed: int = 0     # Already done in the state file and unchanged
+    attempts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def scripts_per_hour(self) -> float:
+        ran = self.scripts - self.resumed
+        return ran * 3600 / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.scripts} scripts: {self.passed} passed, {self.failed} failed, {self.errors} errors, "
+                f"{self.blocked} blocked, {self.resumed} resumed; {self.attempts} attempts in "
+                f"{self.seconds:.1f}s ({self.scripts_per_hour:,.1f} scripts/h)")
+
+class MigrationScheduler:
+    """
+    The Dispatcher.
+    Migrates every .sps in a repository through a work queue: a script is
+    started once every script it depends on (see DependencyGraph) has finished,
+    so gold-standard runs see their upstream outputs. Ready scripts with the
+    most downstream work go first; a worker pool runs one EvolutionEngine per script.
+
+    Progress is written to a JSON state file after every job. A later run with
+    the same file skips scripts that already passed or failed, as long as
+    neither they, the data files they read, nor anything upstream changed
+    since; errored and blocked scripts are tried again.
+    """
+
+    DONE = ("passed", "failed")
+
+    def __init__(self, repo_path: str, workers: int = 4, retries: int = 1, state_path: Optional[str] = None,
+                 history_dir: str = "history", mode: str = "start", run_options: Optional[dict] = None,
+                 engine_factory: Optional[Callable] = None):
+        """
+        Args:
+            repo_path: Repository to migrate.
+            workers: Scripts migrated concurrently.
+            retries: Extra attempts for a script whose engine raises (PSPP or LLM outages).
+            state_path: (Optional) JSON file recording each script's outcome, to resume a batch.
+            history_dir: Root for per-script run histories (<history_dir>/<script>/run_...).
+            mode: Engine method per script: "start" (pipelined loop) or "search" (population).
+            run_options: Keyword arguments for that method, e.g. {"max_iterations": 3}.
+            engine_factory: (Optional) Callable (repo_path, script, history_dir) -> engine.
+        """
+        if mode not in ("start", "search"):
+            raise ValueError(f"Unknown mode '{mode}'. Expected 'start' or 'search'.")
+        self.repo_path = os.path.abspath(repo_path)
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.state_path = state_path
+        self.history_dir = history_dir
+        self.mode = mode
+        self.run_options = run_options or {}
+        self.engine_factory = engine_factory or self._default_engine
+        self.state: Dict[str, dict] = self._load_state()
+        self.last_summary: Optional[BatchSummary] = None
+        self._lock = threading.Lock()
+
+    def run(self, scripts: Optional[List[str]] = None) -> BatchSummary:
+        """
+        Migrates 'scripts' (default: every .sps in the repository) and returns the summary.
+        Per-script outcomes are in self.state.
+        """
+        started = time.perf_counter()
+        summary = BatchSummary()
+
+        # 1. Discover scripts and their dependencies
+        repository = Repository(self.repo_path)
+        try:
+            repository.load()
+        finally:
+            repository.close()
+        graph = repository.graph
+        scripts = [graph.normalize(s) for s in scripts] if scripts is not None else graph.scripts
+        hashes = {}
+        for script in scripts:
+            source_file = repository.get_file(script)
+            hashes[script] = source_file.content_hash if source_file else None
+        inputs = self._input_hashes(graph, scripts)
+        summary.scripts = len(scripts)
+
+        # 2. Resume: redo anything not done, changed (script or input data), or downstream of either
+        stale = [s for s in scripts
+                 if self.state.get(s, {}).get("status") not in self.DONE
+                 or self.state[s].get("content_hash") != hashes[s]
+                 or self.state[s].get("inputs") != inputs[s]]
+        todo = self._downstream(graph, stale) & set(scripts)
+        summary.resumed = len(scripts) - len(todo)
+
+        upstream = {s: [d for d in graph.dependencies(s) if d in todo] for s in todo}
+        downstream = {s: [] for s in todo}
+        for script, deps in upstream.items():
+            for dep in deps:
+                downstream[dep].append(script)
+        waiting = {s: len(deps) for s, deps in upstream.items()}
+        # Critical path first: scripts with more downstream work start earlier
+        priority = {s: -len(self._downstream(graph, [s])) for s in todo}
+        ready = [(priority[s], s) for s, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+
+        # 3. Dispatch ready scripts to the pool as slots free up
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while ready or pending:
+                while ready and len(pending) < self.workers:
+                    _, script = heapq.heappop(ready)
+                    if any(self.state.get(dep, {}).get("status") in ("error", "blocked") for dep in upstream[script]):
+                        self._record(script, status="blocked", content_hash=hashes[script], inputs=inputs[script],
+                                     attempts=0, error="An upstream script did not complete.")
+                        self._release(script, downstream, waiting, priority, ready)
+                        continue
+                    pending[pool.submit(self._migrate, script, hashes[script], inputs[script])] = script
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    script = pending.pop(future)
+                    future.result()
+                    self._release(script, downstream, waiting, priority, ready)
+
+        # 4. Whatever never became ready sits on a dependency cycle
+        for script in sorted(s for s, count in waiting.items() if count > 0):
+            print(f"⚠️ Warning: Skipping {script}: it is part of a dependency cycle.")
+            self._record(script, status="blocked", content_hash=hashes[script], inputs=inputs[script],
+                         attempts=0, error="Dependency cycle.")
+
+        # 5. Summary of this run (resumed scripts only count as resumed)
+        for script in todo:
+            entry = self.state.get(script, {})
+            summary.attempts += entry.get("attempts", 0)
+            status = entry.get("status")
+            if status == "passed":
+                summary.passed += 1
+            elif status == "failed":
+                summary.failed += 1
+            elif status == "error":
+                summary.errors += 1
+            else:
+                summary.blocked += 1
+        summary.seconds = time.perf_counter() - started
+        self.last_summary = summary
+        print(f"📦 Batch finished: {summary}")
+        return summary
+
+    @staticmethod
+    def _downstream(graph, scripts) -> set:
+        """'scripts' plus everything that depends on them, transitively (cycles allowed)."""
+        seen = set()
+        frontier = list(scripts)
+        while frontier:
+            script = frontier.pop()
+            if script not in seen:
+                seen.add(script)
+                frontier.extend(graph.dependents(script))
+        return seen
+
+    def _input_hashes(self, graph, scripts) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Hashes of the data files each script reads that no script writes (raw inputs).
+        Generated files are covered by re-running their writer; missing files hash to None.
+        """
+        generated = set(graph.scripts)
+        for script in graph.scripts:
+            generated.update(graph.writes(script))
+        hashes = {}
+        inputs = {}
+        for script in scripts:
+            inputs[script] = {}
+            for path in graph.reads(script):
+                if path in generated:
+                    continue
+                if path not in hashes:
+                    full_path = os.path.join(self.repo_path, path)
+                    hashes[path] = file_sha256(full_path) if os.path.isfile(full_path) else None
+                inputs[script][path] = hashes[path]
+        return inputs
+
+    @staticmethod
+    def _release(script, downstream, waiting, priority, ready):
+        """Marks 'script' finished; dependents with nothing else to wait for become ready."""
+        waiting.pop(script, None)
+        for child in downstream[script]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                heapq.heappush(ready, (priority[child], child))
+
+    def _migrate(self, script: str, content_hash: Optional[str], inputs: Dict[str, Optional[str]]):
+        """Runs one script's migration, retrying when the engine raises."""
+        started = time.perf_counter()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            try:
+                engine = self.engine_factory(self.repo_path, script, self._history_for(script))
+                passed = getattr(engine, self.mode)(**self.run_options)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Warning: {script} attempt {attempt} failed: {error}")
+                continue
+            last_run = getattr(engine, "last_run", None) or {}
+            best = last_run.get("best") or last_run
+            self._record(script, status="passed" if passed else "failed", content_hash=content_hash,
+                         inputs=inputs, attempts=attempt, seconds=round(time.perf_counter() - started, 3),
+                         candidate_path=best.get("candidate_path"))
+            return
+        self._record(script, status="error", content_hash=content_hash, inputs=inputs, attempts=self.retries + 1,
+                     seconds=round(time.perf_counter() - started, 3), error=error)
+
+    def _history_for(self, script: str) -> str:
+        # One history per script, so concurrent runs never share a run directory
+        return os.path.join(self.history_dir, os.path.splitext(script)[0].replace("/", "__"))
+
+    @staticmethod
+    def _default_engine(repo_path: str, script: str, history_dir: str):
+        return EvolutionEngine(repo_path, entry_point=script, history_dir=history_dir)
+
+    def _record(self, script: str, **entry):
+        with self._lock:
+            self.state[script] = entry
+            self._save_state()
+
+    def _load_state(self) -> Dict[str, dict]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Ignoring unreadable batch state {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,94 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from core.dependency_graph import DependencyGraph
+from core.spss_ast import ALL
+from core.structure_parser import CodeStructureParser
+
+class SearchIndex:
+    """
+    The Index of the Repository.
+    An inverted index from terms to the files that contain them, so "which
+    scripts touch INCOME?" is a dictionary lookup rather than a grep.
+
+    Term kinds:
+        "variable": SPSS variable names (and CSV header columns), case-insensitive
+        "compute":  Variables assigned by COMPUTE / IF / RECODE / COUNT
+        "file":     Files read, written or included by a script (normalized paths)
+        "word":     Every word in the file, comments included
+    """
+
+    KINDS = ("variable", "compute", "file", "word")
+
+    WORD = re.compile(r"\w+")
+    COMPUTE_COMMANDS = {"COMPUTE", "IF", "RECODE", "COUNT"}
+
+    def __init__(self):
+        self._postings: Dict[Tuple[str, str], Set[str]] = {}  # (kind, term) -> paths
+        self._terms: Dict[str, Set[Tuple[str, str]]] = {}     # path -> its (kind, term) keys
+
+    # --- Incremental updates -----------------------------------------------
+
+    def update_file(self, path: str, text: str, extension: Optional[str] = None):
+        """(Re)indexes one file, replacing whatever was indexed for it before."""
+        self.remove_file(path)
+        extension = extension or ""
+        keys = {("word", w.lower()) for w in self.WORD.findall(text)}
+
+        if extension == ".sps":
+            keys |= self._spss_terms(text)
+        elif extension == ".csv":
+            header = text.split("\n", 1)[0]
+            keys |= {("variable", c.strip().strip('"').lower()) for c in header.split(",") if c.strip()}
+
+        self._terms[path] = keys
+        for key in keys:
+            self._postings.setdefault(key, set()).add(path)
+
+    def remove_file(self, path: str):
+        for key in self._terms.pop(path, ()):
+            paths = self._postings.get(key)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[key]
+
+    def _spss_terms(self, code: str) -> Set[Tuple[str, str]]:
+        keys = set()
+        refs = CodeStructureParser.extract_file_references(code)
+        for ref in refs["reads"] + refs["writes"] + refs["includes"]:
+            keys.add(("file", DependencyGraph.normalize(ref)))
+
+        for command in CodeStructureParser.parse_ast(code).commands:
+            for name in (command.reads | command.writes) - {ALL}:
+                keys.add(("variable", name))
+            if command.name in self.COMPUTE_COMMANDS:
+                keys |= {("compute", name) for name in command.writes}
+        return keys
+
+    # --- Queries -----------------------------------------------------------
+
+    def search(self, term: str, kind: Optional[str] = None) -> List[str]:
+        """Sorted paths containing 'term' (of one kind, or of any kind)."""
+        term = DependencyGraph.normalize(term) if kind == "file" else term.lower()
+        kinds = [kind] if kind else self.KINDS
+        hits = set()
+        for k in kinds:
+            hits |= self._postings.get((k, term), set())
+        return sorted(hits)
+
+    def related(self, path: str, limit: int = 5) -> List[str]:
+        """
+        Other files sharing the most variables and file references with 'path',
+        best first. Used to pick neighbouring scripts for a prompt.
+        """
+        scores: Dict[str, int] = {}
+        for key in self._terms.get(path, ()):
+            if key[0] == "word":
+                continue
+            for other in self._postings.get(key, ()):
+                if other != path:
+                    scores[other] = scores.get(other, 0) + 1
+        return sorted(scores, key=lambda p: (-scores[p], p))[:limit]
+
+    def __len__(self):
+        return len(self._postings)
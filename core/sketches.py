@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+class HyperLogLog:
+    """
+    Cardinality estimator with fixed memory (2^precision one-byte registers).
+    Standard error is about 1.04 / sqrt(2^precision): ~1.6% at the default.
+    Values are hashed in bulk with pandas' vectorized hashing.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_many(self, values):
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+        hashes = pd.util.hash_array(values).astype(np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining (64 - p) bits
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))  # Linear counting for small sets
+        return int(round(raw))
+
+class ReservoirSample:
+    """
+    Uniform fixed-size sample of a stream (Algorithm R, vectorized per chunk).
+    Used as a quantile sketch: quantiles of the reservoir estimate those of the stream.
+    """
+
+    def __init__(self, size: int = 10_000, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.values = np.empty(0, dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        # 1. Fill the reservoir first
+        room = self.size - len(self.values)
+        if room > 0:
+            self.values = np.concatenate([self.values, values[:room]])
+            self.seen += min(room, len(values))
+            values = values[room:]
+            if values.size == 0:
+                return
+        # 2. Item number i (0-based over the stream) replaces a random slot with probability size / (i + 1)
+        positions = self.seen + np.arange(len(values))
+        slots = (self.rng.random(len(values)) * (positions + 1)).astype(np.int64)
+        accepted = slots < self.size
+        self.values[slots[accepted]] = values[accepted]
+        self.seen += len(values)
+
+    def quantiles(self, qs) -> dict:
+        if len(self.values) == 0:
+            return {}
+        points = np.quantile(self.values, qs)
+        return {f"p{int(round(q * 100)):02d}": float(v) for q, v in zip(qs, points)}
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from core.dependency_graph import DependencyGraph
+from core.spss_ast import ALL, CommandNode, SpssProgram
+from core.structure_parser import CodeStructureParser
+
+@dataclass
+class ProgramSlice:
+    """The commands of a script that can influence one target, in source order."""
+    target: str
+    commands: List[CommandNode] = field(default_factory=list)
+    total_commands: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(command.text for command in self.commands) + "\n"
+
+    @property
+    def reduction(self) -> float:
+        """Share of the script's commands left out of the slice."""
+        if not self.total_commands:
+            return 0.0
+        return 1 - len(self.commands) / self.total_commands
+
+class ProgramSlicer:
+    """
+    Backward slicer for SPSS scripts.
+    Keeps only the commands that can affect a chosen output variable or file,
+    so prompts carry the relevant logic rather than the whole script.
+
+    The slice is conservative: commands that filter, sort or replace cases are
+    always kept when they run before the target, conditional assignments never
+    hide earlier ones, and every kept command brings its enclosing DO IF /
+    LOOP (and the matching END) with it.
+    """
+
+    def slice(self, code: str, target: str, content_hash: Optional[str] = None) -> ProgramSlice:
+        """
+        Args:
+            code: SPSS source.
+            target: An output file written by the script, or a variable name.
+            content_hash: (Optional) The file's hash, to reuse a cached parse.
+        """
+        program = CodeStructureParser.parse_ast(code, content_hash)
+        wanted = DependencyGraph.normalize(target)
+        writers = [c for c in program.commands if wanted in (DependencyGraph.normalize(f) for f in c.output_files)]
+        if writers:
+            return self.slice_program(program, target, seeds=writers)
+        return self.slice_program(program, target, variables={target.lower()})
+
+    def slices_by_output(self, code: str, content_hash: Optional[str] = None) -> Dict[str, ProgramSlice]:
+        """One slice per output file of the script."""
+        program = CodeStructureParser.parse_ast(code, content_hash)
+        return {path: self.slice(code, path, content_hash) for path in program.output_files}
+
+    def slice_program(self, program: SpssProgram, target: str, seeds: Optional[List[CommandNode]] = None,
+                      variables: Optional[Set[str]] = None) -> ProgramSlice:
+        """
+        Backward pass from the seed commands (or from the end of the script for
+        'variables'), collecting every command whose effect can reach them.
+        """
+        commands = program.commands
+        kept: Set[int] = set()
+        needed: Set[str] = set(variables or ())
+
+        def keep(command):
+            kept.add(command.index)
+            if command.parent is None and ALL not in command.writes:
+                needed.difference_update(command.writes)  # Unconditional definition: earlier values are dead
+            needed.update(command.reads)
+            # Control dependence: the conditions deciding whether this command runs
+            parent = command.parent
+            while parent is not None and parent not in kept:
+                kept.add(parent)
+                needed.update(commands[parent].reads)
+                parent = commands[parent].parent
+
+        end = len(commands)
+        if seeds:
+            end = max(seed.index for seed in seeds)
+            for seed in seeds:
+                keep(seed)
+
+        for command in reversed(commands[:end]):
+            if command.index not in kept and self._relevant(command, needed):
+                keep(command)
+
+        kept |= self._structure(commands, kept)
+        return ProgramSlice(target, [commands[i] for i in sorted(kept)], len(commands))
+
+    @staticmethod
+    def _relevant(command: CommandNode, needed: Set[str]) -> bool:
+        if command.affects_cases:
+            return True
+        if ALL in needed:
+            return bool(command.writes)
+        return bool(command.writes & needed)
+
+    @staticmethod
+    def _structure(commands: List[CommandNode], kept: Set[int]) -> Set[int]:
+        """Closing END IF / END LOOP for kept blocks, and the rows of kept DATA LISTs."""
+        extra = set()
+        open_blocks = []
+        for command in commands:
+            if command.name in ("DO IF", "LOOP", "DO REPEAT"):
+                open_blocks.append([command.index])
+            elif command.name in ("ELSE", "ELSE IF") and open_blocks:
+                open_blocks[-1].append(command.index)
+            elif command.name in ("END IF", "END LOOP", "END REPEAT") and open_blocks:
+                block = open_blocks.pop()
+                if kept.intersection(block):
+                    extra.add(command.index)
+            elif command.name == "BEGIN DATA" and command.index - 1 in kept:
+                extra.add(command.index)
+        return extra
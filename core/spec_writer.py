@@ -1,6 +1,7 @@
 # core/spec_writer.py
 from utils.llm_client import LLMClient
 from core.prompts import SPEC_WRITER_SYSTEM_PROMPT
+from core.slicer import ProgramSlicer
 
 class SpecWriter:
     def __init__(self, llm_client=None):
@@ -30,6 +31,32 @@ class SpecWriter:
         """
         Generates a spec from Source Code (Used in EvolutionEngine).
         """
+        return self.llm.complete(**self._draft_request(source_code))
+
+    def initial_drafts(self, source_codes, backend="thread"):
+        """
+        Generates specs for many sources at once, overlapping the LLM calls.
+        Results are returned in the same order as 'source_codes'.
+        """
+        batch = [self._draft_request(code) for code in source_codes]
+        return self.llm.complete_many(batch, backend=backend)
+
+    def sliced_draft(self, source_code, target):
+        """
+        Generates a spec for one output only. The prompt carries the backward
+        slice of the script for 'target' (an output file or variable) instead
+        of the whole source.
+        """
+        program_slice = ProgramSlicer().slice(source_code, target)
+        return self.llm.complete(**self._draft_request(program_slice.text, focus=target))
+
+    def sliced_drafts(self, source_code, backend="thread"):
+        """One spec per output file of the script, drafted from its slice. Returns {output: spec}."""
+        slices = ProgramSlicer().slices_by_output(source_code)
+        batch = [self._draft_request(s.text, focus=target) for target, s in slices.items()]
+        return dict(zip(slices, self.llm.complete_many(batch, backend=backend)))
+
+    def _draft_request(self, source_code, focus=None):
         system_prompt = (
             "You are an expert technical writer. "
             "Analyze the provided source code and write a comprehensive "
@@ -38,8 +65,10 @@ class SpecWriter:
         )
         
         user_prompt = f"SOURCE CODE:\n```python\n{source_code}\n```"
+        if focus:
+            user_prompt = (
+                f"The code below is the slice of a larger script that produces '{focus}'. "
+                f"Specify only how '{focus}' is computed.\n\n{user_prompt}"
+            )
 
-        return self.llm.complete(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt
-        )
\ No newline at end of file
+        return {"system_prompt": system_prompt, "user_prompt": user_prompt}
\ No newline at end of file
@@ -0,0 +1,354 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+from core.spss_lexer import SpssLexer
+
+# SPSS reserved words: never variable names, wherever they appear
+OPERATORS = {"all", "and", "by", "eq", "ge", "gt", "le", "lt", "ne", "not", "or", "to", "with",
+             "thru", "lowest", "highest", "sysmis"}
+# Command, subcommand and option keywords: only skipped where a keyword goes
+# ('/KEYWORD', 'KEYWORD=' or inside a list's parentheses), since many of them
+# ('value', 'type', 'n', 'name', ...) are also common variable names
+KEYWORDS = {
+    "add", "aggregate", "begin", "break", "compute", "crosstabs", "data", "define", "delete",
+    "descriptives", "do", "else", "end", "exe", "execute", "export", "file", "files", "filter",
+    "first", "format", "formats", "frequencies", "get", "if", "import", "in", "include", "insert",
+    "into", "keep", "drop", "label", "labels", "last", "list", "loop", "match", "missing",
+    "off", "on", "outfile", "rename", "recode", "replace", "save", "select", "sort", "statistics",
+    "string", "table", "tables", "translate", "txt", "type", "update", "value", "values",
+    "variable", "variables", "vars", "write", "xsave", "csv", "sav", "xls", "xlsx", "lo", "hi",
+    "copy", "cases", "names", "fieldnames", "f", "a", "dataset", "activate", "name", "close",
+    "temporary", "weight", "split", "n", "numeric", "delcase", "delimiters", "arrangement",
+    "delimited", "firstcase", "fixed", "free", "line", "records", "skip", "qualifier", "mode",
+    "addvariables", "presorted", "sheet", "cellrange", "readnames", "encoding", "unselected",
+    "compressed", "map", "cells",
+}
+# Functions: only skipped when called, i.e. followed by '('
+FUNCTIONS = {
+    "abs", "any", "concat", "exp", "index", "lag", "length", "ln", "lower", "ltrim", "max",
+    "mean", "min", "mod", "number", "range", "rnd", "rtrim", "sd", "sqrt", "substr", "sum",
+    "trunc", "upcase", "upper", "nmiss", "nvalid", "valuelabel",
+}
+RESERVED = OPERATORS | KEYWORDS | FUNCTIONS
+# Variable formats, as written after a name in a declaration ('/VARIABLES=id F3 name A20')
+_FORMAT = re.compile(r"^(?:A|AHEX|F|N|E|COMMA|DOLLAR|DOT|PCT|DATE|ADATE|EDATE|SDATE|DATETIME|TIME)\d+(?:\.\d+)?$",
+                     re.IGNORECASE)
+
+ALL = "*"  # Wildcard: every variable of the active dataset
+
+# File references inside a command's text
+OUTFILE_RE = re.compile(r"\bOUTFILE\s*=\s*(['\"])(.+?)\1", re.IGNORECASE)
+INFILE_RE = re.compile(r"\b(?:FILE|TABLE)\s*=\s*(['\"])(.+?)\1", re.IGNORECASE)
+INCLUDED_RE = re.compile(r"(?:\bFILE\s*=\s*)?(['\"])(.+?)\1", re.IGNORECASE)
+
+@dataclass
+class CommandNode:
+    """One command with its data flow: variables and files read and written."""
+    index: int
+    name: str
+    kind: str
+    line: int
+    end_line: int
+    text: str
+    reads: Set[str] = field(default_factory=set)     # Variables used ('*' = all of them)
+    writes: Set[str] = field(default_factory=set)    # Variables defined ('*' = replaces the dataset)
+    input_files: List[str] = field(default_factory=list)
+    output_files: List[str] = field(default_factory=list)
+    affects_cases: bool = False                      # Filters, reorders or replaces rows
+    parent: Optional[int] = None                     # Enclosing DO IF / LOOP / DO REPEAT
+
+@dataclass
+class SpssProgram:
+    """Command-level AST of one script."""
+    commands: List[CommandNode]
+
+    @property
+    def input_files(self) -> List[str]:
+        return self._collect("input_files")
+
+    @property
+    def output_files(self) -> List[str]:
+        return self._collect("output_files")
+
+    def writers_of(self, variable: str) -> List[CommandNode]:
+        variable = variable.lower()
+        return [c for c in self.commands if variable in c.writes]
+
+    def _collect(self, attribute):
+        seen = []
+        for command in self.commands:
+            for path in getattr(command, attribute):
+                if path not in seen:
+                    seen.append(path)
+        return seen
+
+class SpssParser:
+    """
+    Builds an SpssProgram from a script. Parses are cached by content hash,
+    so every stage can ask for the AST of a file without re-parsing it.
+    """
+
+    CACHE_SIZE = 256
+    READ_COMMANDS = {"GET", "GET DATA", "GET TRANSLATE", "MATCH FILES", "ADD FILES", "UPDATE", "DATA LIST", "IMPORT"}
+    CASE_COMMANDS = {"SELECT IF", "FILTER", "SORT CASES", "SAMPLE", "N", "WEIGHT"}
+    BLOCK_OPEN = {"DO IF", "LOOP", "DO REPEAT"}
+    BLOCK_CLOSE = {"END IF", "END LOOP", "END REPEAT"}
+
+    _cache: "OrderedDict[str, SpssProgram]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.lexer = SpssLexer()
+
+    def parse(self, code: str, content_hash: Optional[str] = None) -> SpssProgram:
+        """Returns the (cached) AST of 'code'. Pass the file's hash to skip re-hashing."""
+        key = content_hash or hashlib.sha256(code.encode("utf-8")).hexdigest()
+        with self._lock:
+            program = self._cache.get(key)
+            if program is not None:
+                self._cache.move_to_end(key)
+                return program
+
+        program = SpssProgram(self._build(code))
+        with self._lock:
+            self._cache[key] = program
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return program
+
+    def _build(self, code: str) -> List[CommandNode]:
+        nodes = []
+        blocks = []  # Open DO IF / LOOP / DO REPEAT (or their current ELSE branch)
+        for command in self.lexer.commands(code):
+            if command.kind == "COMMENT":
+                continue
+            node = CommandNode(len(nodes), command.name, command.kind, command.line,
+                               command.end_line, command.text)
+            node.parent = blocks[-1] if blocks else None
+
+            if command.name in self.BLOCK_CLOSE:
+                if blocks:
+                    blocks.pop()
+                node.parent = blocks[-1] if blocks else None
+            elif command.name in ("ELSE", "ELSE IF") and blocks:
+                # A branch hangs off the previous branch (or the DO IF), and the
+                # commands after it hang off the branch, so the chain of parents
+                # holds every condition that decides whether a command runs
+                blocks[-1] = node.index
+
+            self._data_flow(node, command.tokens)
+            if command.name in self.BLOCK_OPEN:
+                blocks.append(node.index)
+            nodes.append(node)
+        return nodes
+
+    # --- Per-command data flow ---------------------------------------------
+
+    def _data_flow(self, node: CommandNode, tokens):
+        name = node.name
+        words = self._variables(tokens[len(name.split()):])
+
+        for match in OUTFILE_RE.finditer(node.text):
+            node.output_files.append(match.group(2))
+
+        if name in ("COMPUTE", "IF", "COUNT"):
+            target, expression = self._assignment(tokens[1:], conditional=name == "IF")
+            if target:
+                node.writes.add(target)
+            node.reads |= self._variables(expression, mode="expression")
+        elif name == "RECODE":
+            into = self._after_keyword(tokens, "INTO")
+            sources = self._variables(self._before_keyword(tokens[1:], "INTO", stop_at="("))
+            node.reads |= sources
+            node.writes |= self._variables(into) if into else sources
+        elif name in ("STRING", "NUMERIC"):
+            node.writes |= words
+        elif name in self.READ_COMMANDS:
+            node.input_files += [m.group(2) for m in INFILE_RE.finditer(node.text)]
+            node.writes.add(ALL)
+            node.affects_cases = True
+            declared = self._subcommand(tokens, "VARIABLES")
+            if name == "DATA LIST":
+                declared = self._after_first_slash(tokens)
+            node.writes |= self._variables(declared, mode="declaration")
+            node.reads |= self._variables(self._subcommand(tokens, "BY"))
+        elif name in ("INCLUDE", "INSERT"):
+            match = INCLUDED_RE.search(node.text)
+            if match:
+                node.input_files.append(match.group(2))
+            node.reads.add(ALL)
+            node.writes.add(ALL)
+        elif name == "AGGREGATE":
+            node.reads |= self._variables(self._subcommand(tokens, "BREAK"))
+            for target, source in self._aggregations(tokens):
+                node.writes.add(target)
+                node.reads |= source
+            if not node.output_files:
+                node.affects_cases = True  # OUTFILE=* replaces the active dataset
+        elif node.kind == "OUTPUT":
+            keep = self._subcommand(tokens, "KEEP")
+            node.reads |= self._variables(keep) if keep else {ALL}
+        elif name == "SELECT IF":
+            node.reads |= self._variables(tokens[2:], mode="expression")
+            node.affects_cases = True
+        elif name in self.CASE_COMMANDS:
+            node.reads |= words
+            node.affects_cases = True
+        elif name in self.BLOCK_OPEN or name == "ELSE IF":
+            node.reads |= self._variables(tokens[len(name.split()):], mode="expression")
+        elif name in ("EXECUTE", "EXE", "ELSE", "BEGIN DATA") or name in self.BLOCK_CLOSE:
+            pass
+        elif name in ("VARIABLE LABELS", "VALUE LABELS", "FORMATS", "MISSING VALUES", "RENAME VARIABLES"):
+            node.reads |= words
+            node.writes |= words
+        else:
+            # Analysis and unknown commands: assume they use every name they mention
+            node.reads |= words
+
+    @staticmethod
+    def _variables(tokens, mode: str = "list") -> Set[str]:
+        """
+        Variable names among 'tokens'.
+
+        Args:
+            tokens: Tokens of (part of) a command.
+            mode: "expression" (COMPUTE, IF, conditions): only operators and
+                  function calls are not names. "declaration" (VARIABLES=, DATA LIST):
+                  a format right after a name is its type, not a name.
+                  "list" (anything else): keywords are skipped in keyword position,
+                  and words inside parentheses are options, not names.
+        """
+        names = set()
+        depth = 0
+        previous = None  # The previous token, if it was taken as a name
+        for i, token in enumerate(tokens):
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                depth = max(0, depth - 1)
+            taken, previous = previous, None
+            if token.type != "WORD":
+                continue
+            value = token.value.lower()
+            before = tokens[i - 1].value if i > 0 else None
+            after = tokens[i + 1].value if i + 1 < len(tokens) else None
+            if value in OPERATORS or value.startswith("!") or (value in FUNCTIONS and after == "("):
+                continue
+            if mode == "declaration":
+                if depth or (taken and _FORMAT.match(value)):
+                    continue
+            elif mode == "list":
+                if depth or (value in KEYWORDS and (before == "/" or after == "=")):
+                    continue
+            names.add(value)
+            previous = value
+        return names
+
+    @staticmethod
+    def _assignment(tokens, conditional=False):
+        """
+        Splits 'target = expression' into the target's name and the tokens it reads.
+
+        The target ends at the first top-level '=' (later ones compare), and a
+        subscripted target 'v(#i)' assigns 'v' and reads its index. IF puts a
+        condition first: a parenthesized one is skipped (and read); otherwise the
+        split is the last top-level '=' preceded by a name.
+        """
+        condition = []
+        if conditional and tokens and tokens[0].value == "(":
+            depth = 0
+            for i, token in enumerate(tokens):
+                if token.value == "(":
+                    depth += 1
+                elif token.value == ")":
+                    depth -= 1
+                    if depth == 0:
+                        condition, tokens = tokens[:i + 1], tokens[i + 1:]
+                        break
+
+        depth, split = 0, None
+        for i, token in enumerate(tokens):
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                depth -= 1
+            elif token.value == "=" and depth == 0:
+                if not (conditional and not condition):
+                    split = i
+                    break
+                if i > 0 and tokens[i - 1].type == "WORD":
+                    split = i
+        if split is None:
+            return None, condition + tokens
+        if conditional and not condition:
+            return tokens[split - 1].value.lower(), tokens[:split - 1] + tokens[split + 1:]
+        target = tokens[:split]
+        if not target or target[0].type != "WORD":
+            return None, condition + tokens
+        return target[0].value.lower(), condition + target[1:] + tokens[split + 1:]
+
+    @staticmethod
+    def _subcommand(tokens, keyword):
+        """Tokens of '/KEYWORD = ...' up to the next '/'."""
+        collected, inside = [], False
+        for i, token in enumerate(tokens):
+            if token.value == "/":
+                if inside:
+                    break
+                inside = i + 1 < len(tokens) and tokens[i + 1].value.upper() == keyword
+                continue
+            if inside and token.value.upper() != keyword and token.value != "=":
+                collected.append(token)
+        return collected
+
+    @staticmethod
+    def _after_first_slash(tokens):
+        for i, token in enumerate(tokens):
+            if token.value == "/":
+                return tokens[i + 1:]
+        return []
+
+    @staticmethod
+    def _after_keyword(tokens, keyword):
+        for i, token in enumerate(tokens):
+            if token.type == "WORD" and token.value.upper() == keyword:
+                return [t for t in tokens[i + 1:] if t.value != "/"]
+        return []
+
+    @staticmethod
+    def _before_keyword(tokens, keyword, stop_at=None):
+        collected = []
+        for token in tokens:
+            if token.type == "WORD" and token.value.upper() == keyword:
+                break
+            if token.value == stop_at:
+                # Value mappings '(1=2)' are not variables; skip to the closing paren
+                collected.append(None)
+                continue
+            if collected and collected[-1] is None:
+                if token.value == ")":
+                    collected.pop()
+                continue
+            collected.append(token)
+        return [t for t in collected if t is not None]
+
+    @staticmethod
+    def _aggregations(tokens):
+        """'/target = FUNC(source)' pairs of an AGGREGATE command."""
+        pairs, i = [], 0
+        while i < len(tokens) - 2:
+            if tokens[i].value == "/" and tokens[i + 2].value == "=":
+                keyword = tokens[i + 1].value.upper()
+                j = i + 3
+                while j < len(tokens) and tokens[j].value != "/":
+                    j += 1
+                if keyword not in ("OUTFILE", "BREAK", "MODE", "PRESORTED", "DOCUMENT", "MISSING"):
+                    sources = SpssParser._variables(tokens[i + 3:j], mode="expression")
+                    pairs.append((tokens[i + 1].value.lower(), sources))
+                i = j
+            else:
+                i += 1
+        return pairs
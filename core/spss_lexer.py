@@ -0,0 +1,146 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, List, NamedTuple, Optional
+
+class Token(NamedTuple):
+    type: str    # WORD, STRING, NUMBER, OP, DOT
+    value: str
+    line: int    # 1-based
+
+@dataclass
+class SpssCommand:
+    """One SPSS command, from its first token to its terminator."""
+    name: str                 # Canonical upper-case keyword(s), e.g. 'GET DATA', 'COMPUTE', '*'
+    kind: str                 # INPUT, TRANSFORM, ANALYSIS, OUTPUT, DATA, COMMENT or OTHER
+    line: int                 # First line (1-based)
+    end_line: int
+    text: str                 # Source text of the command, terminator included
+    tokens: List[Token] = field(default_factory=list, repr=False)  # Empty for comments
+    data: Optional[str] = None  # Inline rows of a BEGIN DATA ... END DATA block
+
+class SpssLexer:
+    """
+    Single-pass lexer for SPSS syntax.
+
+    One compiled regex walks the whole file once; a small state machine on top
+    splits the token stream into commands. A command ends at a period that is
+    the last thing on its line (a trailing /* comment aside) or at a blank line;
+    lines in between are continuations. Periods inside strings, decimals and
+    names never terminate.
+    Comment commands ('*', COMMENT) are kept as one node, and the rows of a
+    BEGIN DATA block are captured verbatim up to END DATA.
+    """
+
+    _MASTER = re.compile(r"""
+         (?P<NEWLINE>\r?\n)
+        |(?P<WS>[ \t\f\v]+)
+        |(?P<INLINE_COMMENT>/\*[^\n]*?(?:\*/|(?=\r?\n)|\Z))
+        |(?P<STRING>'(?:[^'\n]|'')*'|"(?:[^"\n]|"")*")
+        |(?P<NUMBER>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+        |(?P<WORD>[A-Za-z@#$!](?:[\w@#$]|\.(?=[\w@#$]))*)
+        |(?P<TERM>\.[ \t]*(?=(?:/\*[^\n]*)?(?:\r?\n|\Z)))
+        |(?P<OP><=|>=|~=|<>|\*\*|[-+*/=<>&|~(),:;])
+        |(?P<DOT>\.)
+        |(?P<OTHER>.)
+    """, re.VERBOSE)
+
+    _END_DATA = re.compile(r"^[ \t]*END[ \t]+DATA\b[^\n]*", re.IGNORECASE | re.MULTILINE)
+    _NAME = re.compile(r"[A-Za-z][A-Za-z-]*(?:[ \t]+[A-Za-z][A-Za-z-]*)?")
+
+    # Commands whose name is two words
+    TWO_WORD = {
+        "ADD FILES", "ADD VALUE", "BEGIN DATA", "DATA LIST", "DATASET ACTIVATE", "DATASET CLOSE",
+        "DATASET NAME", "DO IF", "DO REPEAT", "ELSE IF", "END IF", "END LOOP", "END REPEAT",
+        "FILE HANDLE", "GET DATA", "GET TRANSLATE", "MATCH FILES", "MISSING VALUES", "SAVE TRANSLATE",
+        "SELECT IF", "SORT CASES", "SPLIT FILE", "VALUE LABELS", "VARIABLE LABELS",
+    }
+
+    KINDS = {
+        "INPUT": {"GET", "GET DATA", "GET TRANSLATE", "MATCH FILES", "ADD FILES", "IMPORT", "DATA LIST", "UPDATE"},
+        "TRANSFORM": {"COMPUTE", "RECODE", "IF", "DO IF", "AGGREGATE", "COUNT", "SELECT IF"},
+        "ANALYSIS": {"DESCRIPTIVES", "FREQUENCIES", "CROSSTABS", "CORRELATIONS", "REGRESSION", "MEANS"},
+        "OUTPUT": {"SAVE", "SAVE TRANSLATE", "XSAVE", "WRITE", "EXPORT"},
+        "DATA": {"BEGIN DATA"},
+    }
+    _KIND_OF = {name: kind for kind, names in KINDS.items() for name in names}
+
+    def commands(self, code: str) -> Iterator[SpssCommand]:
+        """Yields the commands of 'code' in order, in one pass over the text."""
+        scan = self._MASTER.match
+        pos, line, end_of_code = 0, 1, len(code)
+        start = None          # Offset where the current command began
+        start_line = 0
+        tokens: List[Token] = []
+        comment = False       # Current command is a comment: no tokens collected
+        blank_line = True     # Nothing but whitespace since the last newline
+
+        while pos < end_of_code:
+            match = scan(code, pos)
+            kind, pos = match.lastgroup, match.end()
+
+            if kind == "NEWLINE":
+                if start is not None and (blank_line or self._is_begin_data(tokens)):
+                    # A blank line ends a command like a terminator does; so does the
+                    # end of a 'BEGIN DATA' line, which often has no period
+                    command = self._make(code, start, match.start(), start_line, line, tokens, comment)
+                    if command.name == "BEGIN DATA":
+                        pos = self._read_data(code, command, start, pos)
+                    start, tokens, comment = None, [], False
+                    yield command
+                    if command.data is not None:
+                        # Resume at the end of the END DATA line
+                        line = command.end_line
+                        continue
+                line += 1
+                blank_line = True
+                continue
+            if kind == "WS" or kind == "INLINE_COMMENT":
+                continue
+
+            blank_line = False
+            if start is None:
+                start, start_line = match.start(), line
+                comment = match.group() == "*" or (kind == "WORD" and match.group().upper() == "COMMENT")
+
+            if kind != "TERM":
+                if not comment:
+                    tokens.append(Token(kind, match.group(), line))
+                continue
+
+            command = self._make(code, start, pos, start_line, line, tokens, comment)
+            if command.name == "BEGIN DATA":
+                newline = code.find("\n", pos)
+                pos = self._read_data(code, command, start, end_of_code if newline == -1 else newline + 1)
+                line = command.end_line
+            yield command
+            start, tokens, comment = None, [], False
+
+        if start is not None:
+            yield self._make(code, start, end_of_code, start_line, line, tokens, comment)
+
+    @staticmethod
+    def _is_begin_data(tokens) -> bool:
+        return (len(tokens) == 2 and tokens[0].value.upper() == "BEGIN"
+                and tokens[1].value.upper() == "DATA")
+
+    def _read_data(self, code, command, start, rows_start) -> int:
+        """Captures the raw rows after BEGIN DATA; returns the offset after END DATA."""
+        end = self._END_DATA.search(code, rows_start)
+        rows_end = end.start() if end else len(code)
+        stop = end.end() if end else len(code)
+        command.data = code[rows_start:rows_end]
+        command.text = code[start:stop]
+        command.end_line = command.line + command.text.count("\n")
+        return stop
+
+    def _make(self, code, start, end, line, end_line, tokens, comment) -> SpssCommand:
+        text = code[start:end]
+        if comment:
+            name = "*" if text.startswith("*") else "COMMENT"
+            return SpssCommand(name, "COMMENT", line, end_line, text)
+
+        words = self._NAME.match(text)
+        name = " ".join(words.group().upper().split()) if words else (tokens[0].value if tokens else "")
+        if name not in self.TWO_WORD:
+            name = name.split(" ")[0]
+        return SpssCommand(name, self._KIND_OF.get(name, "OTHER"), line, end_line, text, tokens)
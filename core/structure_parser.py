@@ -1,17 +1,18 @@
 # core/structure_parser.py
 import re
+from core.spss_ast import INCLUDED_RE, INFILE_RE, OUTFILE_RE, SpssParser, SpssProgram
+from core.spss_lexer import SpssLexer
+
+_LEXER = SpssLexer()
+_PARSER = SpssParser()
 
 class CodeStructureParser:
     """
     Parses code to identify structure and metadata.
     """
-    
-    PATTERNS = {
-        "INPUT": r"(GET DATA|MATCH FILES|ADD FILES|IMPORT)",
-        "TRANSFORM": r"(COMPUTE|RECODE|IF|DO IF|AGGREGATE)",
-        "ANALYSIS": r"(DESCRIPTIVES|FREQUENCIES|CROSSTABS|CORRELATIONS|REGRESSION)",
-        "OUTPUT": r"(SAVE TRANSLATE|WRITE|EXPORT|SAVE)"
-    }
+
+    # Command kinds that open a new block in parse_spss (see SpssLexer.KINDS)
+    BLOCK_KINDS = ("INPUT", "TRANSFORM", "ANALYSIS", "OUTPUT")
 
     @staticmethod
     def extract_output_filename(code: str) -> str | None:
@@ -30,32 +31,77 @@ class CodeStructureParser:
             return match.group(1)
         return None
 
+    # Commands whose FILE= / TABLE= subcommands name an input
+    READ_COMMANDS = {"GET", "GET DATA", "GET TRANSLATE", "MATCH FILES", "ADD FILES", "UPDATE", "DATA LIST", "IMPORT"}
+    # Commands that pull in another syntax file
+    INCLUDE_COMMANDS = {"INCLUDE", "INSERT"}
+
+    @staticmethod
+    def extract_file_references(code: str) -> dict:
+        """
+        Lists the files an SPSS script reads and writes, in order of appearance.
+        Returns {"reads": [...], "writes": [...], "includes": [...]}.
+
+        Reads:    GET / GET DATA / GET TRANSLATE, MATCH FILES, ADD FILES, UPDATE, DATA LIST, IMPORT
+        Writes:   any OUTFILE= (SAVE, XSAVE, SAVE TRANSLATE, EXPORT, AGGREGATE, ...)
+        Includes: INCLUDE / INSERT
+        The active dataset ('*') is not a file and is ignored.
+        """
+        refs = {"reads": [], "writes": [], "includes": []}
+
+        def add(kind, path):
+            if path not in refs[kind]:
+                refs[kind].append(path)
+
+        for command in _LEXER.commands(code):
+            if command.kind in ("COMMENT", "DATA"):
+                continue
+            for match in OUTFILE_RE.finditer(command.text):
+                add("writes", match.group(2))
+            if command.name in CodeStructureParser.INCLUDE_COMMANDS:
+                match = INCLUDED_RE.search(command.text)
+                if match:
+                    add("includes", match.group(2))
+            elif command.name in CodeStructureParser.READ_COMMANDS:
+                for match in INFILE_RE.finditer(command.text):
+                    add("reads", match.group(2))
+
+        return refs
+
+    @staticmethod
+    def commands(code: str):
+        """Typed command nodes of an SPSS script (see SpssLexer)."""
+        return list(_LEXER.commands(code))
+
+    @staticmethod
+    def extract_output_filenames(code: str) -> list:
+        """Every file the script writes (all SAVE / XSAVE / EXPORT ... targets), in order."""
+        return CodeStructureParser.parse_ast(code).output_files
+
+    @staticmethod
+    def parse_ast(code: str, content_hash: str = None) -> SpssProgram:
+        """Command-level AST with per-command variable and file flow (cached by content hash)."""
+        return _PARSER.parse(code, content_hash)
+
     @staticmethod
     def parse_spss(code: str):
         """Returns structured blocks (imports, logic, exports)."""
         blocks = []
-        lines = code.splitlines()
         current_block = {"type": "UNKNOWN", "content": []}
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("*"): 
-                continue 
-
-            matched_type = None
-            for key, pattern in CodeStructureParser.PATTERNS.items():
-                if re.match(pattern, line, re.IGNORECASE):
-                    matched_type = key
-                    break
-            
-            if matched_type:
+
+        for command in _LEXER.commands(code):
+            if command.kind == "COMMENT":
+                continue
+            lines = [line.strip() for line in command.text.splitlines() if line.strip()]
+
+            if command.kind in CodeStructureParser.BLOCK_KINDS:
                 if current_block["content"]:
                     blocks.append(current_block)
-                current_block = {"type": matched_type, "content": [line]}
+                current_block = {"type": command.kind, "content": lines}
             else:
-                current_block["content"].append(line)
-        
+                current_block["content"].extend(lines)
+
         if current_block["content"]:
             blocks.append(current_block)
-            
-        return blocks
\ No newline at end of file
+
+        return blocks
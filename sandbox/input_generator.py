@@ -0,0 +1,241 @@
+import math
+import random
+
+class InputGenerator:
+    """
+    Property-based input generator for the Critic.
+
+    Draws from a column schema, biased towards edge cases (boundaries, parity,
+    non-numeric text, empties, NaN) where legacy logic tends to diverge.
+    Strategies that keep uncovering new behaviour are drawn more often, and
+    failing inputs can be shrunk to a minimal counterexample.
+
+    A schema maps column name -> {"kind": "int" | "float" | "str", "min": ..,
+    "max": .., "values": [..observed samples..], "null_rate": ..}. A single column named 'value'
+    yields bare scalars (the SandboxAdapter's classic format); any other schema
+    yields row dicts.
+    """
+
+    DEFAULT_SCHEMA = {"value": {"kind": "int", "min": 1, "max": 100}}
+
+    STRATEGIES = ("uniform", "boundary", "parity", "special", "text", "empty")
+
+    def __init__(self, schema=None, edge_bias=0.5, seed=None):
+        """
+        Args:
+            schema: Column schema (defaults to one int column 'value' in [1, 100]).
+            edge_bias: Share of draws spent on edge-case strategies rather than uniform values.
+            seed: (Optional) Seed for reproducible runs.
+        """
+        self.schema = schema or self.DEFAULT_SCHEMA
+        self.edge_bias = edge_bias
+        self.rng = random.Random(seed)
+        self.weights = {name: 1.0 for name in self.STRATEGIES if name != "uniform"}
+        self._signatures = set()
+        self._provenance = {}
+        self._parity = {}  # Column -> odd neighbour owed to its next parity draw
+
+    @classmethod
+    def from_profile(cls, profile: dict, **kwargs):
+        """Builds a generator from DataProfiler.profile() output."""
+        schema = {}
+        for name, stats in profile.get("columns", {}).items():
+            spec = {"kind": stats.get("kind", "str")}
+            if stats.get("min") is not None:
+                spec["min"] = stats["min"]
+            if stats.get("max") is not None:
+                spec["max"] = stats["max"]
+            if stats.get("sample_values"):
+                spec["values"] = list(stats["sample_values"])
+            if stats.get("null_rate"):
+                spec["null_rate"] = stats["null_rate"]
+            schema[name] = spec
+        return cls(schema or None, **kwargs)
+
+    # --- Drawing -----------------------------------------------------------
+
+    def draw(self):
+        """Returns one test input (a scalar or a row dict, see class docstring)."""
+        if self.rng.random() < self.edge_bias:
+            strategy = self._pick_edge_strategy()
+        else:
+            strategy = "uniform"
+
+        row = {name: self._draw_value(spec, strategy, name) for name, spec in self.schema.items()}
+        test_input = self._shape(row)
+        if len(self._provenance) > 10_000:
+            self._provenance.clear()  # Nobody is feeding back; don't grow forever
+        self._provenance[self._key(test_input)] = strategy
+        return test_input
+
+    def batch(self, n):
+        return [self.draw() for _ in range(n)]
+
+    def _pick_edge_strategy(self):
+        names = list(self.weights)
+        return self.rng.choices(names, weights=[self.weights[n] for n in names])[0]
+
+    def _draw_value(self, spec, strategy, name=None):
+        kind = spec.get("kind", "str")
+        low, high = self._bounds(spec)
+
+        if strategy == "empty" or (strategy == "uniform" and self.rng.random() < spec.get("null_rate", 0)):
+            return ""
+        if strategy == "text":
+            return self.rng.choice(["abc", " ", "N/A", "1,000", "12abc", "é", "x" * 256])
+        if strategy == "special":
+            return self.rng.choice([float("nan"), float("inf"), float("-inf"), -0.0, 1e-12, 1e300, " 7 ", "1e3"])
+
+        if kind == "str":
+            # Profiled samples keep their parsed type (e.g. bool for True/False columns)
+            observed = [str(value) for value in spec.get("values") or ["a"]]
+            if strategy == "boundary":
+                return self.rng.choice(["", observed[0], observed[-1], observed[0].upper()])
+            return self.rng.choice(observed)
+
+        if strategy == "boundary":
+            value = self.rng.choice([low, high, low - 1, high + 1, 0, 1, -1, 2 ** 31 - 1, -2 ** 31])
+        elif strategy == "parity":
+            # Pairs: an even value, then (on the next parity draw) its odd neighbour,
+            # so the two inputs differ only in parity
+            value = self._parity.pop(name, None)
+            if value is None:
+                base = self.rng.randint(int(low), int(high))
+                value = base - base % 2
+                self._parity[name] = value + 1
+        else:
+            value = self.rng.uniform(low, high) if kind == "float" else self.rng.randint(int(low), int(high))
+
+        return float(value) if kind == "float" else int(value)
+
+    def _bounds(self, spec):
+        low = spec.get("min", 0 if spec.get("kind") != "float" else -1.0)
+        high = spec.get("max", 100 if spec.get("kind") != "float" else 1.0)
+        if spec.get("kind") == "int":
+            low, high = math.floor(low), math.ceil(high)
+        return low, high
+
+    def _shape(self, row):
+        if list(row) == ["value"]:
+            return row["value"]
+        return row
+
+    # --- Coverage feedback -------------------------------------------------
+
+    def observe(self, test_input, output):
+        """
+        Feeds back what the ground truth did with an input. Edge strategies
+        that reach a behaviour not seen before get drawn more often.
+        """
+        strategy = self._provenance.pop(self._key(test_input), None)
+        signature = self.signature(output)
+        if signature in self._signatures:
+            if strategy in self.weights:
+                self.weights[strategy] = max(0.25, self.weights[strategy] * 0.95)
+            return False
+        self._signatures.add(signature)
+        if strategy in self.weights:
+            self.weights[strategy] = min(8.0, self.weights[strategy] * 1.5)
+        return True
+
+    @staticmethod
+    def signature(output):
+        """Coarse behaviour class of an output row: its columns and value shapes."""
+        if not isinstance(output, dict):
+            return ("scalar", type(output).__name__)
+        if "error" in output:
+            return ("error", str(output["error"]).split(":")[0][:40])
+        return tuple(sorted((key, InputGenerator._value_class(value)) for key, value in output.items()))
+
+    @staticmethod
+    def _value_class(value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return "empty" if value in ("", None) else "text"
+        if math.isnan(number):
+            return "nan"
+        if math.isinf(number):
+            return "inf"
+        if number == 0:
+            return "zero"
+        sign = "neg" if number < 0 else "pos"
+        shape = "int" if number.is_integer() else "frac"
+        return f"{sign}-{shape}"
+
+    @property
+    def behaviours_seen(self):
+        return len(self._signatures)
+
+    # --- Shrinking ---------------------------------------------------------
+
+    def shrink(self, test_input, still_fails, max_steps=100):
+        """
+        Greedily simplifies a failing input while 'still_fails(candidate)' holds.
+        Returns the smallest failing input found within 'max_steps' checks.
+        """
+        current = test_input
+        steps = 0
+        improved = True
+        while improved and steps < max_steps:
+            improved = False
+            for candidate in self._simpler(current):
+                steps += 1
+                if still_fails(candidate):
+                    current = candidate
+                    improved = True
+                    break
+                if steps >= max_steps:
+                    break
+        return current
+
+    def _simpler(self, test_input):
+        """Yields candidates that are strictly simpler than the input."""
+        if isinstance(test_input, dict):
+            for name, value in test_input.items():
+                for smaller in self._simpler(value):
+                    yield {**test_input, name: smaller}
+            return
+
+        if isinstance(test_input, bool):
+            return
+        if isinstance(test_input, int):
+            if test_input == 0:
+                return
+            yield 0
+            if test_input < 0:
+                yield -test_input
+            # Step towards zero by halving distances: x - x/2, x - x/4, ..., x - 1
+            sign = 1 if test_input > 0 else -1
+            delta = abs(test_input) // 2
+            while delta > 0:
+                yield test_input - sign * delta
+                delta //= 2
+            return
+        if isinstance(test_input, float):
+            if math.isnan(test_input) or math.isinf(test_input):
+                yield 0.0
+                return
+            if test_input != 0.0:
+                yield 0.0
+            if not test_input.is_integer():
+                yield float(math.trunc(test_input))
+            if abs(test_input) >= 2:
+                yield test_input / 2
+            return
+        if isinstance(test_input, str):
+            if test_input:
+                yield ""
+            if len(test_input) > 1:
+                yield test_input[:len(test_input) // 2]
+                yield test_input[1:]
+                yield test_input[:-1]
+            stripped = test_input.strip()
+            if stripped != test_input:
+                yield stripped
+
+    @staticmethod
+    def _key(test_input):
+        if isinstance(test_input, dict):
+            return repr(sorted(test_input.items()))
+        return repr(test_input)
@@ -27,5 +27,32 @@ class TestBuilder(unittest.TestCase):
         self.assertEqual(args[0], BUILDER_V1) # System prompt
         self.assertIn(dummy_spec, args[1])    # User prompt contains spec
 
+    def test_variants_get_their_own_prompt(self):
+        """Speculative variants must not share a cache entry with the primary build."""
+        mock_llm = MagicMock()
+        builder = Builder(llm_client=mock_llm)
+
+        builder.build("# Spec", temperature=0.7, variant=2)
+        builder.build("# Spec")
+
+        (_, variant_prompt), variant_kwargs = mock_llm.complete.call_args_list[0]
+        (_, primary_prompt), primary_kwargs = mock_llm.complete.call_args_list[1]
+        self.assertIn("VARIANT 2", variant_prompt)
+        self.assertNotEqual(variant_prompt, primary_prompt)
+        self.assertEqual((variant_kwargs["temperature"], primary_kwargs["temperature"]), (0.7, None))
+
+    def test_build_many_batches_requests(self):
+        """Verify build_many sends one request per spec through complete_many."""
+        mock_llm = MagicMock()
+        mock_llm.complete_many.return_value = ["code_a", "code_b"]
+
+        builder = Builder(llm_client=mock_llm)
+        result = builder.build_many(["# Spec A", "# Spec B"])
+
+        self.assertEqual(result, ["code_a", "code_b"])
+        batch = mock_llm.complete_many.call_args[0][0]
+        self.assertEqual(len(batch), 2)
+        self.assertIn("# Spec B", batch[1][1])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from core.columnar_cache import ColumnarCache
+
+class TestColumnarCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.test_dir, "results.csv")
+        with open(self.csv_path, "w") as f:
+            f.write("id,bmi,name,flag,code\n")
+            for i in range(1000):
+                bmi = "" if i % 7 == 0 else (i * 0.5 if i > 500 else i)  # Floats only in later chunks
+                name = "" if i % 9 == 0 else f"n{i % 13}"
+                code = i if i < 900 else f"X{i}"  # Text only in the last chunk
+                f.write(f"{i},{bmi},{name},{i % 2 == 0},{code}\n")
+        self.cache = ColumnarCache(os.path.join(self.test_dir, "cache"), chunksize=300)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_read_csv(self):
+        """Chunk-by-chunk conversion must give the same frame as one whole-file parse."""
+        # copy() turns the mapped arrays into plain ones for the class check
+        pd.testing.assert_frame_equal(self.cache.read(self.csv_path).copy(), pd.read_csv(self.csv_path))
+        text = pd.read_csv(self.csv_path, dtype=str, keep_default_na=False)
+        pd.testing.assert_frame_equal(self.cache.read(self.csv_path, text=True), text)
+
+    def test_second_read_is_mapped_not_parsed(self):
+        self.cache.read(self.csv_path)
+        with patch("core.columnar_cache.pd.read_csv", side_effect=AssertionError("re-parsed")):
+            frame = ColumnarCache(self.cache.cache_dir).read(self.csv_path, columns=["id", "name"])
+
+        self.assertEqual(list(frame.columns), ["id", "name"])
+        base = frame["id"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)  # Zero-copy view of the file
+
+    def test_changed_content_gets_new_entry(self):
+        first = self.cache.path_for(self.csv_path)
+        self.cache.read(self.csv_path)
+        with open(self.csv_path, "a") as f:
+            f.write("1000,1.0,z,False,Y\n")
+        self.assertNotEqual(self.cache.path_for(self.csv_path), first)
+        self.assertEqual(len(self.cache.read(self.csv_path)), 1001)
+
+    def test_iter_chunks(self):
+        sizes = [len(chunk) for chunk in self.cache.iter_chunks(self.csv_path, chunksize=400, nrows=900)]
+        self.assertEqual(sizes, [400, 400, 100])
+
+        empty = os.path.join(self.test_dir, "empty.csv")
+        with open(empty, "w") as f:
+            f.write("a,b\n")
+        chunks = list(self.cache.iter_chunks(empty))
+        self.assertEqual([list(c.columns) for c in chunks], [["a", "b"]])
+
+if __name__ == '__main__':
+    unittest.main()
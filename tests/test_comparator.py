@@ -0,0 +1,109 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from core.columnar_cache import ColumnarCache
+from core.comparator import OutputComparator
+
+class TestOutputComparator(unittest.TestCase):
+    def test_dtype_normalization_and_tolerance(self):
+        """Verify '4' vs 4.0 and tiny float noise are not reported as diffs."""
+        expected = pd.DataFrame({"id": ["1", "2"], "bmi": ["22.857142857142858", "27.77"]})
+        actual = pd.DataFrame({"id": [1, 2], "bmi": [22.857142857142854, 27.77]})
+
+        report = OutputComparator(float_tolerance=1e-9).compare_frames(expected, actual)
+
+        self.assertTrue(report["match"])
+        self.assertEqual(report["column_mismatches"], {})
+
+    def test_strict_mode_keeps_types(self):
+        expected = pd.DataFrame({"id": ["1"]})
+        actual = pd.DataFrame({"id": ["1.0"]})
+        report = OutputComparator(normalize_dtypes=False).compare_frames(expected, actual)
+        self.assertFalse(report["match"])
+
+    def test_mismatch_counts_and_bounded_samples(self):
+        """Verify per-column counts cover every row but samples are capped."""
+        n = 100_000
+        expected = pd.DataFrame({"id": np.arange(n), "val": np.zeros(n)})
+        actual = expected.copy()
+        actual.loc[::2, "val"] = 1.0
+
+        report = OutputComparator(max_samples=3).compare_frames(expected, actual)
+
+        self.assertFalse(report["match"])
+        self.assertEqual(report["column_mismatches"], {"val": n // 2})
+        self.assertEqual(report["score"], 0.75)
+        self.assertEqual(len(report["samples"]), 3)
+        self.assertEqual(report["samples"][0], {"row": 0, "column": "val", "expected": 0.0, "actual": 1.0})
+
+    def test_structural_differences(self):
+        expected = pd.DataFrame({"id": [1, 2], "bmi": [1.0, 2.0]})
+        actual = pd.DataFrame({"id": [1], "score": [1.0]})
+
+        report = OutputComparator().compare_frames(expected, actual)
+
+        self.assertFalse(report["match"])
+        self.assertEqual(report["missing_columns"], ["bmi"])
+        self.assertEqual(report["extra_columns"], ["score"])
+        self.assertEqual((report["expected_rows"], report["actual_rows"]), (2, 1))
+        self.assertAlmostEqual(report["score"], 1 / 6)  # Only id=1 of a 2 x (2 + 1 extra) grid
+
+    def test_nulls_and_text(self):
+        expected = pd.DataFrame({"name": ["a", None, "c"]})
+        actual = pd.DataFrame({"name": [" a ", None, None]})
+
+        matches = OutputComparator().row_matches(expected, actual)
+
+        self.assertEqual(list(matches), [True, True, False])
+
+    def test_key_columns_align_rows(self):
+        expected = pd.DataFrame({"id": [1, 2, 3], "v": [10, 20, 30]})
+        actual = pd.DataFrame({"id": [3, 1, 2], "v": [30, 10, 20]})
+        self.assertTrue(OutputComparator().compare_frames(expected, actual, key_columns=["id"])["match"])
+
+    def test_compare_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            expected_path = os.path.join(tmp_dir, "gold.csv")
+            with open(expected_path, "w") as f:
+                f.write("id,bmi\n1,22.86\n2,27.78\n")
+
+            report = OutputComparator().compare_files(expected_path, os.path.join(tmp_dir, "nope.csv"))
+            self.assertFalse(report["match"])
+            self.assertIn("not created", report["error"])
+
+            self.assertTrue(OutputComparator().compare_files(expected_path, expected_path)["match"])
+
+            empty_path = os.path.join(tmp_dir, "empty.csv")
+            open(empty_path, "w").close()
+            report = OutputComparator().compare_files(expected_path, empty_path)
+            self.assertFalse(report["match"])
+            self.assertIn("unreadable", report["error"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_compare_files_through_columnar_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            expected_path = os.path.join(tmp_dir, "gold.csv")
+            actual_path = os.path.join(tmp_dir, "candidate.csv")
+            with open(expected_path, "w") as f:
+                f.write("id,bmi,name\n1,22.86,ann\n2,27.78,bob\n")
+            with open(actual_path, "w") as f:
+                f.write("id,bmi,name\n1,22.86,ann\n2,27.0,bob\n")
+
+            cache = ColumnarCache(os.path.join(tmp_dir, "columnar"))
+            for strict in (False, True):
+                comparator = OutputComparator(normalize_dtypes=not strict, columnar_cache=cache)
+                report = comparator.compare_files(expected_path, actual_path)
+                self.assertEqual(report["column_mismatches"], {"bmi": 1})
+                comparator.compare_files(expected_path, actual_path)
+            self.assertEqual((cache.misses, cache.hits), (2, 2))  # Gold parsed once per mode
+        finally:
+            shutil.rmtree(tmp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
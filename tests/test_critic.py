@@ -1,7 +1,40 @@
 import unittest
 import os
+import shutil
+import tempfile
+import threading
 from core.critic import Critic
 
+ALWAYS_SQUARE_CANDIDATE = """
+import csv
+
+def process_data(input_path, output_path):
+    with open(input_path) as f:
+        rows = [int(r['value']) for r in csv.DictReader(f)]
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['original', 'processed'])
+        writer.writeheader()
+        writer.writerows({'original': v, 'processed': v * v} for v in rows)
+"""
+
+ROW_FILTER_SOURCE = """
+import csv
+
+def process_data(input_path, output_path):
+    with open(input_path) as f:
+        rows = [r for r in csv.DictReader(f) if int(r['value']) % 2 == 0]
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['value'])
+        writer.writeheader()
+        writer.writerows(rows)
+"""
+
+HANGING_CANDIDATE = """
+def process_data(input_path, output_path):
+    while True:
+        pass
+"""
+
 class TestCritic(unittest.TestCase):
     def setUp(self):
         # We point both source and candidate to the SAME file for the control test
@@ -18,5 +51,169 @@ class TestCritic(unittest.TestCase):
         self.assertEqual(report["score"], 1.0)
         self.assertEqual(len(report["failures"]), 0)
 
+    def test_batched_perfect_match(self):
+        """Test that multi-row batches score the same as single trials."""
+        critic = Critic(self.source_path, batch_size=16)
+        report = critic.evaluate(self.source_path, num_trials=40)
+
+        self.assertTrue(report["pass"])
+        self.assertEqual(report["score"], 1.0)
+
+    def test_failures_are_shrunk(self):
+        """Test that a diverging candidate is reported with a minimal counterexample."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            candidate_path = os.path.join(tmp_dir, "always_square.py")
+            with open(candidate_path, "w") as f:
+                f.write(ALWAYS_SQUARE_CANDIDATE)
+
+            critic = Critic(self.source_path)
+            inputs = iter([2, 77, "abc", 4])
+            critic.adapter.generate_input = lambda: next(inputs)
+            report = critic.evaluate(candidate_path, num_trials=4)
+
+            # 'abc' raises the same ValueError on both sides, which counts as agreement
+            self.assertEqual(report["score"], 0.75)
+            self.assertEqual(len(report["failures"]), 1)
+            self.assertEqual(report["failures"][0]["input_value"], 77)
+            self.assertEqual(report["failures"][0]["minimal_input"], 3)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_errors_only_match_the_same_exception(self):
+        """Test that a different exception, or a timeout, is not agreement."""
+        comparable = Critic._comparable
+        self.assertEqual(comparable({"error": "ValueError: bad"}, "source"),
+                         comparable({"error": "ValueError: other"}, "candidate"))
+        self.assertNotEqual(comparable({"error": "ValueError: bad"}, "source"),
+                            comparable({"error": "KeyError: 'value'"}, "candidate"))
+        self.assertNotEqual(comparable({"error": "Output file empty"}, "source"),
+                            comparable({"error": "Output file not created"}, "candidate"))
+        # Both sides filtering the row out (or writing nothing) is the same behaviour
+        for no_output in ("Output file not created", "Output file empty"):
+            self.assertEqual(comparable({"error": no_output}, "source"),
+                             comparable({"error": no_output}, "candidate"))
+        for volatile_error in ("Timeout: trial exceeded 1s", "Not evaluated"):
+            self.assertNotEqual(comparable({"error": volatile_error}, "source"),
+                                comparable({"error": volatile_error}, "candidate"))
+
+    def test_identical_row_filter_passes(self):
+        """Test that filtering a row out on both sides (an empty output) is agreement."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            source_path = os.path.join(tmp_dir, "evens.py")
+            with open(source_path, "w") as f:
+                f.write(ROW_FILTER_SOURCE)
+
+            critic = Critic(source_path, max_shrinks=0)
+            inputs = iter([1, 2, 3, 4])
+            critic.adapter.generate_input = lambda: next(inputs)
+            report = critic.evaluate(source_path, num_trials=4)
+
+            self.assertTrue(report["pass"])
+            self.assertEqual(report["score"], 1.0)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_silent_candidate_never_agrees_with_a_rejection(self):
+        """Test that a candidate writing nothing fails inputs the source rejects."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            candidate_path = os.path.join(tmp_dir, "silent.py")
+            with open(candidate_path, "w") as f:
+                f.write("def process_data(input_path, output_path):\n    pass\n")
+
+            critic = Critic(self.source_path, max_shrinks=0)
+            critic.adapter.generate_input = lambda: "abc"
+            report = critic.evaluate(candidate_path, num_trials=3)
+
+            self.assertEqual(report["score"], 0.0)
+            self.assertEqual(report["failures"][0]["actual"], {"error": "Output file not created"})
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_fail_fast_stops_early(self):
+        """Test that a failing candidate does not burn the whole trial budget."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            candidate_path = os.path.join(tmp_dir, "always_square.py")
+            with open(candidate_path, "w") as f:
+                f.write(ALWAYS_SQUARE_CANDIDATE)
+
+            critic = Critic(self.source_path, max_shrinks=0)
+            critic.adapter.generate_input = lambda: 7
+            report = critic.evaluate(candidate_path, num_trials=500, fail_fast=True)
+
+            self.assertFalse(report["pass"])
+            self.assertEqual(report["stopped_early"], "max_failures")
+            self.assertLess(report["trials_run"], 500)
+            self.assertEqual(len(report["failures"]), 1)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_confident_pass_stops_early(self):
+        """Test the zero-failure sequential bound (about 299 trials at 95% / 1%)."""
+        critic = Critic(self.source_path)
+        report = critic.evaluate(self.source_path, num_trials=2000, confidence=0.95, tolerance=0.01)
+
+        self.assertTrue(report["pass"])
+        self.assertEqual(report["stopped_early"], "confident_pass")
+        self.assertGreaterEqual(report["trials_run"], 299)
+        self.assertLess(report["trials_run"], 2000)
+
+    def test_no_early_exit_by_default(self):
+        critic = Critic(self.source_path)
+        report = critic.evaluate(self.source_path, num_trials=30)
+        self.assertEqual(report["trials_run"], 30)
+        self.assertIsNone(report["stopped_early"])
+
+    def test_parallel_perfect_match(self):
+        """Test that the process-pool mode agrees with the serial mode."""
+        critic = Critic(self.source_path, workers=2)
+        report = critic.evaluate(self.source_path, num_trials=8, parallel=True)
+
+        self.assertTrue(report["pass"])
+        self.assertEqual(report["score"], 1.0)
+
+    def test_hanging_candidate_times_out(self):
+        """Test that a spinning candidate is failed instead of stalling the loop."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            candidate_path = os.path.join(tmp_dir, "hanging.py")
+            with open(candidate_path, "w") as f:
+                f.write(HANGING_CANDIDATE)
+
+            critic = Critic(self.source_path, workers=2, trial_timeout=0.2)
+            report = critic.evaluate(candidate_path, num_trials=4, parallel=True)
+
+            self.assertFalse(report["pass"])
+            self.assertEqual(report["score"], 0.0)
+            self.assertIn("Timeout", report["failures"][0]["actual"]["error"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_hanging_candidate_is_shrunk_in_the_pool(self):
+        """Test that shrinking a hang off the main thread stays in the process pool."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            candidate_path = os.path.join(tmp_dir, "hanging.py")
+            with open(candidate_path, "w") as f:
+                f.write(HANGING_CANDIDATE)
+
+            critic = Critic(self.source_path, workers=2, trial_timeout=0.2, max_shrinks=1)
+            critic.adapter.generate_input = lambda: 7
+            reports = []
+            worker = threading.Thread(
+                target=lambda: reports.append(critic.evaluate(candidate_path, num_trials=2, parallel=True)),
+                daemon=True
+            )
+            worker.start()
+            worker.join(timeout=60)
+
+            self.assertFalse(worker.is_alive(), "evaluate() hung while shrinking")
+            self.assertIn("Timeout", reports[0]["failures"][0]["actual"]["error"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from core.columnar_cache import ColumnarCache
+from core.data_profiler import DataProfiler
+from sandbox.input_generator import InputGenerator
+
+class TestDataProfiler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.test_dir, "patients.csv")
+        with open(self.csv_path, "w") as f:
+            f.write("id,age,weight_kg,name\n1,25,70.5,ann\n2,,90.0,bob\n3,45,60.25,cy\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_sniff_summary(self):
+        summary = DataProfiler().sniff(self.csv_path)
+        self.assertIn("### File: patients.csv", summary)
+        self.assertIn("id, age, weight_kg, name", summary)
+        self.assertIn("3 rows x 4 columns", summary)
+        self.assertIn("null %", summary)
+
+    def test_profile_columns(self):
+        """Verify kinds and ranges are inferred per column."""
+        profile = DataProfiler().profile(self.csv_path)
+        columns = profile["columns"]
+
+        self.assertEqual(columns["id"]["kind"], "int")
+        self.assertEqual(columns["age"]["kind"], "int")  # NaN gap must not turn it into float
+        self.assertEqual((columns["age"]["min"], columns["age"]["max"]), (25, 45))
+        self.assertEqual(columns["weight_kg"]["kind"], "float")
+        self.assertEqual(columns["name"]["kind"], "str")
+        self.assertAlmostEqual(columns["age"]["null_rate"], 1 / 3)
+        self.assertEqual(columns["id"]["distinct"], 3)
+        self.assertEqual(columns["id"]["quantiles"]["p50"], 2.0)
+
+    def test_profile_streams_in_chunks(self):
+        """Types, ranges and cardinality hold across chunks whose dtypes differ."""
+        big = os.path.join(self.test_dir, "big.csv")
+        with open(big, "w") as f:
+            f.write("n,code\n")
+            for i in range(5000):
+                f.write(f"{i},{'' if i % 10 == 0 else i % 50}\n")
+            f.write("5000,X1\n")  # A text value in the last chunk only
+
+        profile = DataProfiler(chunksize=700).profile(big)
+        n, code = profile["columns"]["n"], profile["columns"]["code"]
+
+        self.assertEqual(profile["rows"], 5001)
+        self.assertEqual((n["kind"], n["min"], n["max"]), ("int", 0, 5000))
+        self.assertLess(abs(n["distinct"] - 5001) / 5001, 0.05)
+        self.assertEqual(code["kind"], "str")
+        self.assertAlmostEqual(code["null_rate"], 500 / 5001)
+        self.assertLess(abs(code["distinct"] - 46), 3)
+
+    def test_profile_from_columnar_cache(self):
+        cache = ColumnarCache(os.path.join(self.test_dir, "columnar"))
+        profile = DataProfiler(chunksize=2, columnar_cache=cache).profile(self.csv_path)
+        self.assertEqual(profile, DataProfiler(chunksize=2).profile(self.csv_path))
+        self.assertEqual(cache.misses, 1)
+
+    def test_profile_is_cached_by_content_hash(self):
+        cache_dir = os.path.join(self.test_dir, "profiles")
+        first = DataProfiler(cache_dir=cache_dir).profile(self.csv_path)
+
+        with patch.object(DataProfiler, "_profile_stream", side_effect=AssertionError("re-profiled")):
+            self.assertEqual(DataProfiler(cache_dir=cache_dir).profile(self.csv_path), first)
+
+        with open(self.csv_path, "a") as f:
+            f.write("4,50,80.0,dee\n")
+        self.assertEqual(DataProfiler(cache_dir=cache_dir).profile(self.csv_path)["rows"], 4)
+
+    def test_profile_feeds_input_generator(self):
+        generator = InputGenerator.from_profile(DataProfiler().profile(self.csv_path), edge_bias=0.0)
+        row = generator.draw()
+        self.assertEqual(set(row), {"id", "age", "weight_kg", "name"})
+        self.assertIn(row["name"], ["ann", "bob", "cy"])
+
+    def test_boolean_column_feeds_input_generator(self):
+        csv_path = os.path.join(self.test_dir, "flags.csv")
+        with open(csv_path, "w") as f:
+            f.write("id,active\n1,True\n2,False\n3,True\n")
+        generator = InputGenerator.from_profile(DataProfiler().profile(csv_path), edge_bias=1.0, seed=5)
+        generator.weights = {"boundary": 1.0}  # The strategy that uses string methods on samples
+
+        values = {row["active"] for row in generator.batch(50)}
+        self.assertTrue(values <= {"", "True", "False", "TRUE", "FALSE"})
+        self.assertTrue(values & {"TRUE", "FALSE"})  # observed[0].upper()
+
+if __name__ == '__main__':
+    unittest.main()
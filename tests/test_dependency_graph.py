@@ -0,0 +1,45 @@
+import unittest
+from core.dependency_graph import DependencyGraph
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.update_file("load.sps", "GET DATA /TYPE=TXT /FILE='raw/input.csv'.\nSAVE OUTFILE='work/clean.sav'.", "h1")
+        self.graph.update_file("report.sps", "GET FILE='work\\clean.sav'.\nINCLUDE 'lib/macros.sps'.\nSAVE TRANSLATE /OUTFILE='out/report.csv'.", "h2")
+        self.graph.update_file("lib/macros.sps", "DEFINE !m () COMPUTE x = 1 !ENDDEFINE.", "h3")
+        self.graph.update_file("audit.sps", "MATCH FILES /FILE='work/clean.sav' /TABLE='out/report.csv' /BY id.", "h4")
+
+    def test_edges(self):
+        self.assertEqual(self.graph.reads("report.sps"), ["lib/macros.sps", "work/clean.sav"])
+        self.assertEqual(self.graph.dependencies("report.sps"), ["lib/macros.sps", "load.sps"])
+        self.assertEqual(self.graph.dependents("load.sps"), ["audit.sps", "report.sps"])
+
+    def test_topological_order_is_deterministic(self):
+        self.assertEqual(
+            self.graph.topological_order(),
+            ["lib/macros.sps", "load.sps", "report.sps", "audit.sps"]
+        )
+
+    def test_affected_subgraph(self):
+        self.assertEqual(self.graph.affected(["lib/macros.sps"]), ["lib/macros.sps", "report.sps", "audit.sps"])
+        self.assertEqual(self.graph.affected(["raw/input.csv"]), ["load.sps", "report.sps", "audit.sps"])
+        self.assertEqual(self.graph.affected(["unrelated.csv"]), [])
+
+    def test_incremental_update_and_remove(self):
+        # Same hash: nothing is re-parsed
+        self.assertFalse(self.graph.update_file("load.sps", "ignored", "h1"))
+
+        self.graph.update_file("load.sps", "GET DATA /TYPE=TXT /FILE='raw/input.csv'.", "h1b")
+        self.assertEqual(self.graph.dependencies("report.sps"), ["lib/macros.sps"])
+
+        self.graph.remove_file("lib/macros.sps")
+        self.assertEqual(self.graph.dependencies("report.sps"), [])
+        self.assertNotIn("lib/macros.sps", self.graph.scripts)
+
+    def test_cycle_is_reported(self):
+        self.graph.update_file("lib/macros.sps", "GET FILE='out/report.csv'.", "h3b")
+        with self.assertRaises(ValueError):
+            self.graph.topological_order()
+
+if __name__ == '__main__':
+    unittest.main()
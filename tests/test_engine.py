@@ -1,9 +1,10 @@
 # tests/test_engine.py
 import os
 import shutil
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
-from core.engine import EvolutionEngine
+from core.engine import EvolutionEngine, SearchBudget
 
 @pytest.fixture
 def mock_repo(tmp_path):
@@ -29,7 +30,8 @@ def test_engine_initialization_and_gold_standard(
     mock_llm, 
     mock_spec_writer, 
     mock_subprocess, 
-    mock_repo
+    mock_repo,
+    tmp_path
 ):
     """
     Verifies that the engine:
@@ -51,11 +53,12 @@ def test_engine_initialization_and_gold_standard(
     # -------------------------------
 
     # Initialize Engine
-    engine = EvolutionEngine(repo_path=mock_repo)
+    engine = EvolutionEngine(repo_path=mock_repo, cache_dir=str(tmp_path / "cache"))
     
     # Assertions
     assert engine.repo_path == mock_repo
     assert engine.target_output_file == "gold.csv"
+    assert engine.target_output_files == ["gold.csv"]
     
     # Verify Subprocess was called
     mock_subprocess.assert_called_once()
@@ -71,4 +74,174 @@ def test_engine_fails_if_no_sps_file(tmp_path):
     empty_repo.mkdir()
     
     with pytest.raises(ValueError, match="No .sps file found"):
-        EvolutionEngine(str(empty_repo))
\ No newline at end of file
+        EvolutionEngine(str(empty_repo))
+
+GOOD_CODE = """
+import csv
+
+def process_data(input_path, output_path):
+    with open(input_path) as f:
+        rows = list(csv.DictReader(f))
+    with open(output_path, 'w') as f:
+        f.write("id,double\\n")
+        for row in rows:
+            f.write(f"{row['id']},{int(row['x']) * 2}\\n")
+"""
+
+WRONG_CODE = GOOD_CODE.replace("* 2", "* 3")
+SLOW_CODE = "import time\n\ndef process_data(input_path, output_path):\n    time.sleep(60)\n"
+
+@pytest.fixture
+def pipeline_engine(tmp_path):
+    """An engine over a repo whose script doubles 'x'; the LLM agents are replaced per test."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    (repo_dir / "input.csv").write_text("id,x\n1,10\n2,20\n")
+    (repo_dir / "double.sps").write_text(
+        "GET DATA /TYPE=TXT /FILE='input.csv' /VARIABLES=id F3 x F3.\n"
+        "COMPUTE double = x * 2.\n"
+        "SAVE TRANSLATE /OUTFILE='gold.csv' /KEEP=id double.\n"
+    )
+
+    def run_pspp(*args, **kwargs):
+        (repo_dir / "gold.csv").write_text("id,double\n1,20\n2,40\n")
+        return MagicMock(returncode=0)
+
+    with patch("core.engine.subprocess.run", side_effect=run_pspp), \
+         patch("core.engine.LLMClient"), patch("core.engine.SpecWriter"):
+        engine = EvolutionEngine(str(repo_dir), cache_dir=str(tmp_path / "cache"),
+                                 history_dir=str(tmp_path / "history"), candidate_timeout=30)
+    engine.writer = MagicMock()
+    engine.writer.initial_draft.return_value = "spec v1"
+    engine.builder = MagicMock()
+    engine.optimizer = MagicMock()
+    yield engine
+
+def test_pipeline_optimizes_until_a_candidate_passes(pipeline_engine):
+    engine = pipeline_engine
+    engine.builder.build.side_effect = lambda spec, **kwargs: GOOD_CODE if spec == "spec v2" else WRONG_CODE
+    engine.optimizer.evolve.return_value = "spec v2"
+
+    assert engine.start(max_iterations=3, max_in_flight=2)
+
+    assert engine.input_file.endswith("input.csv")
+    assert engine.last_run["iteration"] == 2
+    engine.optimizer.evolve.assert_called_once()  # Only the first failure of spec v1 is optimized
+    spec, report = engine.optimizer.evolve.call_args[0]
+    assert spec == "spec v1"
+    assert {"type": "Value Mismatch", "row": 0, "column": "double", "expected": 20, "actual": 30} in report["failures"]
+    assert open(os.path.join(os.path.dirname(engine.last_run["candidate_path"]), "spec.md")).read() == "spec v2"
+
+def test_pipeline_hands_an_empty_output_to_the_optimizer(pipeline_engine):
+    engine = pipeline_engine
+    empty_output = "def process_data(input_path, output_path):\n    open(output_path, 'w').close()\n"
+    engine.builder.build.side_effect = lambda spec, **kwargs: GOOD_CODE if spec == "spec v2" else empty_output
+    engine.optimizer.evolve.return_value = "spec v2"
+
+    assert engine.start(max_iterations=2, max_in_flight=1)
+
+    report = engine.optimizer.evolve.call_args[0][1]
+    assert report["failures"][0]["type"] == "Output Error"
+    assert "unreadable" in report["failures"][0]["details"]
+
+def test_pipeline_gives_up_after_max_iterations(pipeline_engine):
+    engine = pipeline_engine
+    engine.builder.build.return_value = "def process_data(input_path, output_path):\n    raise ValueError('boom')\n"
+    engine.optimizer.evolve.side_effect = lambda spec, report: spec + "+"
+
+    assert not engine.start(max_iterations=2, max_in_flight=1)
+    assert engine.last_run["iterations"] == 2
+    assert engine.optimizer.evolve.call_count == 1
+    assert "boom" in engine.optimizer.evolve.call_args[0][1]["failures"][0]["details"]
+
+def record_candidate_runs(engine):
+    """
+    Wraps engine._run_candidate. Returns the list its results are appended to,
+    and a semaphore released once per finished run.
+    """
+    results = []
+    finished = threading.Semaphore(0)
+    run_candidate = engine._run_candidate
+
+    def recording(*args):
+        error = run_candidate(*args)
+        results.append(error)
+        finished.release()
+        return error
+    engine._run_candidate = recording
+    return results, finished
+
+def test_pipeline_stops_running_candidates_once_one_passes(pipeline_engine):
+    engine = pipeline_engine
+    engine.builder.build.side_effect = lambda spec, variant=0, **kwargs: GOOD_CODE if variant == 1 else SLOW_CODE
+    runs, _ = record_candidate_runs(engine)
+
+    assert engine.start(max_iterations=1, max_in_flight=3)
+    assert engine.last_run["variant"] == 1
+    engine.optimizer.evolve.assert_not_called()
+    # The sleeping candidates were cancelled, not waited for until their timeout
+    assert runs.count(None) == 1
+    assert all(error.startswith("Cancelled") for error in runs if error is not None)
+
+def test_search_selects_and_evolves_the_population(pipeline_engine):
+    engine = pipeline_engine
+    engine.optimizer.evolve.side_effect = lambda spec, report, variant=0, **kwargs: f"{spec}>{variant}"
+    engine.builder.build.side_effect = lambda spec, **kwargs: GOOD_CODE if spec == "spec v1>1" else WRONG_CODE
+
+    assert engine.search(population=2, max_generations=5)
+
+    assert engine.last_run["stopped"] == "passed"
+    assert engine.last_run["best"]["generation"] == 1
+    assert engine.last_run["best"]["spec"] == "spec v1>1"
+    # Generation 0: 2 builds of the seed; generation 1: 2 rewrites, each with its own variant
+    assert [c.kwargs["variant"] for c in engine.optimizer.evolve.call_args_list] == [0, 1]
+    assert engine.optimizer.evolve.call_args_list[0].args[1]["score"] == 0.5
+    assert engine.last_run["llm_calls"] == 1 + 2 + 4
+
+def test_search_respects_the_llm_call_budget(pipeline_engine):
+    engine = pipeline_engine
+    engine.builder.build.return_value = WRONG_CODE
+    engine.optimizer.evolve.side_effect = lambda spec, report, variant=0, **kwargs: f"{spec}>{variant}"
+
+    assert not engine.search(population=2, budget=SearchBudget(llm_calls=6))
+
+    # Seed (1) + generation 0 (2) + one child (2); a second child would need 7 calls
+    assert engine.last_run["stopped"] == "llm_calls"
+    assert (engine.last_run["llm_calls"], engine.last_run["trials"]) == (5, 3)
+    assert engine.last_run["best"]["score"] == 0.5
+
+def test_search_stops_running_members_when_time_runs_out(pipeline_engine):
+    engine = pipeline_engine
+    engine.builder.build.return_value = SLOW_CODE
+    engine.candidate_timeout = 600
+    runs, finished = record_candidate_runs(engine)
+
+    assert not engine.search(population=2, budget=SearchBudget(seconds=1))
+    assert engine.last_run["stopped"] == "seconds"
+    # search() does not wait for its members; both are cancelled rather than run to completion
+    for _ in range(2):
+        assert finished.acquire(timeout=30)
+    assert all(error.startswith("Cancelled") for error in runs)
+
+@patch("core.engine.subprocess.run")
+@patch("core.engine.LLMClient")
+def test_engine_migrates_a_chosen_entry_point(mock_llm, mock_subprocess, mock_repo, tmp_path):
+    os.makedirs(os.path.join(mock_repo, "jobs"))
+    with open(os.path.join(mock_repo, "jobs", "second.sps"), "w") as f:
+        f.write("SAVE TRANSLATE /OUTFILE='second.csv'.")
+
+    def run_pspp(*args, **kwargs):
+        with open(os.path.join(mock_repo, "second.csv"), "w") as f:
+            f.write("id\n1\n")
+        return MagicMock(returncode=0)
+    mock_subprocess.side_effect = run_pspp
+
+    cache_dir = str(tmp_path / "cache")
+    engine = EvolutionEngine(repo_path=mock_repo, cache_dir=cache_dir, entry_point="jobs/second.sps")
+
+    assert engine.entry_point == os.path.join(mock_repo, "jobs", "second.sps")
+    assert engine.target_output_files == ["second.csv"]
+    assert mock_subprocess.call_args.kwargs["cwd"] == mock_repo  # Paths resolve against the repo root
+
+    with pytest.raises(FileNotFoundError, match="Entry point not found"):
+        EvolutionEngine(repo_path=mock_repo, cache_dir=cache_dir, entry_point="missing.sps")
@@ -0,0 +1,34 @@
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from utils.file_hash import FileHashCache, file_sha256
+
+class TestFileHash(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "data.csv")
+        with open(self.path, "wb") as f:
+            f.write(b"id,x\n" * 300_000)  # Spans several blocks
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_streamed_hash_matches_whole_file_hash(self):
+        with open(self.path, "rb") as f:
+            self.assertEqual(file_sha256(self.path), hashlib.sha256(f.read()).hexdigest())
+
+    def test_cache_rehashes_only_changed_files(self):
+        hasher = FileHashCache()
+        first = hasher.hash(self.path)
+        with patch("utils.file_hash.file_sha256", side_effect=AssertionError("re-hashed")):
+            self.assertEqual(hasher.hash(self.path), first)
+
+        with open(self.path, "ab") as f:
+            f.write(b"1,2\n")
+        self.assertNotEqual(hasher.hash(self.path), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,5 +46,184 @@ class TestIngestor(unittest.TestCase):
         expected = os.path.join("src", "main.py")
         self.assertEqual(files[0].path, expected)
 
+    def test_scan_changes_reports_delta(self):
+        """Verify only added/modified files are re-read and deletions are noticed."""
+        manifest_path = os.path.join(self.test_dir, "manifest.json")
+        ingestor = Ingestor(self.test_dir, allowed_extensions=['.py'], manifest_path=manifest_path)
+        ingestor.scan()
+
+        # Modify one file (different size), add one, delete none yet
+        with open(os.path.join(self.test_dir, "src", "main.py"), "w") as f:
+            f.write("print('Hello, world')")
+        with open(os.path.join(self.test_dir, "new.py"), "w") as f:
+            f.write("x = 1")
+
+        # A fresh Ingestor proves the manifest was persisted
+        ingestor = Ingestor(self.test_dir, allowed_extensions=['.py'], manifest_path=manifest_path)
+        delta = ingestor.scan_changes()
+        self.assertEqual(delta.added, ["new.py"])
+        self.assertEqual(delta.modified, [os.path.join("src", "main.py")])
+        self.assertEqual(delta.deleted, [])
+        self.assertEqual(delta.files["new.py"].content, "x = 1")
+
+        os.remove(os.path.join(self.test_dir, "new.py"))
+        delta = ingestor.scan_changes()
+        self.assertEqual(delta.deleted, ["new.py"])
+
+    def test_scan_changes_skips_untouched_files(self):
+        """Verify unchanged size+mtime means the file is never opened."""
+        ingestor = Ingestor(self.test_dir, allowed_extensions=['.py'])
+        ingestor.scan()
+
+        from unittest.mock import patch
+        from core.ingestor import SourceFile
+        with patch.object(SourceFile, "mapped", side_effect=AssertionError("file was re-read")):
+            delta = ingestor.scan_changes()
+
+        self.assertFalse(delta.has_changes)
+        self.assertEqual(delta.unchanged, [os.path.join("src", "main.py")])
+
+    def test_touched_but_identical_is_unchanged(self):
+        ingestor = Ingestor(self.test_dir, allowed_extensions=['.py'])
+        ingestor.scan()
+        path = os.path.join(self.test_dir, "src", "main.py")
+        with open(path, "w") as f:
+            f.write("print('v2')")
+        self.assertTrue(ingestor.scan_changes().modified)  # Hash is now on record
+
+        os.utime(path, ns=(1, 1))
+
+        delta = ingestor.scan_changes()
+        self.assertFalse(delta.has_changes)
+
+    def test_unreadable_file_is_not_reported_deleted(self):
+        """Verify a file that cannot be hashed keeps its manifest entry and is reported as skipped."""
+        ingestor = Ingestor(self.test_dir, allowed_extensions=['.py'])
+        ingestor.scan()
+        rel_path = os.path.join("src", "main.py")
+        known = ingestor.manifest[rel_path]
+        with open(os.path.join(self.test_dir, rel_path), "w") as f:
+            f.write("print('changed')")
+
+        from unittest.mock import patch
+        from core.ingestor import SourceFile
+        with patch.object(SourceFile, "mapped", side_effect=PermissionError("denied")):
+            delta = ingestor.scan_changes()
+
+        self.assertEqual((delta.deleted, delta.modified), ([], []))
+        self.assertEqual(ingestor.manifest[rel_path], known)
+        self.assertEqual([(s.path, s.reason) for s in ingestor.skipped], [(rel_path, "unreadable")])
+
+        # Readable again: the change is picked up against the kept entry
+        self.assertEqual(ingestor.scan_changes().modified, [rel_path])
+
+    def test_content_is_lazy(self):
+        """Verify scan only indexes metadata and content is read on demand."""
+        from unittest.mock import patch
+        from core.ingestor import SourceFile
+        with patch.object(SourceFile, "mapped", side_effect=AssertionError("read during scan")):
+            files = Ingestor(self.test_dir, allowed_extensions=['.py']).scan()
+
+        self.assertEqual(files[0].size, len("print('Hello')"))
+        # Edits on disk are visible because nothing was cached
+        with open(os.path.join(self.test_dir, "src", "main.py"), "w") as f:
+            f.write("print('Bye')")
+        self.assertEqual(files[0].content, "print('Bye')")
+
+    def test_head_and_preview(self):
+        path = os.path.join(self.test_dir, "big.csv")
+        with open(path, "w") as f:
+            f.write("id,val\n" + "".join(f"{i},{i * i}\n" for i in range(100_000)))
+        with open(os.path.join(self.test_dir, "empty.csv"), "w"):
+            pass
+
+        files = {f.name: f for f in Ingestor(self.test_dir, allowed_extensions=['.csv']).scan()}
+        big = files["big.csv"]
+
+        self.assertEqual(big.head(9), "id,val\n0,")
+        self.assertEqual(big.preview(3), "id,val\n0,0\n1,1")
+        self.assertEqual(files["empty.csv"].content, "")
+        self.assertEqual(files["empty.csv"].preview(), "")
+
+    def test_from_text(self):
+        from core.ingestor import SourceFile
+        source = SourceFile.from_text("gen/out.py", "x = 1\ny = 2")
+        self.assertEqual((source.name, source.extension), ("out.py", ".py"))
+        self.assertEqual(source.preview(1), "x = 1")
+        self.assertEqual(len(source.content_hash), 64)
+
+    def test_parallel_scan_is_sorted_and_complete(self):
+        """Many small dirs and files: the pooled crawl finds all of them, in path order."""
+        for d in range(12):
+            sub = os.path.join(self.test_dir, "pkg", f"d{d:02d}")
+            os.makedirs(sub)
+            for i in range(10):
+                with open(os.path.join(sub, f"m{i}.py"), "w") as f:
+                    f.write(f"x = {i}")
+
+        ingestor = Ingestor(self.test_dir, workers=4)
+        ingestor.STAT_BATCH = 3  # Force several stat batches per directory
+        paths = [f.path for f in ingestor.scan()]
+
+        self.assertEqual(len(paths), 121)
+        self.assertEqual(paths, sorted(paths))
+        self.assertEqual(ingestor.last_stats.files, 121)
+        self.assertEqual(ingestor.last_stats.directories, 15)
+        self.assertGreater(ingestor.last_stats.bytes_indexed, 0)
+        self.assertGreaterEqual(ingestor.last_stats.files_per_second, 0)
+
+    def test_iter_scan_ordered_matches_scan(self):
+        """Ordered streaming gives exactly scan()'s order, including 'a.py' vs 'a/'."""
+        for rel in ["a/x.py", "a.py", "a-b.py", "a0.py", "b/c/d.md", "b/c.py", "B.md"]:
+            full = os.path.join(self.test_dir, rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "w") as f:
+                f.write(rel)
+
+        ingestor = Ingestor(self.test_dir, workers=2)
+        ingestor.PENDING_PER_WORKER = 1
+        streamed = [f.path for f in ingestor.iter_scan(ordered=True)]
+
+        self.assertEqual(streamed, [f.path for f in Ingestor(self.test_dir).scan()])
+        self.assertEqual(ingestor.last_stats.files, len(streamed))
+        self.assertEqual(set(ingestor.manifest), set(streamed))
+
+    def test_iter_scan_streams_before_crawl_ends(self):
+        """The first file is available without exhausting the generator."""
+        stream = Ingestor(self.test_dir).iter_scan()
+        first = next(stream)
+        self.assertEqual(first.path, os.path.join("src", "main.py"))
+        stream.close()
+
+    def test_binary_and_oversized_files_are_skipped(self):
+        with open(os.path.join(self.test_dir, "export.csv"), "wb") as f:
+            f.write(b"PK\x03\x04\x00\x00binary")
+        with open(os.path.join(self.test_dir, "huge.py"), "w") as f:
+            f.write("x = 1\n" * 100)
+
+        ingestor = Ingestor(self.test_dir, max_bytes={'.py': 100})
+        paths = [f.path for f in ingestor.scan()]
+
+        self.assertEqual(paths, [os.path.join("src", "main.py")])
+        reasons = {skip.path: skip.reason for skip in ingestor.skipped}
+        self.assertEqual(reasons, {"export.csv": "binary", "huge.py": "too_large"})
+
+    def test_encoding_is_detected(self):
+        from core.ingestor import sniff_encoding
+        with open(os.path.join(self.test_dir, "legacy.md"), "wb") as f:
+            f.write("caf\u00e9 na\u00efve\r\n".encode("cp1252"))
+        with open(os.path.join(self.test_dir, "wide.md"), "wb") as f:
+            f.write("héllo\n".encode("utf-16"))
+
+        files = {f.path: f for f in Ingestor(self.test_dir).scan()}
+
+        self.assertEqual(files["legacy.md"].encoding, "cp1252")
+        self.assertEqual(files["legacy.md"].content, "café naïve\n")
+        self.assertEqual(files["wide.md"].encoding, "utf-16")
+        self.assertEqual(files["wide.md"].content, "héllo\n")
+        self.assertEqual(files[os.path.join("src", "main.py")].encoding, "utf-8")
+        # A multi-byte character cut off by the prefix is still UTF-8
+        self.assertEqual(sniff_encoding("abc\u00e9".encode("utf-8")[:-1]), "utf-8")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
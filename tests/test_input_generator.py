@@ -0,0 +1,61 @@
+import unittest
+import math
+from sandbox.input_generator import InputGenerator
+
+class TestInputGenerator(unittest.TestCase):
+    def test_default_schema_yields_scalars_with_edge_cases(self):
+        """Verify the default generator mixes in boundaries, text, empties and NaN."""
+        generator = InputGenerator(seed=7)
+        draws = generator.batch(500)
+
+        self.assertTrue(any(isinstance(d, int) and 1 <= d <= 100 for d in draws))
+        self.assertIn("", draws)
+        self.assertTrue(any(isinstance(d, str) and d.strip() and not d.strip().lstrip("-").isdigit() for d in draws))
+        self.assertTrue(any(isinstance(d, float) and math.isnan(d) for d in draws))
+        self.assertTrue(any(d in (0, -1, 101) for d in draws if isinstance(d, int)))
+
+    def test_from_profile_builds_row_dicts(self):
+        """Verify the schema is learned from profiled columns and bounds."""
+        profile = {"columns": {
+            "age": {"kind": "int", "min": 18, "max": 65},
+            "name": {"kind": "str", "sample_values": ["ann", "bob"]}
+        }}
+        generator = InputGenerator.from_profile(profile, edge_bias=0.0, seed=1)
+
+        for row in generator.batch(50):
+            self.assertEqual(set(row), {"age", "name"})
+            self.assertTrue(18 <= row["age"] <= 65)
+            self.assertIn(row["name"], ["ann", "bob"])
+
+    def test_parity_draws_come_in_even_odd_pairs(self):
+        """Verify consecutive parity draws differ only in parity."""
+        generator = InputGenerator(seed=11, edge_bias=1.0)
+        generator.weights = {"parity": 1.0}
+        draws = generator.batch(20)
+
+        for even, odd in zip(draws[::2], draws[1::2]):
+            self.assertEqual(even % 2, 0)
+            self.assertEqual(odd, even + 1)
+
+    def test_observe_rewards_new_behaviour(self):
+        generator = InputGenerator(seed=3, edge_bias=1.0)
+        test_input = generator.draw()
+        strategy_weights = dict(generator.weights)
+
+        self.assertTrue(generator.observe(test_input, {"error": "invalid literal"}))
+        self.assertFalse(generator.observe(test_input, {"error": "invalid literal"}))
+        self.assertEqual(generator.behaviours_seen, 1)
+        self.assertNotEqual(generator.weights, strategy_weights)
+
+    def test_shrink_int_to_minimal_counterexample(self):
+        """Verify a failing odd number shrinks to the smallest odd failure."""
+        fails = lambda x: isinstance(x, int) and x % 2 == 1 and x > 1
+        self.assertEqual(InputGenerator().shrink(77, fails), 3)
+
+    def test_shrink_string_and_row(self):
+        fails = lambda row: "x" in row["name"]
+        minimal = InputGenerator().shrink({"name": "abxyz", "age": 40}, fails)
+        self.assertEqual(minimal, {"name": "x", "age": 0})
+
+if __name__ == '__main__':
+    unittest.main()
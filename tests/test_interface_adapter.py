@@ -0,0 +1,43 @@
+import unittest
+import csv
+from sandbox.interface_adapter import SandboxAdapter
+from sandbox.source_logic import process_data as source_logic
+
+def summarize(input_path, output_path):
+    """Not row-wise: collapses every input row into one output row."""
+    with open(input_path) as f:
+        total = sum(int(row['value']) for row in csv.DictReader(f))
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['total'])
+        writer.writeheader()
+        writer.writerow({'total': total})
+
+class TestSandboxAdapter(unittest.TestCase):
+    def test_batch_matches_single_trials(self):
+        """Verify one multi-row call gives the same per-trial rows as N calls."""
+        adapter = SandboxAdapter()
+        inputs = [1, 2, 3, 10]
+
+        batched = adapter.run_batch(source_logic, inputs)
+        single = [adapter.run_trial(source_logic, v) for v in inputs]
+
+        self.assertEqual(batched, single)
+        self.assertEqual(batched[1], {'original': '2', 'processed': '4'})
+
+    def test_batch_falls_back_when_rows_do_not_line_up(self):
+        """Verify non row-wise logic is re-run per trial instead of mis-attributed."""
+        adapter = SandboxAdapter()
+        results = adapter.run_batch(summarize, [1, 2, 3])
+        self.assertEqual(results, [{'total': '1'}, {'total': '2'}, {'total': '3'}])
+
+    def test_batch_isolates_failures(self):
+        """Verify one bad input does not fail the whole batch."""
+        adapter = SandboxAdapter()
+        results = adapter.run_batch(source_logic, [2, "oops", 3])
+
+        self.assertEqual(results[0]['processed'], '4')
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]['processed'], '3')
+
+if __name__ == '__main__':
+    unittest.main()
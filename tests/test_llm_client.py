@@ -1,11 +1,12 @@
+import json
 import unittest
 import requests
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from utils.llm_client import LLMClient
 
 class TestLLMClient(unittest.TestCase):
     
-    @patch("utils.llm_client.requests.post")
+    @patch("utils.llm_client.requests.Session.post")
     def test_ollama_call_success(self, mock_post):
         """Test that client formats request correctly for Ollama."""
         # 1. Setup Mock Response
@@ -28,7 +29,7 @@ class TestLLMClient(unittest.TestCase):
         call_kwargs = mock_post.call_args[1]
         self.assertEqual(call_kwargs['json']['model'], "test-model")
 
-    @patch("utils.llm_client.requests.post")
+    @patch("utils.llm_client.requests.Session.post")
     def test_ollama_connection_error(self, mock_post):
         """Test graceful handling of connection failures."""
         # FIX: Raise a RequestException, not a generic Exception
@@ -40,5 +41,88 @@ class TestLLMClient(unittest.TestCase):
         # Now the client should catch it and return the error string
         self.assertIn("# ERROR:", result)
 
+    @patch("utils.llm_client.requests.Session.post")
+    def test_session_is_reused(self, mock_post):
+        """Test that consecutive calls share one pooled session."""
+        mock_post.return_value.json.return_value = {"response": "ok"}
+
+        client = LLMClient()
+        session = client.session
+        client.complete("Sys", "One")
+        client.complete("Sys", "Two")
+
+        self.assertIs(client.session, session)
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_complete_many_thread_backend(self, mock_post):
+        """Test that batch results come back in input order."""
+        def echo(url, json=None, timeout=None):
+            response = MagicMock()
+            response.json.return_value = {"response": json["prompt"].split("\n\n")[1]}
+            return response
+        mock_post.side_effect = echo
+
+        client = LLMClient(max_concurrency=3)
+        batch = [("Sys", f"task-{i}") for i in range(6)]
+        results = client.complete_many(batch)
+
+        self.assertEqual(results, [f"task-{i}" for i in range(6)])
+
+    @patch("utils.llm_client.httpx.AsyncClient.post", new_callable=AsyncMock)
+    def test_complete_many_asyncio_backend(self, mock_post):
+        """Test the httpx backend and dict-style requests."""
+        response = MagicMock()
+        response.json.return_value = {"response": "```python\nx = 1\n```"}
+        mock_post.return_value = response
+
+        client = LLMClient()
+        batch = [{"system_prompt": "Sys", "user_prompt": "A"},
+                 {"system_prompt": "Sys", "user_prompt": "B", "temperature": 0.5}]
+        results = client.complete_many(batch, backend="asyncio", max_concurrency=2)
+
+        self.assertEqual(results, ["x = 1", "x = 1"])
+        self.assertEqual(mock_post.call_count, 2)
+        sent_temps = [c.kwargs["json"]["options"]["temperature"] for c in mock_post.call_args_list]
+        self.assertCountEqual(sent_temps, [0.0, 0.5])
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_stream_yields_tokens(self, mock_post):
+        """Test that streaming mode yields tokens as NDJSON events arrive."""
+        response = mock_post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [
+            b'{"response": "x = ", "done": false}',
+            b'{"response": "1", "done": false}',
+            b'{"response": "", "done": true}'
+        ]
+
+        tokens = list(LLMClient().stream("Sys", "User"))
+
+        self.assertEqual(tokens, ["x = ", "1"])
+        self.assertTrue(mock_post.call_args[1]['json']['stream'])
+        self.assertTrue(mock_post.call_args[1]['stream'])
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_validator_aborts_generation(self, mock_post):
+        """Test that a failing validator stops reading and closes the connection."""
+        consumed = []
+        def events():
+            for token in ["def f(:\n", "    pass\n", "more\n"]:
+                consumed.append(token)
+                yield json.dumps({"response": token, "done": False}).encode()
+        response = mock_post.return_value.__enter__.return_value
+        response.iter_lines.side_effect = lambda: events()
+
+        from utils.stream_validators import PythonSyntaxValidator
+        result = LLMClient().complete("Sys", "User", validator=PythonSyntaxValidator())
+
+        self.assertIn("# ERROR: Generation aborted", result)
+        self.assertEqual(len(consumed), 1)
+        mock_post.return_value.__exit__.assert_called_once()
+
+    def test_complete_many_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            LLMClient().complete_many([("Sys", "User")], backend="carrier-pigeon")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import unittest
+import os
+import shutil
+import tempfile
+from core.critic import Critic
+from core.oracle import GroundTruthOracle
+
+class TestGroundTruthOracle(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.source_path = os.path.join(self.test_dir, "legacy.py")
+        shutil.copy(os.path.abspath("sandbox/source_logic.py"), self.source_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_persists_across_instances(self):
+        """Verify outputs survive into a new run while the source is unchanged."""
+        GroundTruthOracle(self.source_path, self.cache_dir).store(4, {"processed": "16"})
+
+        oracle = GroundTruthOracle(self.source_path, self.cache_dir)
+        self.assertEqual(oracle.lookup(4), {"processed": "16"})
+        self.assertIsNone(oracle.lookup(5))
+        self.assertEqual(oracle.stats(), {"hits": 1, "misses": 1})
+
+    def test_source_change_invalidates(self):
+        """Verify editing the legacy code discards its remembered outputs."""
+        GroundTruthOracle(self.source_path, self.cache_dir).store(4, {"processed": "16"})
+        with open(self.source_path, "a") as f:
+            f.write("\n# edited\n")
+
+        oracle = GroundTruthOracle(self.source_path, self.cache_dir)
+        self.assertIsNone(oracle.lookup(4))
+
+    def test_timeouts_are_not_memoized(self):
+        oracle = GroundTruthOracle(self.source_path)
+        oracle.store(7, {"error": "Timeout: trial exceeded 1s"})
+        self.assertIsNone(oracle.lookup(7))
+
+    def test_critic_skips_known_ground_truth(self):
+        """Verify a second evaluation only executes the candidate."""
+        critic = Critic(self.source_path, cache_dir=self.cache_dir)
+        first = critic.evaluate(self.source_path, num_trials=20)
+
+        calls = []
+        original = critic.source_module.process_data
+        critic.source_module.process_data = lambda i, o: calls.append(i) or original(i, o)
+        critic.adapter.generate_input = lambda: 42
+
+        second = critic.evaluate(self.source_path, num_trials=10)
+        third = critic.evaluate(self.source_path, num_trials=10)
+
+        self.assertEqual(first["score"], 1.0)
+        self.assertEqual(second["score"], 1.0)
+        self.assertEqual(third["score"], 1.0)
+        # 42 may already be known from the first run; either way it runs at most once
+        self.assertLessEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
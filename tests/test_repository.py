@@ -50,5 +50,67 @@ class TestRepository(unittest.TestCase):
         with self.assertRaises(ValueError):
             repo.save_spec("ghost.py", "# Ghost Spec")
 
+    def test_reload_is_incremental(self):
+        """Verify a second load picks up edits and deletions without a full rescan."""
+        repo = Repository(self.test_dir)
+        repo.load()
+        repo.save_spec("utils/helper.py", "# Spec")
+
+        with open(self.file_path, "w") as f:
+            f.write("def help(): return 42")
+        with open(os.path.join(self.test_dir, "extra.py"), "w") as f:
+            f.write("pass")
+
+        delta = repo.load()
+        self.assertEqual(delta.modified, ["utils/helper.py"])
+        self.assertEqual(delta.added, ["extra.py"])
+        self.assertEqual(repo.get_file("utils/helper.py").content, "def help(): return 42")
+
+        os.remove(self.file_path)
+        repo.refresh()
+        self.assertNotIn("utils/helper.py", repo.list_files())
+        self.assertIsNone(repo.get_spec("utils/helper.py"))
+
+    def test_store_resumes_specs_across_restarts(self):
+        """Specs survive a restart while the source is unchanged, and expire when it changes."""
+        from unittest.mock import patch
+        store_path = os.path.join(self.test_dir, ".state", "repo.sqlite")
+
+        repo = Repository(self.test_dir, store_path=store_path)
+        repo.load()
+        repo.save_spec("utils/helper.py", "# Spec")
+        repo.close()
+
+        restarted = Repository(self.test_dir, store_path=store_path)
+        with patch("core.ingestor.hashlib.sha256", side_effect=AssertionError("re-hashed")):
+            restarted.load()
+            self.assertEqual(restarted.get_spec("utils/helper.py"), "# Spec")
+        self.assertEqual(restarted.store.list_specs(), ["utils/helper.py"])
+        restarted.close()
+
+        with open(self.file_path, "w") as f:
+            f.write("def help(): return 1")
+        edited = Repository(self.test_dir, store_path=store_path)
+        edited.load()
+        self.assertIsNone(edited.get_spec("utils/helper.py"))
+        edited.close()
+
+    def test_dependency_graph_follows_reloads(self):
+        with open(os.path.join(self.test_dir, "a.sps"), "w") as f:
+            f.write("GET DATA /TYPE=TXT /FILE='in.csv'.\nSAVE OUTFILE='mid.sav'.\n")
+        with open(os.path.join(self.test_dir, "b.sps"), "w") as f:
+            f.write("GET FILE='mid.sav'.\n")
+
+        repo = Repository(self.test_dir)
+        repo.load()
+        self.assertEqual(repo.graph.topological_order(), ["a.sps", "b.sps"])
+        self.assertEqual(repo.search("mid.sav", kind="file"), ["a.sps", "b.sps"])
+
+        os.remove(os.path.join(self.test_dir, "a.sps"))
+        repo.refresh()
+        self.assertEqual(repo.graph.scripts, ["b.sps"])
+        self.assertEqual(repo.graph.dependencies("b.sps"), [])
+        self.assertEqual(repo.search("mid.sav", kind="file"), ["b.sps"])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
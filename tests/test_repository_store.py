@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from core.repository_store import RepositoryStore
+
+class TestRepositoryStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "repo.sqlite")
+        self.store = RepositoryStore(self.db_path)
+        self.store.sync_files({
+            "jobs/a.sps": {"size": 10, "mtime_ns": 1, "sha256": "h1"},
+            "jobs/b.sps": {"size": 20, "mtime_ns": 1, "sha256": None},
+            "lib/c.sps": {"size": 30, "mtime_ns": 1, "sha256": "h3"},
+        })
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_wal_mode_and_prefix_listing(self):
+        mode = self.store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        self.assertEqual(self.store.list_files("jobs/"), ["jobs/a.sps", "jobs/b.sps"])
+        self.assertEqual(len(self.store.list_files()), 3)
+        self.assertEqual(self.store.get_file("lib/c.sps")["sha256"], "h3")
+
+    def test_specs_are_keyed_by_source_hash(self):
+        self.store.save_spec("jobs/a.sps", "h1", "# v1")
+        self.assertEqual(self.store.get_spec("jobs/a.sps", "h1"), "# v1")
+        self.assertIsNone(self.store.get_spec("jobs/a.sps", "h2"))
+
+        self.store.save_spec("jobs/a.sps", "h2", "# v2")
+        self.assertIsNone(self.store.get_spec("jobs/a.sps", "h1"))  # Superseded
+        self.assertEqual(self.store.list_specs(), [])                # Recorded hash is still h1
+
+        self.store.record_hash("jobs/a.sps", "h2")
+        self.assertEqual(self.store.list_specs("jobs/"), ["jobs/a.sps"])
+
+    def test_sync_keeps_hash_for_same_stat_and_drops_deleted(self):
+        self.store.save_spec("lib/c.sps", "h3", "# c")
+        self.store.sync_files({
+            "jobs/a.sps": {"size": 10, "mtime_ns": 1, "sha256": None},  # Same stat: keep h1
+            "jobs/b.sps": {"size": 21, "mtime_ns": 2, "sha256": None},
+        })
+        self.assertEqual(self.store.get_file("jobs/a.sps")["sha256"], "h1")
+        self.assertIsNone(self.store.get_file("lib/c.sps"))
+        self.assertIsNone(self.store.get_spec("lib/c.sps", "h3"))
+
+    def test_concurrent_readers(self):
+        results = []
+        def read():
+            results.append(self.store.list_files("jobs/"))
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [["jobs/a.sps", "jobs/b.sps"]] * 8)
+
+    def test_in_memory_store(self):
+        store = RepositoryStore()
+        store.sync_files({"x.sps": {"size": 1, "mtime_ns": 1, "sha256": "h"}})
+        store.save_spec("x.sps", "h", "# x")
+        self.assertEqual(store.list_specs(), ["x.sps"])
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock
+from utils.llm_client import LLMClient
+from utils.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_hit_and_miss_counters(self):
+        """Verify lookups are counted and stored responses come back intact."""
+        cache = ResponseCache(self.cache_dir)
+        key = ResponseCache.make_key(model="m", user_prompt="p")
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "answer")
+        self.assertEqual(cache.get(key), "answer")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_lru_eviction(self):
+        """Verify the least recently used entry is dropped when over budget."""
+        cache = ResponseCache(self.cache_dir, max_bytes=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        cache.get("a")          # 'a' is now more recent than 'b'
+        cache.put("c", "cccc")  # 12 bytes > 10, so 'b' must go
+
+        self.assertEqual(cache.get("a"), "aaaa")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "cccc")
+
+    def test_persists_across_instances(self):
+        """Verify a new process (new instance) sees previous entries."""
+        ResponseCache(self.cache_dir).put("k", "v")
+        self.assertEqual(ResponseCache(self.cache_dir).get("k"), "v")
+
+    def test_readonly_never_writes(self):
+        cache = ResponseCache(self.cache_dir, mode="readonly")
+        cache.put("k", "v")
+        self.assertIsNone(cache.get("k"))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            ResponseCache(self.cache_dir, mode="sometimes")
+
+class TestLLMClientCaching(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_second_call_served_from_cache(self, mock_post):
+        """Verify an identical request only reaches Ollama once."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"response": "print('cached')"}
+        mock_post.return_value = mock_response
+
+        client = LLMClient(model="test-model", cache=ResponseCache(self.cache_dir))
+        first = client.complete("System", "User")
+        second = client.complete("System", "User")
+
+        self.assertEqual(first, second)
+        mock_post.assert_called_once()
+
+        # A different temperature is a different request
+        client.complete("System", "User", temperature=0.7)
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_replay_mode_never_calls_llm(self, mock_post):
+        """Verify CI replay mode reports misses instead of hitting the network."""
+        client = LLMClient(cache=ResponseCache(self.cache_dir, mode="replay"))
+        result = client.complete("Sys", "User")
+
+        self.assertIn("# ERROR:", result)
+        mock_post.assert_not_called()
+
+    @patch("utils.llm_client.requests.Session.post")
+    def test_errors_are_not_cached(self, mock_post):
+        import requests
+        mock_post.side_effect = requests.exceptions.RequestException("Connection Refused")
+
+        cache = ResponseCache(self.cache_dir)
+        client = LLMClient(cache=cache)
+        client.complete("Sys", "User")
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
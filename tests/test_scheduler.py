@@ -0,0 +1,127 @@
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import ANY
+from core.scheduler import MigrationScheduler
+
+class FakeEngine:
+    """Stands in for EvolutionEngine: records when each script ran."""
+
+    def __init__(self, log, script, outcome):
+        self.log = log
+        self.script = script
+        self.outcome = outcome
+        self.last_run = {"candidate_path": f"{script}.py"}
+
+    def start(self, **kwargs):
+        self.log.append(("start", self.script))
+        time.sleep(0.05)
+        self.log.append(("end", self.script))
+        return self.outcome
+
+class TestMigrationScheduler(unittest.TestCase):
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        # a -> b -> c is a chain of data dependencies; d stands alone
+        self._write("a.sps", "GET FILE='raw.sav'.\nSAVE OUTFILE='a.sav'.\n")
+        self._write("b.sps", "GET FILE='a.sav'.\nSAVE OUTFILE='b.sav'.\n")
+        self._write("jobs/c.sps", "GET FILE='b.sav'.\nSAVE OUTFILE='c.sav'.\n")
+        self._write("d.sps", "GET FILE='raw.sav'.\nSAVE OUTFILE='d.sav'.\n")
+        self.state_path = os.path.join(self.repo, "batch_state.json")
+        self.log = []
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.repo)
+
+    def _write(self, name, code):
+        path = os.path.join(self.repo, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(code)
+
+    def _factory(self, failing=(), flaky=(), outcome=True):
+        """Engines that raise for 'failing' scripts, and on the first attempt for 'flaky' ones."""
+        def make(repo_path, script, history_dir):
+            with self.lock:
+                self.calls[script] = self.calls.get(script, 0) + 1
+                attempt = self.calls[script]
+            if script in failing or (script in flaky and attempt == 1):
+                raise RuntimeError("Gold Standard PSPP failed")
+            return FakeEngine(self.log, script, outcome)
+        return make
+
+    def _scheduler(self, **kwargs):
+        return MigrationScheduler(self.repo, workers=4, state_path=self.state_path, **kwargs)
+
+    def test_dependencies_finish_before_dependents_start(self):
+        summary = self._scheduler(engine_factory=self._factory()).run()
+
+        self.assertEqual((summary.scripts, summary.passed, summary.attempts), (4, 4, 4))
+        position = {event: i for i, event in enumerate(self.log)}
+        self.assertLess(position[("end", "a.sps")], position[("start", "b.sps")])
+        self.assertLess(position[("end", "b.sps")], position[("start", "jobs/c.sps")])
+        # The head of the chain and the independent script overlap
+        self.assertLess(position[("start", "d.sps")], position[("end", "a.sps")])
+
+    def test_retries_and_blocked_dependents(self):
+        scheduler = self._scheduler(retries=1, engine_factory=self._factory(failing={"a.sps"}, flaky={"d.sps"}))
+        summary = scheduler.run()
+
+        self.assertEqual((summary.passed, summary.errors, summary.blocked), (1, 1, 2))
+        self.assertEqual(scheduler.state["a.sps"]["attempts"], 2)
+        self.assertIn("PSPP failed", scheduler.state["a.sps"]["error"])
+        self.assertEqual(scheduler.state["d.sps"]["attempts"], 2)
+        self.assertEqual(scheduler.state["d.sps"]["status"], "passed")
+        self.assertEqual(scheduler.state["jobs/c.sps"]["status"], "blocked")
+        self.assertNotIn("b.sps", self.calls)
+
+    def test_resume_skips_finished_unchanged_scripts(self):
+        self._scheduler(engine_factory=self._factory(outcome=False)).run()
+
+        self.calls.clear()
+        summary = self._scheduler(engine_factory=self._factory()).run()
+        self.assertEqual((summary.resumed, summary.attempts), (4, 0))
+        self.assertEqual(self.calls, {})
+
+        # Changing b re-runs it and everything downstream of it
+        self._write("b.sps", "GET FILE='a.sav'.\nCOMPUTE x = 1.\nSAVE OUTFILE='b.sav'.\n")
+        summary = self._scheduler(engine_factory=self._factory()).run()
+        self.assertEqual(set(self.calls), {"b.sps", "jobs/c.sps"})
+        self.assertEqual((summary.resumed, summary.passed), (2, 2))
+
+    def test_resume_reruns_scripts_whose_input_data_changed(self):
+        self._write("raw.sav", "v1")
+        self._scheduler(engine_factory=self._factory()).run()
+        self.assertEqual(self._scheduler().state["a.sps"]["inputs"], {"raw.sav": ANY})
+
+        # raw.sav feeds a (and so b and c) and d; a.sav is generated, so only raw data is tracked
+        self.calls.clear()
+        self._write("raw.sav", "v2")
+        summary = self._scheduler(engine_factory=self._factory()).run()
+        self.assertEqual(set(self.calls), {"a.sps", "b.sps", "jobs/c.sps", "d.sps"})
+        self.assertEqual(summary.resumed, 0)
+
+        self.calls.clear()
+        summary = self._scheduler(engine_factory=self._factory()).run()
+        self.assertEqual((summary.resumed, self.calls), (4, {}))
+
+    def test_dependency_cycle_is_blocked(self):
+        self._write("x.sps", "GET FILE='y.sav'.\nSAVE OUTFILE='x.sav'.\n")
+        self._write("y.sps", "GET FILE='x.sav'.\nSAVE OUTFILE='y.sav'.\n")
+        scheduler = self._scheduler(engine_factory=self._factory())
+        summary = scheduler.run()
+
+        self.assertEqual((summary.passed, summary.blocked), (4, 2))
+        self.assertEqual(scheduler.state["x.sps"]["error"], "Dependency cycle.")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            MigrationScheduler(self.repo, mode="anneal")
+
+if __name__ == '__main__':
+    unittest.main()
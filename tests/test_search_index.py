@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+from core.search_index import SearchIndex
+
+LOAD = """* Load and derive income bands.
+GET DATA /TYPE=TXT /FILE='raw/people.csv'.
+COMPUTE income_band = TRUNC(income / 1000).
+IF (age > 65) retired = 1.
+RECODE region (1=2) INTO region_grp.
+SAVE OUTFILE='work/people.sav'.
+"""
+
+REPORT = """GET FILE='work/people.sav'.
+FREQUENCIES VARIABLES=income_band region_grp.
+"""
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update_file("load.sps", LOAD, ".sps")
+        self.index.update_file("report.sps", REPORT, ".sps")
+        self.index.update_file("raw/people.csv", "id,income,age,region", ".csv")
+        self.index.update_file("README.md", "Income bands are derived in load.sps", ".md")
+
+    def test_kinds(self):
+        self.assertEqual(self.index.search("income_band", "compute"), ["load.sps"])
+        self.assertEqual(self.index.search("RETIRED", "compute"), ["load.sps"])
+        self.assertEqual(self.index.search("region_grp", "compute"), ["load.sps"])
+        self.assertEqual(self.index.search("income_band", "variable"), ["load.sps", "report.sps"])
+        self.assertEqual(self.index.search("income", "variable"), ["load.sps", "raw/people.csv"])
+        self.assertEqual(self.index.search("work\\people.sav", "file"), ["load.sps", "report.sps"])
+        self.assertEqual(self.index.search("bands", "word"), ["README.md", "load.sps"])
+
+    def test_keywords_strings_and_comments_are_not_variables(self):
+        self.assertEqual(self.index.search("compute", "variable"), [])
+        self.assertEqual(self.index.search("derive", "variable"), [])   # Comment only
+        self.assertEqual(self.index.search("raw", "variable"), [])      # Inside a string
+
+    def test_incremental_update(self):
+        self.index.update_file("report.sps", "DESCRIPTIVES VARIABLES=age.", ".sps")
+        self.assertEqual(self.index.search("income_band", "variable"), ["load.sps"])
+        self.index.remove_file("load.sps")
+        self.assertEqual(self.index.search("income_band"), [])
+
+    def test_related(self):
+        self.assertEqual(self.index.related("report.sps", limit=1), ["load.sps"])
+
+    def test_lookup_only_reads_postings(self):
+        for i in range(2000):
+            self.index.update_file(f"gen/s{i}.sps", f"COMPUTE v{i} = income * {i}.", ".sps")
+        # A lookup never walks the per-file terms, so its cost does not grow with the repository
+        with patch.object(self.index, "_terms", None):
+            self.assertEqual(self.index.search("v1999", "variable"), ["gen/s1999.sps"])
+            self.assertEqual(len(self.index.search("income", "variable")), 2002)  # Plus the setUp scripts
+
+if __name__ == '__main__':
+    unittest.main()
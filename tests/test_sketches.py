@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from core.sketches import HyperLogLog, ReservoirSample
+
+class TestSketches(unittest.TestCase):
+    def test_hyperloglog_estimates_within_error(self):
+        sketch = HyperLogLog()
+        for chunk in np.array_split(np.arange(200_000), 7):
+            sketch.add_many(chunk)
+            sketch.add_many(chunk[:100])  # Duplicates do not count
+        self.assertLess(abs(sketch.estimate() - 200_000) / 200_000, 0.05)
+
+        small = HyperLogLog()
+        small.add_many(np.array(["a", "b", "c", "a"], dtype=object))
+        self.assertEqual(small.estimate(), 3)
+
+    def test_hyperloglog_merge(self):
+        left, right = HyperLogLog(), HyperLogLog()
+        left.add_many(np.arange(0, 6000))
+        right.add_many(np.arange(4000, 10_000))
+        left.merge(right)
+        self.assertLess(abs(left.estimate() - 10_000) / 10_000, 0.05)
+
+    def test_reservoir_quantiles(self):
+        reservoir = ReservoirSample(size=2000)
+        for chunk in np.array_split(np.arange(100_000, dtype=float), 13):
+            reservoir.add_many(chunk)
+        self.assertEqual(reservoir.seen, 100_000)
+        self.assertEqual(len(reservoir.values), 2000)
+        quantiles = reservoir.quantiles((0.5, 0.99))
+        self.assertLess(abs(quantiles["p50"] - 50_000), 5_000)
+        self.assertGreater(quantiles["p99"], 90_000)
+
+if __name__ == '__main__':
+    unittest.main()
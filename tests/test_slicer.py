@@ -0,0 +1,54 @@
+import unittest
+from core.slicer import ProgramSlicer
+from tests.test_spss_ast import SCRIPT
+
+class TestProgramSlicer(unittest.TestCase):
+    def setUp(self):
+        self.slicer = ProgramSlicer()
+
+    def names(self, program_slice):
+        return [c.name for c in program_slice.commands]
+
+    def test_slice_for_output_file(self):
+        result = self.slicer.slice(SCRIPT, "results.csv")
+        self.assertEqual(self.names(result), ["GET DATA", "COMPUTE", "SELECT IF", "SAVE"])
+        self.assertNotIn("band", result.text)
+        self.assertGreater(result.reduction, 0.5)
+
+    def test_conditional_definitions_keep_their_blocks(self):
+        result = self.slicer.slice(SCRIPT, "agg.sav")
+        self.assertEqual(self.names(result),
+                         ["GET DATA", "COMPUTE", "DO IF", "COMPUTE", "ELSE IF", "COMPUTE", "END IF", "AGGREGATE"])
+        self.assertNotIn("SELECT IF", result.text)  # Runs after the AGGREGATE
+
+    def test_slice_for_variable(self):
+        result = self.slicer.slice(SCRIPT, "BMI")
+        self.assertIn("COMPUTE bmi", result.text)
+        self.assertNotIn("RECODE", result.text)
+
+    def test_unconditional_redefinition_kills_earlier_one(self):
+        code = "COMPUTE x = a.\nCOMPUTE x = b.\nSAVE OUTFILE='o.sav' /KEEP=x.\n"
+        self.assertEqual(self.slicer.slice(code, "o.sav").text, "COMPUTE x = b.\nSAVE OUTFILE='o.sav' /KEEP=x.\n")
+
+    def test_common_variable_names_keep_their_definitions(self):
+        code = ("DATA LIST FREE / id value.\nCOMPUTE total = 5.\nCOMPUTE sum = total * 2.\n"
+                "COMPUTE n = value + sum.\nCOMPUTE unused = 1.\nSAVE OUTFILE='out.sav' /KEEP=id,n.\n")
+        result = self.slicer.slice(code, "out.sav")
+        self.assertEqual(self.names(result), ["DATA LIST", "COMPUTE", "COMPUTE", "COMPUTE", "SAVE"])
+        self.assertIn("COMPUTE total = 5.", result.text)
+        self.assertIn("COMPUTE sum = total * 2.", result.text)
+        self.assertNotIn("unused", result.text)
+
+    def test_comparisons_and_subscripts_keep_their_assignments(self):
+        code = ("DATA LIST FREE / age x.\nCOMPUTE flag = age = 65.\nCOMPUTE v(2) = x.\n"
+                "COMPUTE unused = 1.\nSAVE OUTFILE='o.sav' /KEEP=flag,v.\n")
+        result = self.slicer.slice(code, "o.sav")
+        self.assertIn("COMPUTE flag = age = 65.", result.text)
+        self.assertIn("COMPUTE v(2) = x.", result.text)
+        self.assertNotIn("unused", result.text)
+
+    def test_slices_by_output(self):
+        self.assertEqual(list(self.slicer.slices_by_output(SCRIPT)), ["agg.sav", "results.csv", "all.csv"])
+
+if __name__ == '__main__':
+    unittest.main()
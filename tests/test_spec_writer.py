@@ -48,4 +48,33 @@ def test_dependency_injection():
     writer = SpecWriter(llm_client=mock_client)
     result = writer.generate_spec("ctx", [])
     
-    assert result == "Injected"
\ No newline at end of file
+    assert result == "Injected"
+
+
+SCRIPT = """GET DATA /TYPE=TXT /FILE='in.csv' /VARIABLES=id F3 age F3 income F8.
+COMPUTE band = TRUNC(income / 1000).
+FREQUENCIES VARIABLES=band.
+COMPUTE senior = age > 65.
+SAVE OUTFILE='seniors.sav' /KEEP=id,senior.
+SAVE OUTFILE='bands.sav' /KEEP=id,band.
+"""
+
+def test_sliced_draft_sends_only_the_slice():
+    mock_client = MagicMock()
+    mock_client.complete.return_value = "# Seniors"
+
+    writer = SpecWriter(llm_client=mock_client)
+    assert writer.sliced_draft(SCRIPT, "seniors.sav") == "# Seniors"
+
+    prompt = mock_client.complete.call_args.kwargs["user_prompt"]
+    assert "COMPUTE senior = age > 65." in prompt
+    assert "TRUNC" not in prompt
+    assert "FREQUENCIES" not in prompt
+    assert "bands.sav" not in prompt
+
+def test_sliced_drafts_one_per_output():
+    mock_client = MagicMock()
+    mock_client.complete_many.return_value = ["# A", "# B"]
+
+    writer = SpecWriter(llm_client=mock_client)
+    assert writer.sliced_drafts(SCRIPT) == {"seniors.sav": "# A", "bands.sav": "# B"}
@@ -0,0 +1,84 @@
+import unittest
+from core.spss_ast import ALL, SpssParser
+from core.structure_parser import CodeStructureParser
+
+SCRIPT = """
+GET DATA /TYPE=TXT /FILE='patients.csv' /FIRSTCASE=2 /VARIABLES=id F3 age F3 weight_kg F3 height_m F4.2.
+COMPUTE bmi = weight_kg / (height_m * height_m).
+DO IF (age > 40).
+  COMPUTE band = 2.
+ELSE IF (age > 20).
+  COMPUTE band = 1.
+END IF.
+RECODE band (1=2) INTO band2.
+AGGREGATE OUTFILE='agg.sav' /BREAK=band /mean_bmi = MEAN(bmi).
+SELECT IF (age > 18).
+SAVE OUTFILE='results.csv' /KEEP=id,bmi.
+SAVE TRANSLATE /OUTFILE='all.csv' /TYPE=CSV.
+EXECUTE.
+"""
+
+class TestSpssParser(unittest.TestCase):
+    def setUp(self):
+        self.program = SpssParser().parse(SCRIPT)
+        self.nodes = {c.index: c for c in self.program.commands}
+
+    def test_variable_flow(self):
+        get, compute = self.nodes[0], self.nodes[1]
+        self.assertEqual(get.writes, {ALL, "id", "age", "weight_kg", "height_m"})
+        self.assertEqual(get.input_files, ["patients.csv"])
+        self.assertEqual((compute.reads, compute.writes), ({"weight_kg", "height_m"}, {"bmi"}))
+
+        recode = self.nodes[7]
+        self.assertEqual((recode.reads, recode.writes), ({"band"}, {"band2"}))
+        aggregate = self.nodes[8]
+        self.assertEqual((aggregate.reads, aggregate.writes), ({"band", "bmi"}, {"mean_bmi"}))
+        self.assertTrue(self.nodes[9].affects_cases)
+        self.assertEqual(self.nodes[10].reads, {"id", "bmi"})
+        self.assertEqual(self.nodes[11].reads, {ALL})
+
+    def test_conditional_nesting(self):
+        self.assertEqual(self.nodes[3].parent, 2)   # Inside DO IF
+        self.assertEqual(self.nodes[4].parent, 2)   # ELSE IF hangs off DO IF
+        self.assertEqual(self.nodes[5].parent, 4)   # Inside ELSE IF
+        self.assertIsNone(self.nodes[6].parent)
+        self.assertEqual([c.index for c in self.program.writers_of("BAND")], [3, 5])
+
+    def test_all_output_files(self):
+        self.assertEqual(self.program.output_files, ["agg.sav", "results.csv", "all.csv"])
+        self.assertEqual(CodeStructureParser.extract_output_filenames(SCRIPT), ["agg.sav", "results.csv", "all.csv"])
+
+    def test_common_words_are_variables_outside_keyword_positions(self):
+        program = SpssParser().parse("""
+GET DATA /TYPE=TXT /FILE='in.csv' /VARIABLES=id F3 value F3 type A5 n2 F3.
+COMPUTE base = value * 2.
+COMPUTE total = SUM(value, n) + e1.
+IF (type = 'x') flag = 1.
+DATA LIST FREE / a name.
+SORT CASES BY name (A).
+""")
+        get, base, total, flag, data_list, sort = program.commands
+        self.assertEqual(get.writes, {ALL, "id", "value", "type", "n2"})
+        self.assertEqual(base.reads, {"value"})
+        self.assertEqual(total.reads, {"value", "n", "e1"})
+        self.assertEqual(flag.reads, {"type"})
+        self.assertEqual(data_list.writes, {ALL, "a", "name"})
+        self.assertEqual(sort.reads, {"name"})
+
+    def test_compute_assigns_at_the_first_equals_sign(self):
+        program = SpssParser().parse(
+            "COMPUTE flag = age = 65.\nCOMPUTE v(#i) = x * 2.\nIF (age = 1) band = age = 2.\n"
+        )
+        chained, subscripted, conditional = program.commands
+        self.assertEqual((chained.writes, chained.reads), ({"flag"}, {"age"}))
+        self.assertEqual((subscripted.writes, subscripted.reads), ({"v"}, {"#i", "x"}))
+        self.assertEqual((conditional.writes, conditional.reads), ({"band"}, {"age"}))
+
+    def test_parse_is_cached_by_hash(self):
+        parser = SpssParser()
+        self.assertIs(parser.parse(SCRIPT), self.program)
+        first = parser.parse("COMPUTE x = 1.", content_hash="abc")
+        self.assertIs(parser.parse("ignored", content_hash="abc"), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from core.spss_lexer import SpssLexer
+from tests.spss_scripts import BASIC_DATA_GENERATOR
+
+class TestSpssLexer(unittest.TestCase):
+    def lex(self, code):
+        return list(SpssLexer().commands(code))
+
+    def test_multi_line_commands_end_at_terminator(self):
+        commands = self.lex("COMPUTE total = a +\n    b.\nFREQUENCIES VARIABLES=total.\n")
+        self.assertEqual([(c.name, c.kind, c.line, c.end_line) for c in commands],
+                         [("COMPUTE", "TRANSFORM", 1, 2), ("FREQUENCIES", "ANALYSIS", 3, 3)])
+        self.assertEqual([t.value for t in commands[0].tokens], ["COMPUTE", "total", "=", "a", "+", "b"])
+
+    def test_periods_in_strings_numbers_and_names_do_not_terminate(self):
+        commands = self.lex("COMPUTE x.y = 1.5 * z.\nSTRING s (A8).\nCOMPUTE s = 'end. '.\n")
+        self.assertEqual(len(commands), 3)
+        self.assertEqual([t.value for t in commands[0].tokens], ["COMPUTE", "x.y", "=", "1.5", "*", "z"])
+
+    def test_blank_line_and_inline_comment(self):
+        commands = self.lex("GET FILE='a.sav'\n\nSAVE OUTFILE='b.sav'. /* done.\nEXECUTE.\n")
+        self.assertEqual([c.name for c in commands], ["GET", "SAVE", "EXECUTE"])
+
+    def test_comments_and_data_blocks(self):
+        commands = self.lex(BASIC_DATA_GENERATOR)
+        self.assertEqual([c.kind for c in commands], ["COMMENT", "INPUT", "DATA", "COMMENT", "OUTPUT"])
+        data = commands[2]
+        self.assertEqual(data.data, "1 50\n2 75\n3 99\n")
+        self.assertEqual((data.line, data.end_line), (4, 8))
+        self.assertEqual(commands[4].name, "SAVE TRANSLATE")
+        self.assertEqual(commands[4].line, 11)
+
+    def test_comment_spans_lines_until_terminator(self):
+        commands = self.lex("* a comment that\n  keeps going.\nCOMPUTE x = 1.\n")
+        self.assertEqual([(c.kind, c.line) for c in commands], [("COMMENT", 1), ("TRANSFORM", 3)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from utils.stream_validators import PythonSyntaxValidator, MaxLengthValidator, combine
+
+class TestStreamValidators(unittest.TestCase):
+    def test_incomplete_python_is_allowed(self):
+        """Verify half-written but plausible code does not trigger an abort."""
+        validator = PythonSyntaxValidator()
+        self.assertIsNone(validator("```python\nimport csv\n"))
+        self.assertIsNone(validator("```python\nimport csv\ndef process_data(a, b):\n"))
+        self.assertIsNone(validator("```python\nimport csv\ndef process_data(a, b):\n    rows = [\n"))
+
+    def test_prose_is_rejected(self):
+        """Verify chatty preambles are caught on the first complete line."""
+        validator = PythonSyntaxValidator()
+        self.assertIsNone(validator("Here is the code"))  # Line not finished yet
+        self.assertIn("not valid Python", validator("Here is the code you asked for:\n"))
+
+    def test_validator_can_be_reused_for_another_stream(self):
+        """Verify a second completion is checked from its first line."""
+        validator = PythonSyntaxValidator()
+        self.assertIsNone(validator("import csv\nimport os\nimport sys\n"))
+        self.assertIn("not valid Python", validator("Sure! Here you go:\n"))
+
+    def test_max_length(self):
+        validator = MaxLengthValidator(5)
+        self.assertIsNone(validator("abc"))
+        self.assertIsNotNone(validator("abcdef"))
+
+    def test_combine_returns_first_reason(self):
+        check = combine(MaxLengthValidator(100), MaxLengthValidator(2))
+        self.assertEqual(check("abc"), "output exceeded 2 characters")
+
+if __name__ == '__main__':
+    unittest.main()
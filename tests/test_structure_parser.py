@@ -0,0 +1,53 @@
+import unittest
+from core.structure_parser import CodeStructureParser
+
+class TestCodeStructureParser(unittest.TestCase):
+    def test_extract_file_references(self):
+        code = (
+            "GET DATA /TYPE=TXT /FILE='in.csv'.\n"
+            "MATCH FILES /FILE=* /TABLE=\"lookup.sav\" /BY id.\n"
+            "INSERT FILE='lib/x.sps'.\n"
+            "* SAVE OUTFILE='commented.sav'.\n"
+            "AGGREGATE OUTFILE=* /BREAK=id /n=N.\n"
+            "SAVE TRANSLATE /OUTFILE='out.csv' /TYPE=CSV.\n"
+        )
+        refs = CodeStructureParser.extract_file_references(code)
+        self.assertEqual(refs, {"reads": ["in.csv", "lookup.sav"], "writes": ["out.csv"], "includes": ["lib/x.sps"]})
+
+    def test_parse_spss_blocks_multi_line_commands(self):
+        code = (
+            "GET DATA /TYPE=TXT\n"
+            "  /FILE='in.csv'.\n"
+            "* Derive.\n"
+            "COMPUTE y = x *\n"
+            "  2.\n"
+            "EXECUTE.\n"
+            "SAVE OUTFILE='out.sav'.\n"
+        )
+        blocks = CodeStructureParser.parse_spss(code)
+        self.assertEqual([b["type"] for b in blocks], ["INPUT", "TRANSFORM", "OUTPUT"])
+        self.assertEqual(blocks[1]["content"], ["COMPUTE y = x *", "2.", "EXECUTE."])
+
+    def test_parses_100k_lines(self):
+        # Timing lives in bench_structure_parser.py; this only checks the result at scale
+        chunk = (
+            "* Block comment.\n"
+            "GET DATA /TYPE=TXT /FILE='in.csv'.\n"
+            "COMPUTE total = a + b *\n"
+            "   1.5.\n"
+            "IF (total > 10) flag = 1.\n"
+            "FREQUENCIES VARIABLES=total flag.\n"
+            "BEGIN DATA\n"
+            "1 2\n"
+            "END DATA.\n"
+            "SAVE OUTFILE='out.sav'.\n"
+        )
+        code = chunk * 10_000  # 100k lines
+
+        commands = CodeStructureParser.commands(code)
+
+        self.assertEqual(len(commands), 70_000)
+        self.assertEqual(commands[-1].end_line, 100_000)
+
+if __name__ == '__main__':
+    unittest.main()
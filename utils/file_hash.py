@@ -0,0 +1,33 @@
+# utils/file_hash.py
+import hashlib
+import os
+import threading
+
+BLOCK_SIZE = 1024 * 1024
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, streamed in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FileHashCache:
+    """SHA-256 of files, remembered per (path, size, mtime) so each version is hashed once."""
+
+    def __init__(self):
+        self._hashes = {}  # (path, size, mtime_ns) -> content hash
+        self._lock = threading.Lock()
+
+    def hash(self, path: str) -> str:
+        stat = os.stat(path)
+        stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            known = self._hashes.get(stat_key)
+        if known:
+            return known
+        content_hash = file_sha256(path)
+        with self._lock:
+            self._hashes[stat_key] = content_hash
+        return content_hash
@@ -1,6 +1,12 @@
 # core/llm_client.py
+import asyncio
+import json
 import requests
+import httpx
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from utils.response_cache import ResponseCache
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -10,14 +16,29 @@ class LLMClient:
                  provider="ollama", 
                  model="qwen2.5-coder:latest", 
                  endpoint="http://localhost:11434/api/generate",
-                 temperature=0.0): # Centralized Default
+                 temperature=0.0, # Centralized Default
+                 num_predict=4000, # Increased window for full file generation
+                 cache: ResponseCache = None,
+                 max_concurrency=4, # Match OLLAMA_NUM_PARALLEL on the server
+                 timeout=120):
         
         self.provider = provider
         self.model = model
         self.endpoint = endpoint
         self.temperature = temperature
+        self.num_predict = num_predict
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
 
-    def complete(self, system_prompt, user_prompt, temperature=None):
+        # One pooled keep-alive session for every call (sized for complete_many)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def complete(self, system_prompt, user_prompt, temperature=None, validator=None):
         """
         Sends a request to the LLM.
         
@@ -25,44 +46,222 @@ class LLMClient:
             system_prompt: The instruction set.
             user_prompt: The specific task content.
             temperature: (Optional) Override the default temperature.
+            validator: (Optional) Callable run on the partial output while streaming.
+                       Returning a reason string cancels the generation early.
         """
+        if validator is not None:
+            return self._complete_validated(system_prompt, user_prompt, temperature, validator)
+
         # Use instance default if no specific override is provided
         temp_setting = temperature if temperature is not None else self.temperature
-        
-        # Combine prompts for simple API endpoints
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+
+        cache_key, cached = self._check_cache(system_prompt, user_prompt, temp_setting)
+        if cached is not None:
+            return cached
         
         logger.info(f"Sending request to Ollama (Model: {self.model}, Temp: {temp_setting})...")
 
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "model": self.model,
-            "prompt": full_prompt,
-            "stream": False,
-            "options": {
-                "temperature": temp_setting,
-                "num_predict": 4000  # Increased window for full file generation
-            }
-        }
-
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.endpoint,
-                headers=headers,
-                json=payload,
-                timeout=120
+                json=self._build_payload(system_prompt, user_prompt, temp_setting),
+                timeout=self.timeout
             )
             response.raise_for_status()
+            return self._finish(response.json(), cache_key)
 
-            response_data = response.json()
-            raw_text = response_data.get("response", "").strip()
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Ollama Connection Error: {e}"
+            logger.error(error_msg)
+            return f"# ERROR: {error_msg}"
 
-            return self._clean_markdown(raw_text)
+    def stream(self, system_prompt, user_prompt, temperature=None):
+        """
+        Yields the response incrementally as Ollama decodes it.
 
+        Closing the generator early closes the HTTP connection, which stops the
+        generation server-side. Only fully streamed responses are cached.
+        """
+        try:
+            yield from self._stream_tokens(system_prompt, user_prompt, temperature)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Ollama Connection Error: {e}"
+            logger.error(error_msg)
+            yield f"# ERROR: {error_msg}"
+
+    def _stream_tokens(self, system_prompt, user_prompt, temperature):
+        temp_setting = temperature if temperature is not None else self.temperature
+
+        cache_key, cached = self._check_cache(system_prompt, user_prompt, temp_setting)
+        if cached is not None:
+            yield cached
+            return
+
+        logger.info(f"Streaming request to Ollama (Model: {self.model}, Temp: {temp_setting})...")
+
+        payload = self._build_payload(system_prompt, user_prompt, temp_setting)
+        payload["stream"] = True
+        chunks = []
+
+        with self.session.post(self.endpoint, json=payload, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                token = event.get("response", "")
+                if token:
+                    chunks.append(token)
+                    yield token
+                if event.get("done"):
+                    break
+
+        self._finish({"response": "".join(chunks)}, cache_key)
+
+    def _complete_validated(self, system_prompt, user_prompt, temperature, validator):
+        """Streams a completion, cancelling as soon as the validator objects."""
+        tokens = self._stream_tokens(system_prompt, user_prompt, temperature)
+        text = ""
+        try:
+            for token in tokens:
+                text += token
+                reason = validator(text)
+                if reason:
+                    error_msg = f"Generation aborted after {len(text)} chars: {reason}"
+                    logger.warning(error_msg)
+                    return f"# ERROR: {error_msg}"
         except requests.exceptions.RequestException as e:
             error_msg = f"Ollama Connection Error: {e}"
             logger.error(error_msg)
             return f"# ERROR: {error_msg}"
+        finally:
+            # Closing the generator drops the connection, which cancels decoding
+            tokens.close()
+        return self._clean_markdown(text.strip())
+
+    def complete_many(self, batch, backend="thread", max_concurrency=None):
+        """
+        Runs several completions concurrently and returns results in input order.
+        
+        Args:
+            batch: Iterable of requests, each a dict with 'system_prompt', 'user_prompt'
+                   and optional 'temperature', or a (system_prompt, user_prompt[, temperature]) tuple.
+            backend: "thread" (pooled requests session) or "asyncio" (httpx).
+            max_concurrency: (Optional) Override the client's in-flight request limit.
+        """
+        requests_list = [self._normalize_request(item) for item in batch]
+        limit = max_concurrency or self.max_concurrency
+
+        if backend == "thread":
+            with ThreadPoolExecutor(max_workers=limit) as pool:
+                return list(pool.map(lambda req: self.complete(**req), requests_list))
+        if backend == "asyncio":
+            return asyncio.run(self.acomplete_many(requests_list, max_concurrency=limit))
+        raise ValueError(f"Unknown backend '{backend}'. Expected 'thread' or 'asyncio'.")
+
+    async def acomplete_many(self, batch, max_concurrency=None):
+        """Asyncio variant of complete_many, for callers already inside an event loop."""
+        requests_list = [self._normalize_request(item) for item in batch]
+        limit = max_concurrency or self.max_concurrency
+        semaphore = asyncio.Semaphore(limit)
+        limits = httpx.Limits(max_connections=limit, max_keepalive_connections=limit)
+
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            async def run_one(req):
+                async with semaphore:
+                    return await self._acomplete(client, **req)
+            return await asyncio.gather(*(run_one(req) for req in requests_list))
+
+    async def _acomplete(self, client, system_prompt, user_prompt, temperature=None):
+        temp_setting = temperature if temperature is not None else self.temperature
+
+        cache_key, cached = self._check_cache(system_prompt, user_prompt, temp_setting)
+        if cached is not None:
+            return cached
+
+        logger.info(f"Sending async request to Ollama (Model: {self.model}, Temp: {temp_setting})...")
+
+        try:
+            response = await client.post(
+                self.endpoint,
+                json=self._build_payload(system_prompt, user_prompt, temp_setting)
+            )
+            response.raise_for_status()
+            return self._finish(response.json(), cache_key)
+
+        except httpx.HTTPError as e:
+            error_msg = f"Ollama Connection Error: {e}"
+            logger.error(error_msg)
+            return f"# ERROR: {error_msg}"
+
+    def close(self):
+        """Releases pooled connections."""
+        self.session.close()
+
+    def _normalize_request(self, item):
+        if isinstance(item, dict):
+            return {
+                "system_prompt": item["system_prompt"],
+                "user_prompt": item["user_prompt"],
+                "temperature": item.get("temperature")
+            }
+        system_prompt, user_prompt, *rest = item
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "temperature": rest[0] if rest else None
+        }
+
+    def _build_payload(self, system_prompt, user_prompt, temperature):
+        # Combine prompts for simple API endpoints
+        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        return {
+            "model": self.model,
+            "prompt": full_prompt,
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+                "num_predict": self.num_predict
+            }
+        }
+
+    def _check_cache(self, system_prompt, user_prompt, temperature):
+        """
+        Returns (cache_key, response). 'response' is set on a hit, or holds an
+        error string when a replay-mode cache has no recording.
+        """
+        if self.cache is None:
+            return None, None
+
+        cache_key = self._cache_key(system_prompt, user_prompt, temperature)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for request (Model: {self.model}, Temp: {temperature}).")
+            return cache_key, cached
+        if self.cache.mode == "replay":
+            error_msg = f"Replay Cache Miss: no recorded response for key {cache_key[:12]}"
+            logger.error(error_msg)
+            return cache_key, f"# ERROR: {error_msg}"
+        return cache_key, None
+
+    def _finish(self, response_data, cache_key):
+        """Cleans the raw response and records it. Only successes are cached."""
+        raw_text = response_data.get("response", "").strip()
+        result = self._clean_markdown(raw_text)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _cache_key(self, system_prompt, user_prompt, temperature):
+        """Content address covering every field that changes the model's answer."""
+        return ResponseCache.make_key(
+            model=self.model,
+            endpoint=self.endpoint,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            num_predict=self.num_predict
+        )
     
     def _clean_markdown(self, text):
         """Removes markdown code fences (```) if present."""
@@ -75,4 +274,4 @@ class LLMClient:
             if lines and lines[-1].strip().startswith("```"):
                 lines = lines[:-1]
             return "\n".join(lines).strip()
-        return text
\ No newline at end of file
+        return text
@@ -0,0 +1,136 @@
+# utils/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Content-addressed, on-disk store for LLM completions.
+
+    Entries are keyed on a SHA-256 of everything that determines the answer
+    (model, endpoint, prompts, temperature, num_predict) and evicted in
+    least-recently-used order once the store grows past `max_bytes`.
+
+    Modes:
+        "readwrite": Normal operation. Misses go to the LLM and are stored.
+        "readonly":  Hits are served, misses go to the LLM but are never stored.
+        "replay":    Hits are served, misses are reported as errors (CI mode).
+    """
+
+    MODES = ("readwrite", "readonly", "replay")
+
+    def __init__(self, cache_dir: str = ".llm_cache", max_bytes: int = 256 * 1024 * 1024, mode: str = "readwrite"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'. Expected one of {self.MODES}.")
+
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db_path = os.path.join(self.cache_dir, "responses.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @property
+    def read_only(self) -> bool:
+        return self.mode != "readwrite"
+
+    @staticmethod
+    def make_key(**fields) -> str:
+        """Hashes the request fields into a stable content address."""
+        canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached response for `key`, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            # Touch the entry so it survives LRU eviction (skipped when the store is frozen)
+            if not self.read_only:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """Stores a response, then evicts old entries until the store fits `max_bytes`."""
+        if self.read_only:
+            return
+
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"Response of {size} bytes exceeds cache budget; not caching.")
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops least-recently-used entries until the total size is within budget."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        doomed = []
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current store size."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size
+        }
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
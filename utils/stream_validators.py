@@ -0,0 +1,73 @@
+# utils/stream_validators.py
+"""
+Early-abort checks for streamed LLM output.
+
+A validator is any callable that takes the text generated so far and returns
+None to keep going, or a short reason string to cancel the generation.
+"""
+import codeop
+import warnings
+
+
+class PythonSyntaxValidator:
+    """
+    Aborts as soon as the completed lines can no longer be the start of a valid
+    Python module. Incomplete constructs (open brackets, a 'def' without a body)
+    are allowed; outright syntax errors are not.
+
+    An instance can be reused: text that does not extend the lines already
+    checked starts a new stream.
+    """
+
+    def __init__(self):
+        self._checked = ""
+
+    def __call__(self, text: str):
+        if not text.startswith(self._checked):
+            self._checked = ""  # A new completion
+        # Only whole lines are judged; the last line is still being written
+        cut = text.rfind("\n") + 1
+        if cut <= len(self._checked):
+            return None
+        self._checked = text[:cut]
+
+        lines = text[:cut].splitlines()
+        # The client strips fences after generation, so tolerate them here too
+        if lines and lines[0].strip().startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip().startswith("```"):
+            lines = lines[:-1]
+
+        source = "\n".join(lines) + "\n"
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                codeop.compile_command(source, "<stream>", "exec")
+        except SyntaxError as e:
+            return f"output is not valid Python ({e.msg}, line {e.lineno})"
+        except (ValueError, OverflowError) as e:
+            return f"output is not valid Python ({e})"
+        return None
+
+
+class MaxLengthValidator:
+    """Aborts once the output runs past a character budget."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+
+    def __call__(self, text: str):
+        if len(text) > self.max_chars:
+            return f"output exceeded {self.max_chars} characters"
+        return None
+
+
+def combine(*validators):
+    """Chains validators; the first reason returned wins."""
+    def check(text: str):
+        for validator in validators:
+            reason = validator(text)
+            if reason:
+                return reason
+        return None
+    return check